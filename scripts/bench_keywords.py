@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark feedback keyword matching: regex alternations vs KeywordMatcher.
+
+Generates synthetic comments and keyword lists, checks that both approaches
+agree, and prints the time each takes to classify every comment.
+
+Usage: python scripts/bench_keywords.py [--comments N] [--keywords N]
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from bitbot.core.keywords import KeywordMatcher
+
+WORDS = [
+    "the", "app", "mod", "version", "install", "crash", "ios", "android", "update",
+    "after", "before", "menu", "money", "god", "mode", "jailbreak", "sideload", "still",
+    "today", "again", "please", "help", "anyone", "tried", "with", "on", "my", "phone",
+]  # fmt: skip
+
+
+def make_keywords(rng: random.Random, count: int) -> tuple[list[str], list[str]]:
+    """Build two keyword classes of one- to three-word phrases."""
+
+    def phrase() -> str:
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        return " ".join(words)
+
+    keywords = list({phrase() for _ in range(count * 2)})[:count]
+    half = count // 2
+    return keywords[:half], keywords[half:]
+
+
+def make_comments(rng: random.Random, count: int, keywords: list[str]) -> list[str]:
+    """Build comments of filler words, a third of them mentioning a keyword."""
+    comments = []
+    for _ in range(count):
+        words = rng.choices(WORDS, k=rng.randint(8, 60))
+        if rng.random() < 1 / 3:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords).upper())
+        comments.append(" ".join(words))
+    return comments
+
+
+def with_regex(comments: list[str], working: list[str], not_working: list[str]) -> list[int]:
+    """The previous approach: two alternations, each searched over every comment."""
+    working_kw = re.compile("|".join(working), re.IGNORECASE)
+    not_working_kw = re.compile("|".join(not_working), re.IGNORECASE)
+    return [bool(working_kw.search(c)) - bool(not_working_kw.search(c)) for c in comments]
+
+
+def with_matcher(comments: list[str], working: list[str], not_working: list[str]) -> list[int]:
+    """One automaton pass per comment for both classes."""
+    matcher = KeywordMatcher({"working": working, "not_working": not_working})
+    verdicts = []
+    for comment in comments:
+        hits = matcher.scan(comment)
+        verdicts.append(("working" in hits) - ("not_working" in hits))
+    return verdicts
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=10_000)
+    parser.add_argument("--keywords", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    working, not_working = make_keywords(rng, args.keywords)
+    comments = make_comments(rng, args.comments, working + not_working)
+    print(f"{len(comments)} comments, {len(working) + len(not_working)} keywords")
+
+    results = {}
+    for name, approach in (("regex", with_regex), ("matcher", with_matcher)):
+        start = time.perf_counter()
+        results[name] = approach(comments, working, not_working)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:8} {elapsed * 1000:9.1f} ms")
+
+    if results["regex"] != results["matcher"]:
+        print("Results differ!")
+        sys.exit(1)
+    print("  results agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,35 @@
 """BitBot unified CLI using Typer + Rich."""
 
+import json
 import logging
+from enum import StrEnum
 
 import typer
 from beartype import beartype
+from rich.console import Console
 from rich.logging import RichHandler
+from rich.table import Table
 from rich.traceback import install
 
 # Install rich traceback handler
 install(show_locals=True)
 
-from bitbot.commands import check, gather, maintain, page, patch, post, release, sync
+from bitbot.commands import (
+    check,
+    daemon,
+    database,
+    gather,
+    maintain,
+    page,
+    patch,
+    post,
+    release,
+    search,
+    sync,
+)
+from bitbot.core import db
 from bitbot.core.container import Container
+from bitbot.core.db import QueryProfiler
 
 __version__ = "1.0.0"
 
@@ -38,6 +56,34 @@ def configure_logging(*, verbose: bool = False) -> None:
     )
 
 
+class ProfileFormat(StrEnum):
+    """Output formats for the SQL profile report."""
+
+    TABLE = "table"
+    JSON = "json"
+
+
+@beartype
+def print_db_profile(profiler: QueryProfiler, fmt: ProfileFormat, console: Console) -> None:
+    """Print per-statement SQL timings collected during the command."""
+    if fmt is ProfileFormat.JSON:
+        console.print_json(json.dumps(profiler.as_dicts()))
+        return
+
+    stats = profiler.stats()
+    table = Table(title="Database profile", title_justify="left")
+    table.add_column("Statement", overflow="fold")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("Rows", justify="right")
+    for s in stats:
+        table.add_row(s.sql, str(s.calls), f"{s.total_ms:.2f}", f"{s.p95_ms:.2f}", str(s.rows))
+    total_ms = sum(s.total_ms for s in stats)
+    table.caption = f"{sum(s.calls for s in stats)} statements, {total_ms:.2f} ms in SQLite"
+    console.print(table)
+
+
 # Register commands
 app.add_typer(post.app, name="post", help="Post releases to Reddit")
 app.add_typer(check.app, name="check", help="Check Reddit comments for feedback")
@@ -47,6 +93,9 @@ app.add_typer(patch.app, name="patch", help="Patch asset files")
 app.add_typer(page.app, name="page", help="Generate landing page")
 app.add_typer(gather.app, name="gather", help="Gather post data")
 app.add_typer(maintain.app, name="maintain", help="Maintain releases")
+app.add_typer(search.app, name="search", help="Search release notes and posts offline")
+app.add_typer(database.app, name="db", help="Maintain the local database")
+app.add_typer(daemon.app, name="daemon", help="Run the pipeline continuously in one process")
 
 
 @app.command()
@@ -61,11 +110,24 @@ def version() -> None:
 def main(
     ctx: typer.Context,
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output"),
+    db_profile: ProfileFormat | None = typer.Option(  # noqa: B008
+        None,
+        "--db-profile",
+        help="Report SQL statement timings when the command ends (implied as table by -v)",
+    ),
 ) -> None:
     """BitBot CLI - Automated release management and Reddit posting."""
     # Configure logging
     configure_logging(verbose=verbose)
 
+    # Profile database traffic for this command
+    profile_format = db_profile or (ProfileFormat.TABLE if verbose else None)
+    if profile_format is not None:
+        profiler = db.enable_profiling()
+        profiler.reset()
+        console = container.console()
+        ctx.call_on_close(lambda: print_db_profile(profiler, profile_format, console))
+
     # Store container in context for commands
     ctx.ensure_object(dict)
     ctx.obj["container"] = container
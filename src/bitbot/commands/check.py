@@ -1,31 +1,47 @@
 """Check command for BitBot CLI."""
 
+import functools
 import re
+import time
+from collections.abc import Callable, Iterable
 from datetime import UTC, datetime, timedelta
 from enum import Enum
 from typing import TYPE_CHECKING
 
+import praw
 import typer
 from beartype import beartype
-from praw.models import Submission
+from praw.models import Comment, Submission
 from returns.result import Failure, Result, Success
+from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from bitbot.config_models import Config
 from bitbot.core import db
 from bitbot.core.credentials import get_reddit_username
+from bitbot.core.db import AccountState
 from bitbot.core.error_context import error_context
-from bitbot.core.error_logger import LogLevel
+from bitbot.core.error_logger import ErrorLogger, LogLevel
 from bitbot.core.errors import BitBotError, RedditAPIError
-from bitbot.reddit.client import init_reddit
+from bitbot.core.keywords import KeywordMatcher
+from bitbot.core.scheduler import DueScheduler
+from bitbot.reddit.client import get_reddit, pooled_reddit
 
 if TYPE_CHECKING:
-    from rich.console import Console
-
     from bitbot.core.container import Container
 
 app = typer.Typer()
 
+# Largest page Reddit serves for a listing
+_LISTING_LIMIT = 100
+
+# Default minimum seconds between two status edits of one post while streaming
+STREAM_DEBOUNCE_SECONDS = 30.0
+
+# Seconds between reloads of the posts a stream watches, and before reconnecting
+_STREAM_REFRESH_SECONDS = 300.0
+_STREAM_RETRY_SECONDS = 30.0
+
 
 class CheckResult(Enum):
     """Result of comment check operation."""
@@ -34,15 +50,30 @@ class CheckResult(Enum):
     STATE_UNCHANGED = "unchanged"
 
 
+@functools.cache
 @beartype
-def _analyze_sentiment(comments: list, config: Config) -> str:
-    """Analyze comment sentiment and return status."""
-    working_kw = re.compile("|".join(config.feedback["workingKeywords"]), re.IGNORECASE)
-    not_working_kw = re.compile("|".join(config.feedback["notWorkingKeywords"]), re.IGNORECASE)
-    positive = sum(1 for c in comments if working_kw.search(c.body))
-    negative = sum(1 for c in comments if not_working_kw.search(c.body))
-    net_score = positive - negative
+def _feedback_matcher(
+    working: tuple[str, ...], not_working: tuple[str, ...], *, whole_words: bool
+) -> KeywordMatcher:
+    """Compile the feedback keywords once per keyword lists."""
+    return KeywordMatcher({"working": working, "not_working": not_working}, whole_words=whole_words)
+
 
+@beartype
+def _comment_verdict(body: str, config: Config) -> int:
+    """Score one comment: +1 working, -1 not working, 0 neither (or both)."""
+    matcher = _feedback_matcher(
+        tuple(config.feedback["workingKeywords"]),
+        tuple(config.feedback["notWorkingKeywords"]),
+        whole_words=config.feedback.get("wholeWords", False),
+    )
+    hits = matcher.scan(body)
+    return ("working" in hits) - ("not_working" in hits)
+
+
+@beartype
+def _status_for_score(net_score: int, config: Config) -> str:
+    """Map a thread's net feedback score to a status label."""
     threshold = config.feedback["minFeedbackCount"]
     if net_score <= -threshold:
         return config.feedback["labels"]["broken"]
@@ -51,6 +82,88 @@ def _analyze_sentiment(comments: list, config: Config) -> str:
     return config.feedback["labels"]["unknown"]
 
 
+@beartype
+def _comment_order(fullname: str) -> int:
+    """Creation order of a comment (IDs are base-36 counters)."""
+    return int(fullname.removeprefix("t1_"), 36)
+
+
+@beartype
+def _thread_comments(submission: Submission) -> tuple[list[Comment], bool]:
+    """Flatten the comment tree served with a submission.
+
+    Also returns whether Reddit left comments out of it ("load more" stubs).
+    """
+    skipped = submission.comments.replace_more(limit=0)
+    return [c for c in submission.comments.list() if isinstance(c, Comment)], bool(skipped)
+
+
+@beartype
+def _fetch_thread(submission: Submission) -> tuple[list[Comment], str | None]:
+    """Fetch a whole comment tree, plus its newest comment as the cursor."""
+    comments, _ = _thread_comments(submission)
+    newest = max((c.fullname for c in comments), key=_comment_order, default=None)
+    return comments, newest
+
+
+@beartype
+def _fetch_new_comments(
+    reddit: praw.Reddit, submission: Submission, last_seen: str
+) -> tuple[list[Comment], str]:
+    """Fetch a thread's recent comments, reading back to the ``last_seen`` fullname.
+
+    Reads one page of the newest top-level comments with their replies,
+    so the cost follows new activity rather than thread size. IDs grow
+    with creation time, so the cursor is compared rather than looked up
+    and still works once its comment is deleted. The page is only enough
+    when it holds the whole thread: if Reddit left comments out of it, or
+    every top-level comment on it is newer than the cursor, new replies
+    and edits under older comments may be missing, so the whole tree is
+    fetched instead. Returns the comments (older ones included; the ledger
+    skips those) and the new cursor.
+    """
+    submission.comment_sort = "new"
+    submission.comment_limit = _LISTING_LIMIT
+    comments, truncated = _thread_comments(submission)
+    cursor = _comment_order(last_seen)
+    top_level = [c for c in comments if c.is_root]
+    if (
+        truncated
+        or len(top_level) >= _LISTING_LIMIT
+        or (top_level and all(_comment_order(c.fullname) > cursor for c in top_level))
+    ):
+        comments, _ = _fetch_thread(reddit.submission(id=submission.id))
+    newest = max((c.fullname for c in comments), key=_comment_order, default=last_seen)
+    return comments, max(newest, last_seen, key=_comment_order)
+
+
+@beartype
+def _edited(comment: Comment) -> float:
+    """Edited timestamp of a comment (Reddit reports False if never edited)."""
+    return float(comment.edited or 0)
+
+
+@beartype
+def _score_changed(
+    comments: list[Comment], known: dict[str, db.CommentVerdict], config: Config
+) -> tuple[list[db.CommentVerdict], int]:
+    """Score comments that are new or edited since recorded.
+
+    Returns their verdicts and the change they make to the thread's score.
+    """
+    verdicts: list[db.CommentVerdict] = []
+    delta = 0
+    for comment in comments:
+        edited = _edited(comment)
+        previous = known.get(comment.id)
+        if previous is not None and previous["edited"] == edited:
+            continue
+        verdict = _comment_verdict(comment.body, config)
+        verdicts.append({"comment_id": comment.id, "edited": edited, "verdict": verdict})
+        delta += verdict - (previous["verdict"] if previous else 0)
+    return verdicts, delta
+
+
 @beartype
 def _update_post_status(submission: Submission, status: str, config: Config) -> None:
     """Update post status line if needed."""
@@ -63,16 +176,22 @@ def _update_post_status(submission: Submission, status: str, config: Config) ->
 
 
 @beartype
-def check_comments(config: Config, account_id: int) -> Result[CheckResult, BitBotError]:
-    """Check comments and update post status."""
-    # Get account metadata
-    meta_result = db.get_account(account_id)
-    if isinstance(meta_result, Failure):
-        return Failure(meta_result.failure())
+def _next_check_at(
+    last_check_timestamp: str | None, check_interval_seconds: int | None, config: Config
+) -> datetime:
+    """When an account's active post is next due for a check."""
+    last_check = datetime.fromisoformat(last_check_timestamp or "2000-01-01T00:00:00Z")
+    interval = check_interval_seconds or config.timing["firstCheck"]
+    return last_check + timedelta(seconds=interval)
+
 
-    meta = meta_result.unwrap()
+@beartype
+def check_comments(  # noqa: PLR0911
+    config: Config, account: AccountState
+) -> Result[CheckResult, BitBotError]:
+    """Check comments and update post status (the caller flushes ``account``)."""
+    meta = account.meta
     active_post_id = meta.get("active_post_id")
-    last_check_str = meta.get("last_check_timestamp") or "2000-01-01T00:00:00Z"
     current_interval = meta.get("check_interval_seconds") or config.timing["firstCheck"]
 
     # Skip if no active post
@@ -81,12 +200,12 @@ def check_comments(config: Config, account_id: int) -> Result[CheckResult, BitBo
 
     # Skip if not time yet
     now = datetime.now(UTC)
-    last_check = datetime.fromisoformat(last_check_str)
-    if now < (last_check + timedelta(seconds=current_interval)):
+    due = _next_check_at(meta["last_check_timestamp"], meta["check_interval_seconds"], config)
+    if now < due:
         return Success(CheckResult.STATE_UNCHANGED)
 
     # Initialize reddit client
-    reddit_result = init_reddit(config)
+    reddit_result = get_reddit(config)
     if isinstance(reddit_result, Failure):
         return Failure(reddit_result.failure())
 
@@ -94,15 +213,32 @@ def check_comments(config: Config, account_id: int) -> Result[CheckResult, BitBo
 
     try:
         submission = reddit.submission(id=active_post_id)
-        submission.comments.replace_more(limit=0)
-        comments = submission.comments.list()
-
-        status = _analyze_sentiment(comments, config)
+        thread_result = db.get_comment_thread(active_post_id)
+        if isinstance(thread_result, Failure):
+            return Failure(thread_result.failure())
+        thread = thread_result.unwrap()
+
+        if thread["last_seen"] is None:
+            comments, last_seen = _fetch_thread(submission)
+        else:
+            comments, last_seen = _fetch_new_comments(reddit, submission, thread["last_seen"])
+
+        known = db.get_comment_verdicts([c.id for c in comments])
+        if isinstance(known, Failure):
+            return Failure(known.failure())
+        verdicts, delta = _score_changed(comments, known.unwrap(), config)
+
+        # Edit the post before recording, so a failed edit is retried next check
+        status = _status_for_score(thread["score"] + delta, config)
         _update_post_status(submission, status, config)
 
+        tally = db.record_comment_verdicts(active_post_id, verdicts, last_seen)
+        if isinstance(tally, Failure):
+            return Failure(tally.failure())
+
         # Update interval based on activity
         last_count = meta.get("last_comment_count") or 0
-        comment_count = len(comments)
+        comment_count = tally.unwrap()["comments"]
         new_interval = current_interval
 
         if comment_count > last_count:
@@ -113,8 +249,7 @@ def check_comments(config: Config, account_id: int) -> Result[CheckResult, BitBo
 
         # Update timestamp and comment count
         new_timestamp = now.isoformat().replace("+00:00", "Z")
-        db.update_account(
-            account_id,
+        account.update(
             last_check_timestamp=new_timestamp,
             check_interval_seconds=new_interval,
             last_comment_count=comment_count,
@@ -127,9 +262,258 @@ def check_comments(config: Config, account_id: int) -> Result[CheckResult, BitBo
         return Failure(RedditAPIError(f"Failed to check comments: {e}"))
 
 
+# Scheduler key that reloads the watched accounts
+_REFRESH = None
+
+
+@beartype
+def _check_account(
+    config: Config, username: str, subreddit: str
+) -> tuple[Result[CheckResult, BitBotError], datetime | None]:
+    """Check one account's active post.
+
+    Returns the result and when the post is next due (None once the account
+    has no active post).
+    """
+    now = datetime.now(UTC)
+    retry_at = now + timedelta(seconds=config.timing["firstCheck"])
+    loaded = db.AccountState.load(username, subreddit)
+    if isinstance(loaded, Failure):
+        return Failure(loaded.failure()), retry_at
+    try:
+        with loaded.unwrap() as account:
+            result = check_comments(config, account)
+    except BitBotError as e:
+        return Failure(e), retry_at
+    meta = account.meta
+    if not meta["active_post_id"]:
+        return result, None
+    if isinstance(result, Failure):
+        return result, retry_at
+    return result, _next_check_at(
+        meta["last_check_timestamp"], meta["check_interval_seconds"], config
+    )
+
+
+@beartype
+def check_all(  # noqa: PLR0913
+    config: Config,
+    console: Console,
+    logger: ErrorLogger,
+    *,
+    username: str,
+    max_workers: int,
+    watch: bool,
+) -> int:
+    """Check every active post of ``username``'s accounts as each falls due.
+
+    Without ``watch``, runs the checks that are due now and returns. With
+    it, keeps running: each post is rescheduled for its next due time, and
+    accounts are reloaded periodically to pick up new posts. Returns the
+    number of failed checks.
+    """
+    scheduler: DueScheduler[tuple[str, str] | None] = DueScheduler()
+    failed: list[str] = []  # Appended from worker threads
+
+    def load_accounts() -> None:
+        accounts = db.get_active_accounts(username)
+        if isinstance(accounts, Failure):
+            msg = f"DB error: {accounts.failure()}"
+            raise BitBotError(msg)
+        for account in accounts.unwrap():
+            key = (account["username"], account["subreddit"])
+            if key not in scheduler:
+                due = _next_check_at(
+                    account["last_check_timestamp"], account["check_interval_seconds"], config
+                )
+                scheduler.schedule(key, due.timestamp())
+
+    def job(key: tuple[str, str] | None) -> float | None:
+        # Worker threads end with each run; release their connection with the job
+        with db.pooled_db():
+            if key is _REFRESH:
+                load_accounts()
+                return time.time() + config.timing["firstCheck"]
+            user, subreddit = key
+            with pooled_reddit():
+                result, next_at = _check_account(config, user, subreddit)
+        if isinstance(result, Failure):
+            failed.append(subreddit)
+            logger.log_error(result.failure(), LogLevel.ERROR)
+            console.print(f"[red]✗[/red] r/{subreddit}: {result.failure().message}")
+        elif result.unwrap() == CheckResult.STATE_CHANGED:
+            console.print(f"[green]✓[/green] r/{subreddit}: comments checked, state updated")
+        if not watch or next_at is None:
+            return None
+        return next_at.timestamp()
+
+    load_accounts()
+    if watch:
+        scheduler.schedule(_REFRESH, time.time() + config.timing["firstCheck"])
+    scheduler.run(job, max_workers=max_workers, until=None if watch else time.time())
+    return len(failed)
+
+
+class CommentStream:
+    """Scores comments from a live stream and debounces status edits.
+
+    Verdicts are recorded as comments arrive, so tallies stay current; the
+    status line of a post is edited at most once per ``debounce_seconds``.
+    The polling cursor is left alone: the next ``check run`` re-reads these
+    comments and the ledger skips them, so a gap in the stream (the
+    backlog skipped on connect, a dropped connection) is still covered.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        reddit: praw.Reddit,
+        *,
+        debounce_seconds: float = STREAM_DEBOUNCE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a stream handler watching no posts yet."""
+        self._config = config
+        self._reddit = reddit
+        self._debounce = debounce_seconds
+        self._clock = clock
+        self.post_ids: frozenset[str] = frozenset()
+        self._pending: dict[str, str] = {}  # Post ID -> status waiting to be shown
+        self._shown: dict[str, str] = {}
+        self._edited_at: dict[str, float] = {}
+
+    @beartype
+    def watch(self, post_ids: Iterable[str]) -> None:
+        """Replace the set of posts whose comments are scored."""
+        self.post_ids = frozenset(post_ids)
+        for post_id in set(self._pending) - self.post_ids:
+            del self._pending[post_id]
+
+    @beartype
+    def handle(self, comment: Comment) -> Result[bool, BitBotError]:
+        """Score a streamed comment. Returns whether it changed a watched thread."""
+        post_id = comment.link_id.removeprefix("t3_")
+        if post_id not in self.post_ids:
+            return Success(False)  # noqa: FBT003
+        known = db.get_comment_verdicts([comment.id])
+        if isinstance(known, Failure):
+            return Failure(known.failure())
+        verdicts, _ = _score_changed([comment], known.unwrap(), self._config)
+        if not verdicts:
+            return Success(False)  # noqa: FBT003
+        tally = db.record_comment_verdicts(post_id, verdicts)
+        if isinstance(tally, Failure):
+            return Failure(tally.failure())
+        status = _status_for_score(tally.unwrap()["score"], self._config)
+        if self._shown.get(post_id) != status:
+            self._pending[post_id] = status
+        return Success(True)  # noqa: FBT003
+
+    @beartype
+    def flush(self, *, force: bool = False) -> list[RedditAPIError]:
+        """Edit posts whose debounce window has passed (all of them if ``force``).
+
+        A failed edit stays pending and is retried after another window.
+        Returns the errors.
+        """
+        now = self._clock()
+        errors = []
+        for post_id, status in list(self._pending.items()):
+            if not force and now - self._edited_at.get(post_id, -self._debounce) < self._debounce:
+                continue
+            self._edited_at[post_id] = now
+            try:
+                _update_post_status(self._reddit.submission(id=post_id), status, self._config)
+            except Exception as e:
+                errors.append(RedditAPIError(f"Failed to update status of {post_id}: {e}"))
+                continue
+            self._shown[post_id] = status
+            del self._pending[post_id]
+        return errors
+
+
+@beartype
+def stream_comments(
+    config: Config,
+    console: Console,
+    logger: ErrorLogger,
+    *,
+    username: str,
+    debounce_seconds: float,
+) -> None:
+    """Follow new comments in every subreddit ``username`` has an active post in.
+
+    Runs until interrupted. The subreddits' comment stream is reopened when
+    the set of active posts changes or the connection fails.
+    """
+    reddit_result = get_reddit(config)
+    if isinstance(reddit_result, Failure):
+        raise reddit_result.failure()
+    reddit = reddit_result.unwrap()
+    stream = CommentStream(config, reddit, debounce_seconds=debounce_seconds)
+
+    def active_posts() -> dict[str, str]:
+        accounts = db.get_active_accounts(username)
+        if isinstance(accounts, Failure):
+            msg = f"DB error: {accounts.failure()}"
+            raise BitBotError(msg)
+        return {a["active_post_id"]: a["subreddit"] for a in accounts.unwrap()}
+
+    def flush(*, force: bool = False) -> None:
+        for error in stream.flush(force=force):
+            logger.log_error(error, LogLevel.ERROR)
+            console.print(f"[red]✗[/red] {error.message}")
+
+    try:
+        while True:
+            posts = active_posts()
+            stream.watch(posts)
+            if not posts:
+                time.sleep(_STREAM_REFRESH_SECONDS)
+                continue
+            subreddits = "+".join(sorted(set(posts.values())))
+            console.print(f"[dim]Streaming comments from r/{subreddits}[/dim]")
+            refresh_at = time.monotonic() + _STREAM_REFRESH_SECONDS
+            try:
+                comments = reddit.subreddit(subreddits).stream.comments(
+                    skip_existing=True, pause_after=0
+                )
+                for comment in comments:
+                    # None marks a poll that found nothing new
+                    if comment is not None:
+                        result = stream.handle(comment)
+                        if isinstance(result, Failure):
+                            logger.log_error(result.failure(), LogLevel.ERROR)
+                    flush()
+                    if time.monotonic() >= refresh_at:
+                        if active_posts() != posts:
+                            break
+                        refresh_at = time.monotonic() + _STREAM_REFRESH_SECONDS
+                else:
+                    return
+            except BitBotError:
+                raise
+            except Exception as e:
+                logger.log_error(RedditAPIError(f"Comment stream failed: {e}"), LogLevel.WARNING)
+                time.sleep(_STREAM_RETRY_SECONDS)
+    finally:
+        flush(force=True)
+
+
 @beartype
 @app.command()
-def run(ctx: typer.Context) -> None:
+def run(
+    ctx: typer.Context,
+    all_accounts: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--all",
+        help="Check every subreddit this user has an active post in",
+    ),
+    watch: bool = typer.Option(  # noqa: FBT001
+        default=False, help="With --all, keep running and check each post when due"
+    ),
+    workers: int = typer.Option(4, "--workers", min=1, help="Checks to run at once with --all"),
+) -> None:
     """Check Reddit comments for feedback."""
     container: Container = ctx.obj["container"]
     console: Console = container.console()
@@ -137,6 +521,27 @@ def run(ctx: typer.Context) -> None:
     config: Config = container.config()
 
     with error_context(operation="check_comments"):
+        if all_accounts:
+            try:
+                db.init(config.database)
+                failures = check_all(
+                    config,
+                    console,
+                    logger,
+                    username=get_reddit_username(),
+                    max_workers=workers,
+                    watch=watch,
+                )
+            except Exception as e:
+                error = BitBotError(f"Unexpected error: {e}")
+                logger.log_error(error, LogLevel.CRITICAL)
+                console.print(f"[red]✗ Error:[/red] {e}")
+                raise typer.Exit(code=1) from None
+            if failures:
+                raise typer.Exit(code=1)
+            console.print("[green]✓[/green] Due posts checked")
+            return
+
         try:
             with Progress(
                 SpinnerColumn(),
@@ -146,19 +551,19 @@ def run(ctx: typer.Context) -> None:
                 progress.add_task(description="Checking comments...", total=None)
 
                 # Initialize database
-                db.init()
+                db.init(config.database)
 
                 # Get account
                 username = get_reddit_username()
-                account_result = db.get_or_create_account(username, config.reddit.subreddit)
+                account_result = db.AccountState.load(username, config.reddit.subreddit)
                 if isinstance(account_result, Failure):
                     error = BitBotError(f"DB error: {account_result.failure()}")
                     logger.log_error(error, LogLevel.ERROR)
                     console.print(f"[red]✗ Error:[/red] {error.message}")
                     raise typer.Exit(code=1)
-                account_id = account_result.unwrap()
 
-                result = check_comments(config, account_id)
+                with account_result.unwrap() as account:
+                    result = check_comments(config, account)
 
                 if isinstance(result, Failure):
                     error = result.failure()
@@ -179,5 +584,46 @@ def run(ctx: typer.Context) -> None:
             raise typer.Exit(code=1) from None
 
 
+@beartype
+@app.command()
+def stream(
+    ctx: typer.Context,
+    debounce: float = typer.Option(
+        STREAM_DEBOUNCE_SECONDS,
+        "--debounce",
+        min=0.0,
+        help="Minimum seconds between two status edits of one post",
+    ),
+) -> None:
+    """Score new comments as they are posted and keep status lines current."""
+    container: Container = ctx.obj["container"]
+    console: Console = container.console()
+    logger = container.logger()
+    config: Config = container.config()
+
+    with error_context(operation="stream_comments"):
+        try:
+            db.init(config.database)
+            console.print("[green]✓[/green] Streaming comments (Ctrl+C to stop)")
+            stream_comments(
+                config,
+                console,
+                logger,
+                username=get_reddit_username(),
+                debounce_seconds=debounce,
+            )
+        except KeyboardInterrupt:
+            console.print("[yellow]Stream stopped[/yellow]")
+        except BitBotError as e:
+            logger.log_error(e, LogLevel.ERROR)
+            console.print(f"[red]✗ Error:[/red] {e.message}")
+            raise typer.Exit(code=1) from None
+        except Exception as e:
+            error = BitBotError(f"Unexpected error: {e}")
+            logger.log_error(error, LogLevel.CRITICAL)
+            console.print(f"[red]✗ Error:[/red] {e}")
+            raise typer.Exit(code=1) from None
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,252 @@
+"""Daemon command for BitBot CLI.
+
+Runs the pipeline commands in one long-lived process, so the container's
+config and registry, the Reddit clients, the database pool and every
+in-process cache stay warm between runs. Each command runs on its own
+interval and is also started early by database state:
+
+- due releases in the queue start ``release``;
+- a ``release`` run that had work re-runs ``gather`` for the new downloads;
+- a changed catalog starts ``page`` and ``post``.
+
+State is polled every ``poll_seconds`` and after every run, so a source
+release reaches Reddit in seconds instead of at the next cron tick.
+"""
+
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import typer
+from beartype import beartype
+from returns.result import Failure, Result, Success
+from rich.console import Console
+
+from bitbot.core import db
+from bitbot.core.error_context import error_context
+from bitbot.core.error_logger import ErrorLogger, LogLevel
+from bitbot.core.errors import BitBotError, ConfigurationError
+from bitbot.core.scheduler import DueScheduler
+
+if TYPE_CHECKING:
+    from bitbot.config_models import Config
+    from bitbot.core.container import Container
+
+app = typer.Typer()
+
+# Command line each job runs, in pipeline order
+JOB_ARGS: dict[str, list[str]] = {
+    "gather": ["gather", "run"],
+    "release": ["release", "run"],
+    "page": ["page", "run"],
+    "post": ["post", "run"],
+    "check": ["check", "run", "--all"],
+    "maintain": ["maintain", "run"],
+}
+
+# Seconds between runs; 0 runs a job only when triggered
+DEFAULT_INTERVALS: dict[str, int] = {
+    "gather": 300,
+    "release": 0,
+    "page": 0,
+    "post": 0,
+    "check": 60,
+    "maintain": 3600,
+}
+
+# Scheduler key of the state poll
+_TRIGGERS = "triggers"
+
+# Jobs started when the catalog differs from what they last handled
+_CATALOG_JOBS = ("page", "post")
+
+# A failed job is not triggered again for this long (its interval still applies)
+RETRY_SECONDS = 60.0
+
+# Runs a command line in-process and returns its exit code
+Invoke = Callable[[list[str]], int]
+
+
+@dataclass(frozen=True)
+class DaemonSettings:
+    """Job intervals and trigger polling (from the ``[daemon]`` config section)."""
+
+    intervals: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_INTERVALS))
+    poll_seconds: float = 5.0
+
+
+@beartype
+def daemon_settings(
+    options: Mapping[str, Any] | None = None,
+) -> Result[DaemonSettings, ConfigurationError]:
+    """Build daemon settings from config, rejecting unknown jobs and bad values."""
+    options = options or {}
+    intervals = dict(DEFAULT_INTERVALS)
+    for name, seconds in options.get("intervals", {}).items():
+        if name not in JOB_ARGS:
+            return Failure(ConfigurationError(f"Unknown daemon job: {name}"))
+        if not isinstance(seconds, int) or isinstance(seconds, bool) or seconds < 0:
+            return Failure(
+                ConfigurationError(f"Interval for {name} must be a non-negative integer")
+            )
+        intervals[name] = seconds
+    poll_seconds = options.get("poll_seconds", DaemonSettings.poll_seconds)
+    if not isinstance(poll_seconds, int | float) or poll_seconds <= 0:
+        return Failure(ConfigurationError("poll_seconds must be positive"))
+    return Success(DaemonSettings(intervals=intervals, poll_seconds=float(poll_seconds)))
+
+
+class Pipeline:
+    """Runs jobs through ``invoke`` and works out which ones are due early."""
+
+    def __init__(
+        self,
+        invoke: Invoke,
+        settings: DaemonSettings,
+        console: Console,
+        logger: ErrorLogger,
+    ) -> None:
+        """Create a pipeline; nothing runs until ``run_job`` is called."""
+        self._invoke = invoke
+        self.settings = settings
+        self._console = console
+        self._logger = logger
+        # Catalog fingerprint each catalog job last handled successfully
+        self._handled: dict[str, str | None] = dict.fromkeys(_CATALOG_JOBS)
+        self._regather = False
+        self._retry_at: dict[str, float] = {}
+
+    @beartype
+    def next_run(self, name: str, now: float) -> float | None:
+        """When a job runs next on its interval alone (None if trigger-only)."""
+        interval = self.settings.intervals[name]
+        return now + interval if interval else None
+
+    @beartype
+    def run_job(self, name: str) -> bool:
+        """Run one job. Returns whether it succeeded."""
+        fingerprint = self._fingerprint() if name in self._handled else None
+        had_work = name == "release" and self._due_releases() > 0
+        start = time.monotonic()
+        try:
+            code = self._invoke(JOB_ARGS[name])
+        except Exception as e:  # A failing job must not stop the daemon
+            self._logger.log_error(BitBotError(f"{name} crashed: {e}"), LogLevel.ERROR)
+            code = 1
+        elapsed = time.monotonic() - start
+        if code:
+            self._console.print(f"[red]✗[/red] daemon: {name} failed ({elapsed:.1f}s)")
+            self._retry_at[name] = time.time() + RETRY_SECONDS
+            return False
+        self._retry_at.pop(name, None)
+        self._console.print(f"[dim]daemon: {name} done ({elapsed:.1f}s)[/dim]")
+        if name in self._handled:
+            self._handled[name] = fingerprint
+        if had_work:
+            self._regather = True
+        elif name == "gather":
+            self._regather = False
+        return True
+
+    @beartype
+    def triggered(self) -> list[str]:
+        """Jobs that database state says should run now (failed jobs wait to retry)."""
+        jobs = []
+        if self._due_releases() > 0:
+            jobs.append("release")
+        if self._regather:
+            jobs.append("gather")
+        fingerprint = self._fingerprint()
+        if fingerprint:
+            jobs.extend(name for name, seen in self._handled.items() if seen != fingerprint)
+        now = time.time()
+        return [name for name in jobs if self._retry_at.get(name, 0.0) <= now]
+
+    def _due_releases(self) -> int:
+        result = db.count_due()
+        if isinstance(result, Failure):
+            self._logger.log_error(result.failure(), LogLevel.WARNING)
+            return 0
+        return result.unwrap()
+
+    def _fingerprint(self) -> str | None:
+        result = db.catalog_fingerprint()
+        if isinstance(result, Failure):
+            self._logger.log_error(result.failure(), LogLevel.WARNING)
+            return None
+        return result.unwrap()
+
+
+@beartype
+def run_daemon(pipeline: Pipeline, scheduler: DueScheduler[str] | None = None) -> None:
+    """Schedule every job and run them one at a time until stopped.
+
+    Jobs run in sequence: they share the console's live display and the
+    pipeline's stages depend on each other anyway.
+    """
+    if scheduler is None:
+        scheduler = DueScheduler()
+    now = time.time()
+    for name in JOB_ARGS:
+        if pipeline.settings.intervals[name]:
+            scheduler.schedule(name, now)
+    scheduler.schedule(_TRIGGERS, now)
+
+    def fire_triggers() -> None:
+        for name in pipeline.triggered():
+            scheduler.schedule(name, time.time())
+
+    def job(name: str) -> float | None:
+        if name == _TRIGGERS:
+            fire_triggers()
+            return time.time() + pipeline.settings.poll_seconds
+        pipeline.run_job(name)
+        fire_triggers()
+        return pipeline.next_run(name, time.time())
+
+    scheduler.run(job, max_workers=1)
+
+
+@beartype
+@app.command()
+def run(ctx: typer.Context) -> None:
+    """Run gather, release, page, post, check and maintain continuously."""
+    container: Container = ctx.obj["container"]
+    console: Console = container.console()
+    logger = container.logger()
+    config: Config = container.config()
+    root = ctx.find_root().command
+
+    def invoke(args: list[str]) -> int:
+        code = root.main(args=args, prog_name="bitbot", obj=ctx.obj, standalone_mode=False)
+        return code if isinstance(code, int) else 0
+
+    with error_context(command="daemon"):
+        try:
+            init_result = db.init(config.database)
+            if isinstance(init_result, Failure):
+                msg = f"DB error: {init_result.failure()}"
+                raise BitBotError(msg)
+            settings = daemon_settings(config.daemon)
+            if isinstance(settings, Failure):
+                raise settings.failure()
+
+            console.print("[green]✓[/green] Daemon started (Ctrl+C to stop)")
+            run_daemon(Pipeline(invoke, settings.unwrap(), console, logger))
+
+        except BitBotError as e:
+            logger.log_error(e, LogLevel.ERROR)
+            console.print(f"[red]✗ Error:[/red] {e.message}")
+            raise typer.Exit(code=1) from None
+        except KeyboardInterrupt:
+            console.print("[yellow]Daemon stopped[/yellow]")
+        except Exception as e:
+            error = BitBotError(f"Unexpected error: {e}")
+            logger.log_error(error, LogLevel.CRITICAL)
+            console.print(f"[red]✗ Error:[/red] {e}")
+            raise typer.Exit(code=1) from None
+
+
+if __name__ == "__main__":
+    app()
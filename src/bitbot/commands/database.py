@@ -0,0 +1,114 @@
+"""Database maintenance commands for BitBot CLI."""
+
+from typing import TYPE_CHECKING
+
+import typer
+from beartype import beartype
+from returns.result import Failure
+from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn
+
+from bitbot.core import db
+from bitbot.core.db.maintenance import MaintenanceReport, maintain, retention_limits
+from bitbot.core.error_context import error_context
+from bitbot.core.error_logger import LogLevel
+from bitbot.core.errors import BitBotError
+
+if TYPE_CHECKING:
+    from bitbot.config_models import Config
+    from bitbot.core.container import Container
+
+app = typer.Typer()
+
+
+@beartype
+def _format_size(size: int) -> str:
+    """Format a byte count for humans."""
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:  # noqa: PLR2004
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+@beartype
+def print_report(report: MaintenanceReport, console: Console) -> None:
+    """Print what a maintenance run pruned and how the size changed."""
+    for table, count in report.pruned.items():
+        if count:
+            console.print(f"[cyan]→[/cyan] {table}: pruned {count} row(s)")
+    if report.converted_to_incremental:
+        console.print("[cyan]→[/cyan] Enabled incremental vacuum (one-time full VACUUM)")
+    elif report.pages_freed:
+        console.print(f"[cyan]→[/cyan] Freed {report.pages_freed} page(s)")
+    if not report.wal_checkpointed:
+        console.print("[yellow]⚠ WAL checkpoint incomplete (database busy)[/yellow]")
+    saved = report.size_before - report.size_after
+    console.print(
+        f"[green]✓[/green] {_format_size(report.size_before)} → "
+        f"{_format_size(report.size_after)} ({_format_size(max(saved, 0))} reclaimed)"
+    )
+
+
+@beartype
+@app.command("maintain")
+def maintain_command(
+    ctx: typer.Context,
+    vacuum: bool = typer.Option(  # noqa: FBT001
+        default=True, help="Release freed pages back to the filesystem"
+    ),
+) -> None:
+    """Prune old rows, vacuum, optimize and checkpoint bitbot.db.
+
+    Retention limits come from [database.retention] in config.toml.
+    """
+    container: Container = ctx.obj["container"]
+    console: Console = container.console()
+    logger = container.logger()
+    config: Config = container.config()
+
+    with error_context(command="db maintain"):
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console,
+            ) as progress:
+                progress.add_task(description="Maintaining database...", total=None)
+
+                init_result = db.init(config.database)
+                if isinstance(init_result, Failure):
+                    msg = f"DB error: {init_result.failure()}"
+                    raise BitBotError(msg)
+                # processed_releases_keep also bounds gather's own compaction
+                limits = retention_limits(
+                    {
+                        "processed_releases": config.database.get(
+                            "processed_releases_keep", db.PROCESSED_RELEASES_KEEP
+                        ),
+                        **config.database.get("retention", {}),
+                    }
+                )
+                if isinstance(limits, Failure):
+                    raise BitBotError(str(limits.failure().message))
+
+                result = maintain(limits.unwrap(), vacuum=vacuum)
+                if isinstance(result, Failure):
+                    raise BitBotError(str(result.failure().message))
+
+            print_report(result.unwrap(), console)
+
+        except BitBotError as e:
+            logger.log_error(e, LogLevel.ERROR)
+            console.print(f"[red]✗ Error:[/red] {e.message}")
+            raise typer.Exit(code=1) from None
+        except Exception as e:
+            error = BitBotError(f"Unexpected error: {e}")
+            logger.log_error(error, LogLevel.CRITICAL)
+            console.print(f"[red]✗ Error:[/red] {e}")
+            raise typer.Exit(code=1) from None
+
+
+if __name__ == "__main__":
+    app()
@@ -1,51 +1,65 @@
 """Gather command for BitBot CLI."""
 
-import json
-from pathlib import Path
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from itertools import batched
 from typing import TYPE_CHECKING, Any
 from urllib.parse import urlparse
 
 import typer
 from beartype import beartype
 from returns.result import Failure, Success
+from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from bitbot import paths
-from bitbot.core import db
+from bitbot.core import db, release_store
 from bitbot.core.app_registry import AppRegistry
+from bitbot.core.db import PendingRelease, SearchDocument
 from bitbot.core.error_context import error_context
 from bitbot.core.error_logger import LogLevel
-from bitbot.core.errors import BitBotError
+from bitbot.core.errors import BitBotError, GitHubAPIError, StateError
 from bitbot.core.release_parser import parse_release_body
-from bitbot.gh.releases.fetcher import get_github_data
+from bitbot.gh.releases.fetcher import stream_github_list
+from bitbot.models import App
 
 if TYPE_CHECKING:
-    from rich.console import Console
-
     from bitbot.config_models import Config
     from bitbot.core.container import Container
 
 app = typer.Typer()
 
+# Matched releases are queued and folded into release data one page at a time
+QUEUE_BATCH_SIZE = 100
 
-@beartype
-def _queue_new_releases(
-    source_releases: list[dict[str, Any]],
-    registry: AppRegistry,
-    console: "Console",
-) -> int:
-    """Detect and queue new releases from source repo. Returns count of queued releases."""
-    # Get already processed release IDs
-    processed_result = db.get_processed_releases()
-    processed_ids = processed_result.unwrap() if isinstance(processed_result, Success) else set()
 
-    queued = 0
-    for release in source_releases:
-        release_id = release.get("id")
-        if not release_id or release_id in processed_ids:
-            continue
+@dataclass
+class MatchedRelease:
+    """Source release whose body parsed and matched a configured app."""
+
+    release_id: int | None
+    app: App
+    version: str
+    tag: str
+    asset_name: str | None
+    published_at: str
+
+
+@dataclass
+class BotIndex:
+    """Download URLs and version history from the bot repo, keyed by app."""
+
+    urls: dict[tuple[str, str], str] = field(default_factory=dict)
+    history: dict[str, list[dict[str, str]]] = field(default_factory=lambda: defaultdict(list))
 
-        parsed = parse_release_body(release.get("body", ""))
+
+@beartype
+def _match_releases(
+    releases: Iterable[dict[str, Any]], registry: AppRegistry
+) -> Iterator[MatchedRelease]:
+    """Parse release bodies and yield the ones that match a configured app."""
+    for release in releases:
+        parsed = parse_release_body(release.get("body") or "")
         if not parsed.is_complete:
             continue
 
@@ -53,23 +67,96 @@ def _queue_new_releases(
         if not matched_app:
             continue
 
-        # Queue this release for processing
-        result = db.add_pending_release(
-            release_id=release_id,
-            app_id=matched_app.id,
-            display_name=matched_app.display_name,
+        yield MatchedRelease(
+            release_id=release.get("id"),
+            app=matched_app,
             version=parsed.version,  # type: ignore[arg-type]
-            tag=release.get("tag_name", f"v{parsed.version}"),
+            tag=release.get("tag_name") or f"v{parsed.version}",
             asset_name=parsed.asset_name,
+            published_at=release.get("published_at") or "",
         )
 
-        if isinstance(result, Success):
-            console.print(f"[cyan]→[/cyan] Queued: {matched_app.display_name} v{parsed.version}")
-            queued += 1
-            # Mark as processed so we don't queue again
-            db.add_processed_release(release_id)
 
-    return queued
+@beartype
+def _release_document(release: dict[str, Any]) -> SearchDocument | None:
+    """Search document for a source release's notes (None if it has no ID)."""
+    release_id = release.get("id")
+    if not release_id:
+        return None
+    return {
+        "kind": db.KIND_RELEASE,
+        "ref": str(release_id),
+        "title": release.get("name") or release.get("tag_name") or "",
+        "body": release.get("body") or "",
+        "url": release.get("html_url"),
+    }
+
+
+@beartype
+def _index_release_notes(
+    releases: Iterable[dict[str, Any]], console: Console
+) -> Iterator[dict[str, Any]]:
+    """Pass releases through, adding their notes to the search index in batches."""
+    for batch in batched(releases, QUEUE_BATCH_SIZE, strict=False):
+        documents = [doc for release in batch if (doc := _release_document(release))]
+        result = db.index_documents(documents)
+        if isinstance(result, Failure):
+            message = result.failure().message
+            console.print(f"[yellow]⚠ Failed to index release notes:[/yellow] {message}")
+        yield from batch
+
+
+@beartype
+def _unprocessed(
+    matched: Iterable[MatchedRelease], processed_ids: set[int]
+) -> Iterator[MatchedRelease]:
+    """Drop releases that were already processed (or repeated in the same batch)."""
+    for release in matched:
+        if not release.release_id or release.release_id in processed_ids:
+            continue
+        processed_ids.add(release.release_id)
+        yield release
+
+
+@beartype
+def _queue_new_releases(batch: Sequence[MatchedRelease], console: Console) -> int:
+    """Queue releases from a batch that were not processed yet. Returns count queued."""
+    batch_ids = [r.release_id for r in batch if r.release_id]
+    processed_result = db.get_processed_among(batch_ids)
+    processed_ids = processed_result.unwrap() if isinstance(processed_result, Success) else set()
+    new_releases = list(_unprocessed(batch, processed_ids))
+    if not new_releases:
+        return 0
+
+    pending: list[PendingRelease] = [
+        {
+            "release_id": release.release_id,  # type: ignore[typeddict-item]
+            "app_id": release.app.id,
+            "display_name": release.app.display_name,
+            "version": release.version,
+            "tag": release.tag,
+            "asset_name": release.asset_name,
+        }
+        for release in new_releases
+    ]
+    # Queue and mark as processed together, so a crash cannot queue a release twice
+    try:
+        with db.transaction():
+            result = db.add_pending_releases_many(pending)
+            if isinstance(result, Failure):
+                raise result.failure()
+            marked = db.add_processed_releases_many([r["release_id"] for r in pending])
+            if isinstance(marked, Failure):
+                raise marked.failure()
+    except StateError as e:
+        console.print(f"[yellow]⚠ Failed to queue releases:[/yellow] {e.message}")
+        return 0
+
+    added = set(result.unwrap())
+    for release in new_releases:
+        if release.release_id in added:
+            console.print(f"[cyan]→[/cyan] Queued: {release.app.display_name} v{release.version}")
+    return len(added)
 
 
 @beartype
@@ -99,106 +186,81 @@ def _validate_url(url: str) -> bool:
 
 
 @beartype
-def _build_releases_json(
-    source_releases: list[dict[str, Any]],
-    bot_releases: list[dict[str, Any]],
+def _index_bot_releases(
+    bot_releases: Iterable[dict[str, Any]],
     registry: AppRegistry,
-    console: "Console",
-) -> dict[str, Any]:
-    """Build releases.json from source and bot releases."""
-    apps_data: dict[str, Any] = {}
-
-    # Build index of bot releases by (app_id, version) for fast lookup
-    bot_index: dict[tuple[str, str], str] = {}
+    console: Console,
+    index: BotIndex | None = None,
+) -> BotIndex:
+    """Index bot releases by (app_id, version) and collect per-app history."""
+    index = index if index is not None else BotIndex()
     for bot_rel in bot_releases:
         if not bot_rel.get("assets"):
             continue
-        bot_parsed = parse_release_body(bot_rel.get("body", ""))
+        bot_parsed = parse_release_body(bot_rel.get("body") or "")
         if not bot_parsed.is_complete:
             continue
         bot_app = registry.get(bot_parsed.app_id or "")
-        if bot_app:
-            url = bot_rel["assets"][0]["browser_download_url"]
-            # Validate URL before adding to index
-            if _validate_url(url):
-                key = (bot_app.id, bot_parsed.version)  # type: ignore[arg-type]
-                bot_index[key] = url
-            else:
-                console.print(f"[yellow]⚠ Skipping invalid URL for {bot_app.id}: {url[:50]}[/yellow]")
-
-    # Get latest releases from source
-    for release in source_releases:
-        parsed = parse_release_body(release.get("body", ""))
-        if not parsed.is_complete:
+        if not bot_app:
             continue
 
-        matched_app = registry.get(parsed.app_id)  # type: ignore[arg-type]
-        if not matched_app:
+        url = bot_rel["assets"][0]["browser_download_url"]
+        # Validate URL before adding to index
+        if not _validate_url(url):
+            console.print(f"[yellow]⚠ Skipping invalid URL for {bot_app.id}: {url[:50]}[/yellow]")
             continue
 
-        app_id = matched_app.id
-        version = parsed.version
+        version: str = bot_parsed.version  # type: ignore[assignment]
+        index.urls[(bot_app.id, version)] = url
+        index.history[bot_app.id].append(
+            {
+                "version": version,
+                "download_url": url,
+                "published_at": bot_rel.get("published_at") or "",
+            }
+        )
+    return index
+
 
+@beartype
+def _collect_latest(
+    matched: Iterable[MatchedRelease], bot_index: BotIndex, apps_data: dict[str, Any]
+) -> None:
+    """Record the newest source release per app that has a bot download."""
+    for release in matched:
         # Skip if we already have a newer version for this app
-        if app_id in apps_data:
+        if release.app.id in apps_data:
             continue
 
         # Find download URL from bot repo
-        download_url = bot_index.get((app_id, version), "")  # type: ignore[arg-type]
+        download_url = bot_index.urls.get((release.app.id, release.version), "")
         if not download_url:
             continue
 
-        apps_data[app_id] = {
-            "display_name": matched_app.display_name,
+        apps_data[release.app.id] = {
+            "display_name": release.app.display_name,
             "latest_release": {
-                "version": version,
+                "version": release.version,
                 "download_url": download_url,
-                "published_at": release["published_at"],
+                "published_at": release.published_at,
             },
             "previous_releases": [],
         }
 
-    # Get version history from bot repo
-    for bot_rel in bot_releases:
-        if not bot_rel.get("assets"):
-            continue
-
-        parsed = parse_release_body(bot_rel.get("body", ""))
-        if not parsed.is_complete:
-            continue
-
-        matched_app = registry.get(parsed.app_id)  # type: ignore[arg-type]
-        if not matched_app or matched_app.id not in apps_data:
-            continue
-
-        app_id = matched_app.id
-        version = parsed.version
-
-        # Skip if it's the latest version
-        if version == apps_data[app_id]["latest_release"]["version"]:
-            continue
-
-        # Validate URL before adding
-        url = bot_rel["assets"][0]["browser_download_url"]
-        if not _validate_url(url):
-            console.print(f"[yellow]⚠ Skipping invalid URL for {app_id} v{version}[/yellow]")
-            continue
 
-        apps_data[app_id]["previous_releases"].append(
-            {
-                "version": version,
-                "download_url": url,
-                "published_at": bot_rel["published_at"],
-            }
-        )
-
-    return apps_data
+@beartype
+def _attach_history(apps_data: dict[str, Any], bot_index: BotIndex) -> None:
+    """Fill previous_releases for each gathered app from the bot repo history."""
+    for app_id, app_data in apps_data.items():
+        latest_version = app_data["latest_release"]["version"]
+        history = bot_index.history.get(app_id, [])
+        app_data["previous_releases"] = [e for e in history if e["version"] != latest_version]
 
 
 @beartype
 @app.command()
 def run(ctx: typer.Context) -> None:
-    """Gather releases from source repository, queue new ones, and create releases.json."""
+    """Gather releases from source repository, queue new ones, and update the catalog."""
     container: Container = ctx.obj["container"]
     console: Console = container.console()
     logger = container.logger()
@@ -215,49 +277,75 @@ def run(ctx: typer.Context) -> None:
                 progress.add_task(description="Gathering releases...", total=None)
 
                 # Initialize database
-                db.init()
+                db.init(config.database)
 
                 source_repo = config.github.source_repo
                 bot_repo = config.github.bot_repo
 
-                # Fetch releases from source repo
-                source_result = get_github_data(f"/repos/{source_repo}/releases?per_page=100")
-                if isinstance(source_result, Failure):
-                    error = BitBotError(f"GitHub API error: {source_result.failure()}")
-                    logger.log_error(error, LogLevel.ERROR)
-                    console.print(f"[red]✗ Error:[/red] {source_result.failure()}")
-                    raise typer.Exit(code=1) from None
-
-                source_releases = source_result.unwrap()
-                if not isinstance(source_releases, list):
-                    error = BitBotError("Expected list of releases from GitHub API")
-                    logger.log_error(error, LogLevel.ERROR)
-                    console.print(f"[red]✗ Error:[/red] {error.message}")
+                # Index bot repo releases for download URLs and history
+                bot_index = BotIndex()
+                try:
+                    _index_bot_releases(
+                        stream_github_list(f"/repos/{bot_repo}/releases?per_page=100"),
+                        registry,
+                        console,
+                        bot_index,
+                    )
+                except GitHubAPIError as e:
+                    console.print(f"[yellow]⚠ Bot releases unavailable:[/yellow] {e.message}")
+
+                # Stream source releases: index notes → parse → match → dedupe → queue
+                apps_data: dict[str, Any] = {}
+                queued_count = 0
+                try:
+                    source_stream = stream_github_list(
+                        f"/repos/{source_repo}/releases?per_page=100"
+                    )
+                    matched = _match_releases(
+                        _index_release_notes(source_stream, console), registry
+                    )
+                    for batch in batched(matched, QUEUE_BATCH_SIZE, strict=False):
+                        queued_count += _queue_new_releases(batch, console)
+                        _collect_latest(batch, bot_index, apps_data)
+                except GitHubAPIError as e:
+                    logger.log_error(e, LogLevel.ERROR)
+                    console.print(f"[red]✗ Error:[/red] {e.message}")
                     raise typer.Exit(code=1) from None
 
-                # Queue new releases for processing
-                queued_count = _queue_new_releases(source_releases, registry, console)
                 if queued_count > 0:
                     console.print(f"[green]✓[/green] Queued {queued_count} new release(s)")
 
-                # Fetch bot repo releases for download URLs
-                bot_result = get_github_data(f"/repos/{bot_repo}/releases?per_page=100")
-                bot_data = bot_result.unwrap() if not isinstance(bot_result, Failure) else []
-                bot_releases: list[dict[str, Any]] = bot_data if isinstance(bot_data, list) else []
-
-                # Build releases.json
-                apps_data = _build_releases_json(source_releases, bot_releases, registry, console)
-
-                # Save to releases.json
-                dist_dir = Path(paths.DIST_DIR)
-                dist_dir.mkdir(parents=True, exist_ok=True)
-                releases_file = dist_dir / "releases.json"
+                # Keep processed-ID storage bounded as the source repo's history grows
+                keep = config.database.get("processed_releases_keep", db.PROCESSED_RELEASES_KEEP)
+                compacted = db.compact_processed_releases(int(keep))
+                if isinstance(compacted, Failure):
+                    message = compacted.failure().message
+                    console.print(
+                        f"[yellow]⚠ Failed to compact processed releases:[/yellow] {message}"
+                    )
+
+                _attach_history(apps_data, bot_index)
+
+                # The catalog is what post and page read
+                catalog_result = db.replace_catalog(apps_data)
+                if isinstance(catalog_result, Failure):
+                    logger.log_error(catalog_result.failure(), LogLevel.ERROR)
+                    console.print(f"[red]✗ Error:[/red] {catalog_result.failure().message}")
+                    raise typer.Exit(code=1) from None
 
-                with releases_file.open("w") as f:
-                    json.dump(apps_data, f, indent=2)
+                # Export changed app shards for the published site
+                write_result = release_store.write_releases(apps_data)
+                if isinstance(write_result, Failure):
+                    logger.log_error(write_result.failure(), LogLevel.ERROR)
+                    console.print(f"[red]✗ Error:[/red] {write_result.failure().message}")
+                    raise typer.Exit(code=1) from None
+                stats = write_result.unwrap()
 
                 app_count = len(apps_data)
-                console.print(f"[green]✓[/green] Gathered {app_count} app(s) into releases.json")
+                console.print(
+                    f"[green]✓[/green] Gathered {app_count} app(s) "
+                    f"({len(stats.written)} changed, {len(stats.removed)} removed)"
+                )
 
         except Exception as e:
             error = BitBotError(f"Unexpected error: {e}")
@@ -1,7 +1,5 @@
 """Page command for BitBot CLI."""
 
-import json
-from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import typer
@@ -9,7 +7,7 @@ from beartype import beartype
 from returns.result import Failure
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from bitbot import paths
+from bitbot.core import db
 from bitbot.core.error_context import error_context
 from bitbot.core.error_logger import LogLevel
 from bitbot.core.errors import BitBotError
@@ -49,23 +47,17 @@ def run(
             ) as progress:
                 progress.add_task(description="Generating landing page...", total=None)
 
-                # Load releases data
-                releases_file = Path(paths.DIST_DIR) / "releases.json"
-                if not releases_file.exists():
-                    console.print("[yellow]⚠[/yellow] No releases.json found, creating empty one")
-                    releases_file.parent.mkdir(parents=True, exist_ok=True)
-                    with releases_file.open("w") as f:
-                        json.dump({}, f)
-
-                with releases_file.open() as f:
-                    all_releases_data = json.load(f)
-
-                if not isinstance(all_releases_data, dict):
-                    error = BitBotError("releases.json has invalid format")
+                # Load the release catalog (empty if gather has not run yet)
+                db.init(config.database)
+                load_result = db.get_catalog()
+                if isinstance(load_result, Failure):
+                    error = load_result.failure()
                     logger.log_error(error, LogLevel.ERROR)
                     console.print(f"[red]✗ Error:[/red] {error.message}")
                     raise typer.Exit(code=1) from None
 
+                all_releases_data = load_result.unwrap()
+
                 # Prepare data for template
                 releases_data: dict[str, Any] = {
                     "bot_repo": config.github.bot_repo,
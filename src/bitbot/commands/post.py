@@ -1,24 +1,23 @@
 """Post command for BitBot CLI.
 
 Architecture:
-- releases.json = what versions exist (from gather)
-- Local DB = what we've announced (our record)
+- Local DB catalog = what versions exist (from gather)
+- Local DB posted_versions = what we've announced (our record)
 - Reddit = output destination
 
 We do NOT parse versions from Reddit. Local DB is our announcement record.
 If state is wrong, use --reset to clear and re-announce.
 """
 
-import json
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING
 
 import praw
 import typer
 from beartype import beartype
-from returns.result import Failure, Success
+from returns.result import Failure
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
@@ -26,10 +25,11 @@ from bitbot import paths
 from bitbot.config_models import Config
 from bitbot.core import db
 from bitbot.core.credentials import get_reddit_username
+from bitbot.core.db import AccountState
 from bitbot.core.error_context import error_context
 from bitbot.core.error_logger import ErrorLogger, LogLevel
 from bitbot.core.errors import BitBotError
-from bitbot.reddit.client import init_reddit
+from bitbot.reddit.client import get_reddit
 from bitbot.reddit.posting.body_builder import generate_post_body
 from bitbot.reddit.posting.poster import post_new_release, update_post
 from bitbot.reddit.posting.title_generator import generate_dynamic_title
@@ -40,7 +40,8 @@ from bitbot.reddit.state import (
     compute_content_hash,
     verify_state,
 )
-from bitbot.types import Changelog, ReleaseInfo, ReleasesData, UpdatedReleaseInfo
+from bitbot.reddit.submissions import SubmissionCache
+from bitbot.types import Changelog, ReleasesData
 
 if TYPE_CHECKING:
     from bitbot.core.container import Container
@@ -50,37 +51,43 @@ app = typer.Typer()
 
 @beartype
 def _load_releases_data(console: Console, logger: ErrorLogger) -> ReleasesData:
-    """Load releases.json file."""
-    releases_file = Path(paths.DIST_DIR) / "releases.json"
-    if not releases_file.exists():
-        error = BitBotError("releases.json not found. Run 'bitbot gather' first.")
+    """Load release data from the catalog in the local DB."""
+    result = db.get_catalog()
+    if isinstance(result, Failure):
+        error = result.failure()
         logger.log_error(error, LogLevel.ERROR)
         console.print(f"[red]✗ Error:[/red] {error.message}")
         raise typer.Exit(code=1) from None
 
-    with releases_file.open() as f:
-        data = json.load(f)
-
-    if not isinstance(data, dict):
-        error = BitBotError("releases.json has invalid format")
+    releases_data = result.unwrap()
+    if not releases_data:
+        error = BitBotError("Release catalog is empty. Run 'bitbot gather' first.")
         logger.log_error(error, LogLevel.ERROR)
         console.print(f"[red]✗ Error:[/red] {error.message}")
         raise typer.Exit(code=1) from None
 
-    return data  # type: ignore[return-value]
+    return releases_data
 
 
 @beartype
 def _should_create_new_post(
-    reddit: praw.Reddit, existing_post_id: str | None, config: Config
+    submissions: SubmissionCache,
+    existing_post_id: str | None,
+    created_utc: float | None,
+    config: Config,
 ) -> bool:
-    """Check if enough time has passed to create a new post."""
+    """Check if enough time has passed to create a new post.
+
+    ``created_utc`` is the stored creation time of the post; the post is
+    only read from Reddit when it is unknown.
+    """
     if not existing_post_id:
         return True
 
     try:
-        submission = reddit.submission(id=existing_post_id)
-        post_created_at = datetime.fromtimestamp(submission.created_utc, tz=UTC)
+        if created_utc is None:
+            created_utc = submissions.get(existing_post_id).created_utc
+        post_created_at = datetime.fromtimestamp(created_utc, tz=UTC)
         time_elapsed = datetime.now(UTC) - post_created_at
         days_before_new = config.reddit.rolling.get("days_before_new_post", 7)
         return time_elapsed.total_seconds() >= days_before_new * 86400
@@ -90,40 +97,35 @@ def _should_create_new_post(
 
 
 @beartype
-def _build_changelog(
-    all_releases_data: ReleasesData, announced_versions: dict[str, str]
-) -> Changelog:
-    """Build changelog by comparing releases.json vs what we've announced."""
-    changelog: Changelog = {"added": {}, "updated": {}, "removed": {}}
-
-    # Current versions from releases.json
-    current: dict[str, ReleaseInfo] = {}
-    for app_id, app_data in all_releases_data.items():
-        latest = app_data.get("latest_release")
-        if latest:
-            current[app_id] = cast(
-                "ReleaseInfo",
-                {
-                    "display_name": app_data.get("display_name", app_id),
-                    "version": latest.get("version", "unknown"),
-                    "url": latest.get("download_url", ""),
-                },
-            )
-
-    # Compare with announced
-    for app_id, info in current.items():
-        if app_id not in announced_versions:
-            changelog["added"][app_id] = info
-        elif announced_versions[app_id] != info["version"]:
-            changelog["updated"][app_id] = cast(
-                "UpdatedReleaseInfo", {"new": info, "old": announced_versions[app_id]}
-            )
-
-    for app_id, old_ver in announced_versions.items():
-        if app_id not in current:
-            changelog["removed"][app_id] = {"display_name": app_id, "version": old_ver}
-
-    return changelog
+def _active_post_created(submissions: SubmissionCache, account: AccountState) -> float | None:
+    """Creation time of the account's active post, saved the first time it is read.
+
+    Accounts upgraded to schema v11 have none stored: their first run pays
+    one Reddit read and records it, later runs use the stored value.
+    """
+    post_id = account.meta["active_post_id"]
+    created_utc = account.meta["active_post_created_utc"]
+    if post_id is None or created_utc is not None:
+        return created_utc
+    try:
+        created_utc = float(submissions.get(post_id).created_utc)
+    except Exception:
+        # An unreadable post is rolled over instead
+        return None
+    account.update(active_post_created_utc=created_utc)
+    # Not fatal if unsaved: the next run just reads it again
+    account.flush()
+    return created_utc
+
+
+@beartype
+def _build_changelog(account_id: int) -> Changelog:
+    """Build changelog by comparing the catalog vs what the account announced."""
+    result = db.catalog_changelog(account_id)
+    if isinstance(result, Failure):
+        msg = f"DB error: {result.failure()}"
+        raise BitBotError(msg)
+    return result.unwrap()
 
 
 @beartype
@@ -152,7 +154,7 @@ class PostContext:
     config: Config
     page_url: str
     console: Console
-    account_id: int
+    account: AccountState
 
 
 @beartype
@@ -164,13 +166,19 @@ def _do_post(
     content_hash: str,
     active_post_id: str | None,
     force_update: bool = False,
+    *,
+    submissions: SubmissionCache,
+    new_post_due: bool,
 ) -> tuple[praw.models.Submission, bool, str] | None:
-    """Execute the post/update operation. Returns (submission, was_update, content_hash)."""
+    """Execute the post/update operation. Returns (submission, was_update, content_hash).
+
+    ``new_post_due`` is whether a rolling post is old enough to be replaced.
+    """
     # Decide: new post or update?
     if ctx.config.reddit.post_mode == "rolling_update" and active_post_id:
-        if force_update or not _should_create_new_post(reddit, active_post_id, ctx.config):
+        if force_update or not new_post_due:
             # Update existing
-            result = update_post(reddit, active_post_id, body, ctx.config)
+            result = update_post(reddit, active_post_id, body, ctx.config, submissions)
             if isinstance(result, Failure):
                 raise BitBotError(f"Failed to update post: {result.failure()}")
             return (result.unwrap(), True, content_hash)
@@ -179,16 +187,19 @@ def _do_post(
     result = post_new_release(reddit, title, body, ctx.config)
     if isinstance(result, Failure):
         raise BitBotError(f"Failed to create post: {result.failure()}")
+    submissions.add(result.unwrap())
     return (result.unwrap(), False, content_hash)
 
 
 @beartype
-def _verify_and_save(
+def _verify_and_save(  # noqa: PLR0913
     reddit: praw.Reddit,
     submission: praw.models.Submission,
     ctx: PostContext,
     releases_data: ReleasesData,
     content_hash: str,
+    *,
+    submissions: SubmissionCache | None = None,
 ) -> None:
     """Verify the post and save state."""
     # Validate after posting
@@ -198,21 +209,43 @@ def _verify_and_save(
         ctx.console.print(f"[{color}]POST {issue.severity.upper()}:[/{color}] {issue.message}")
 
     # Verify post is accessible
-    status = check_post_exists(reddit, submission.id)
+    status = check_post_exists(reddit, submission.id, submissions)
     if not status.accessible:
         ctx.console.print(f"[yellow]⚠ Warning: Post may not be visible[/yellow]")
         if status.removal_reason:
             ctx.console.print(f"[yellow]  Reason: {status.removal_reason}[/yellow]")
 
-    # Save state
-    db.update_account(ctx.account_id, active_post_id=submission.id, content_hash=content_hash)
-    db.add_post_id(ctx.account_id, submission.id)
-
-    # Update announced versions
-    for app_id, app_data in releases_data.items():
-        latest = app_data.get("latest_release")
-        if latest:
-            db.set_posted_version(ctx.account_id, app_id, latest.get("version", "unknown"))
+    # Save state and announced versions as one unit of work
+    announced = {
+        app_id: latest.get("version", "unknown")
+        for app_id, app_data in releases_data.items()
+        if (latest := app_data.get("latest_release"))
+    }
+    ctx.account.update(
+        active_post_id=submission.id,
+        active_post_created_utc=float(submission.created_utc),
+        content_hash=content_hash,
+    )
+    ctx.account.add_post_id(submission.id)
+    ctx.account.set_posted_versions(announced)
+    saved = ctx.account.flush()
+    if isinstance(saved, Failure):
+        raise saved.failure()
+
+    # Keep the published text searchable offline
+    indexed = db.index_documents(
+        [
+            {
+                "kind": db.KIND_POST,
+                "ref": submission.id,
+                "title": submission.title,
+                "body": submission.selftext,
+                "url": submission.url,
+            }
+        ]
+    )
+    if isinstance(indexed, Failure):
+        ctx.console.print(f"[yellow]⚠ Post not indexed for search:[/yellow] {indexed.failure()}")
 
 
 @beartype
@@ -259,17 +292,21 @@ def run(
                 task = progress.add_task(description="Initializing...", total=None)
 
                 # Initialize
-                db.init()
+                db.init(config.database)
                 username = get_reddit_username()
-                account_result = db.get_or_create_account(username, config.reddit.subreddit)
+                account_result = db.AccountState.load(username, config.reddit.subreddit)
                 if isinstance(account_result, Failure):
                     raise BitBotError(f"DB error: {account_result.failure()}")
-                account_id = account_result.unwrap()
+                account = account_result.unwrap()
 
                 # Handle reset
                 if reset:
                     progress.update(task, description="Resetting state...")
-                    db.reset_account_state(account_id)
+                    account.reset()
+                    reset_result = account.flush()
+                    if isinstance(reset_result, Failure):
+                        msg = f"DB error: {reset_result.failure()}"
+                        raise BitBotError(msg)
                     console.print("[green]✓[/green] State reset - all versions will be announced as new")
 
                 # Load data
@@ -279,34 +316,26 @@ def run(
                 if not page_url:
                     page_url = config.github.pages_url
 
-                # Get announced versions from local DB
-                versions_result = db.get_posted_versions(account_id)
-                announced = versions_result.unwrap() if isinstance(versions_result, Success) else {}
-
-                # Build changelog
-                changelog = _build_changelog(releases_data, announced)
+                # Diff the catalog against announced versions in the local DB
+                changelog = _build_changelog(account.account_id)
                 has_changes = _print_changelog(changelog, console)
 
                 # Init Reddit
                 progress.update(task, description="Connecting to Reddit...")
-                reddit_result = init_reddit(config)
+                reddit_result = get_reddit(config)
                 if isinstance(reddit_result, Failure):
                     raise BitBotError(f"Reddit error: {reddit_result.failure()}")
                 reddit = reddit_result.unwrap()
+                # Every step below shares one read of each submission
+                submissions = SubmissionCache(reddit)
 
                 # Get active post ID
-                meta_result = db.get_account(account_id)
-                active_post_id = None
-                stored_hash = None
-                if isinstance(meta_result, Success):
-                    meta = meta_result.unwrap()
-                    active_post_id = meta.get("active_post_id")
-                    stored_hash = meta.get("content_hash")
+                active_post_id = account.meta["active_post_id"]
 
                 # Verify state if requested
                 if verify and active_post_id:
                     progress.update(task, description="Verifying Reddit state...")
-                    state_check = verify_state(reddit, account_id)
+                    state_check = verify_state(reddit, account.meta, submissions=submissions)
 
                     if state_check.issues:
                         for issue in state_check.issues:
@@ -320,15 +349,20 @@ def run(
                 needs_refresh = False
                 if refresh and active_post_id:
                     progress.update(task, description="Checking content...")
-                    post_ctx = PostContext(config, page_url, console, account_id)
+                    post_ctx = PostContext(config, page_url, console, account)
                     expected_body = generate_post_body(config, changelog, releases_data, page_url)
                     expected_hash = compute_content_hash(expected_body)
 
-                    status = check_post_exists(reddit, active_post_id)
+                    status = check_post_exists(reddit, active_post_id, submissions)
                     if status.current_hash and status.current_hash != expected_hash:
                         console.print("[cyan]→[/cyan] Content differs - will refresh")
                         needs_refresh = True
 
+                # Roll over by the stored creation time, without a Reddit read
+                new_post_due = _should_create_new_post(
+                    submissions, active_post_id, _active_post_created(submissions, account), config
+                )
+
                 # Decide if we should post
                 should_post = has_changes or force or needs_refresh
 
@@ -366,7 +400,7 @@ def run(
 
 **Content Hash:** {content_hash}
 
-**Would {'UPDATE' if active_post_id and not _should_create_new_post(reddit, active_post_id, config) else 'CREATE NEW'} post**
+**Would {'UPDATE' if active_post_id and not new_post_due else 'CREATE NEW'} post**
 
 ---
 
@@ -395,7 +429,7 @@ def run(
 
                 # Do the actual post
                 progress.update(task, description="Posting to Reddit...")
-                post_ctx = PostContext(config, page_url, console, account_id)
+                post_ctx = PostContext(config, page_url, console, account)
 
                 result = _do_post(
                     reddit,
@@ -405,6 +439,8 @@ def run(
                     content_hash,
                     active_post_id,
                     force_update=needs_refresh,
+                    submissions=submissions,
+                    new_post_due=new_post_due,
                 )
 
                 if result is None:
@@ -415,7 +451,14 @@ def run(
 
                 # Verify and save
                 progress.update(task, description="Verifying and saving...")
-                _verify_and_save(reddit, submission, post_ctx, releases_data, content_hash)
+                _verify_and_save(
+                    reddit,
+                    submission,
+                    post_ctx,
+                    releases_data,
+                    content_hash,
+                    submissions=submissions,
+                )
 
                 # Report success
                 if was_update:
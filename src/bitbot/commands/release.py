@@ -1,17 +1,20 @@
 """Release command for BitBot CLI."""
 
 import hashlib
+import os
+import socket
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import typer
 from beartype import beartype
-from returns.result import Failure
+from returns.result import Failure, Success
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from bitbot.core import db
 from bitbot.core.app_registry import AppRegistry
 from bitbot.core.db import PendingRelease
+from bitbot.core.db.queue import STATUS_DEAD
 from bitbot.core.error_context import error_context
 from bitbot.core.error_logger import LogLevel
 from bitbot.core.errors import BitBotError
@@ -36,8 +39,8 @@ def process_single_release(  # noqa: PLR0913
     default_asset: str,
     console: "Console",
     registry: AppRegistry,
-) -> tuple[bool, list[Path]]:
-    """Process a single release. Returns (success, downloaded_files)."""
+) -> tuple[bool, list[Path], str | None]:
+    """Process a single release. Returns (success, downloaded_files, error)."""
     app_id = release["app_id"]
     app_name = release["display_name"]
     version = release["version"]
@@ -48,16 +51,15 @@ def process_single_release(  # noqa: PLR0913
 
     # Validate app_id exists in config
     if not registry.exists(app_id):
-        console.print(
-            f"[red]✗[/red] {app_name}: Unknown app_id '{app_id}'. Valid: {', '.join(registry.ids)}"
-        )
-        return (False, downloaded_files)
+        error = f"Unknown app_id '{app_id}'. Valid: {', '.join(registry.ids)}"
+        console.print(f"[red]✗[/red] {app_name}: {error}")
+        return (False, downloaded_files, error)
 
     # Download
     download_result = download_asset(source_repo, release_id, asset_name)
     if isinstance(download_result, Failure):
         console.print(f"[red]✗[/red] {app_name}: {download_result.failure()}")
-        return (False, downloaded_files)
+        return (False, downloaded_files, str(download_result.failure()))
 
     # Patch
     original_path = download_result.unwrap()
@@ -65,7 +67,7 @@ def process_single_release(  # noqa: PLR0913
     patch_result = patch_file(str(original_path), asset_name)
     if isinstance(patch_result, Failure):
         console.print(f"[red]✗[/red] {app_name}: {patch_result.failure()}")
-        return (False, downloaded_files)
+        return (False, downloaded_files, str(patch_result.failure()))
 
     # Create release with canonical app_id from registry
     matched_app = registry.get_or_raise(app_id)
@@ -83,10 +85,10 @@ def process_single_release(  # noqa: PLR0913
     create_result = create_bot_release(bot_repo, release_tag, title, notes, patched_path)
     if isinstance(create_result, Failure):
         console.print(f"[red]✗[/red] {app_name}: {create_result.failure()}")
-        return (False, downloaded_files)
+        return (False, downloaded_files, str(create_result.failure()))
 
     console.print(f"[green]✓[/green] {app_name} {version}")
-    return (True, downloaded_files)
+    return (True, downloaded_files, None)
 
 
 @beartype
@@ -113,42 +115,65 @@ def run(ctx: typer.Context) -> None:
                 default_asset = config.github.asset_file_name
 
                 # Initialize database
-                db.init()
-
-                # Load pending releases
-                queue_result = db.get_pending_releases()
-                if isinstance(queue_result, Failure):
-                    error = BitBotError(f"Queue error: {queue_result.failure()}")
-                    logger.log_error(error, LogLevel.ERROR)
-                    console.print(f"[red]✗ Error:[/red] {queue_result.failure()}")
-                    raise typer.Exit(code=1) from None
-
-                pending = queue_result.unwrap()
+                db.init(config.database)
 
-                if not pending:
-                    console.print("[yellow][i] No pending releases to process[/yellow]")
-                    return
+                settings_result = db.queue_settings(config.queue)
+                if isinstance(settings_result, Failure):
+                    logger.log_error(settings_result.failure(), LogLevel.ERROR)
+                    console.print(f"[red]✗ Error:[/red] {settings_result.failure()}")
+                    raise typer.Exit(code=1) from None
+                settings = settings_result.unwrap()
+                worker_id = f"{socket.gethostname()}:{os.getpid()}"
 
-                # Process each release
+                # Claim due releases until none are left; other workers may run concurrently
                 success_count = 0
                 fail_count = 0
                 all_downloaded_files: list[Path] = []
 
-                for release in pending:
-                    desc = f"Processing {release['display_name']} {release['version']}..."
-                    progress.update(task, description=desc)
-
-                    success, downloaded_files = process_single_release(
-                        release, source_repo, bot_repo, default_asset, console, registry
-                    )
-                    all_downloaded_files.extend(downloaded_files)
-
-                    if success:
-                        success_count += 1
-                        # Remove from queue on success
-                        db.remove_pending_release(release["release_id"])
-                    else:
-                        fail_count += 1
+                while True:
+                    claim_result = db.claim_next(settings.claim_batch, worker_id, settings)
+                    if isinstance(claim_result, Failure):
+                        error = BitBotError(f"Queue error: {claim_result.failure()}")
+                        logger.log_error(error, LogLevel.ERROR)
+                        console.print(f"[red]✗ Error:[/red] {claim_result.failure()}")
+                        raise typer.Exit(code=1) from None
+                    claimed = claim_result.unwrap()
+                    if not claimed:
+                        break
+
+                    for release in claimed:
+                        # Renew the lease; later items in a batch may wait a while
+                        still_held = db.heartbeat(release["release_id"], worker_id, settings)
+                        if isinstance(still_held, Success) and not still_held.unwrap():
+                            continue
+
+                        desc = f"Processing {release['display_name']} {release['version']}..."
+                        progress.update(task, description=desc)
+
+                        success, downloaded_files, failure = process_single_release(
+                            release, source_repo, bot_repo, default_asset, console, registry
+                        )
+                        all_downloaded_files.extend(downloaded_files)
+
+                        if success:
+                            success_count += 1
+                            completed = db.complete_release(release["release_id"], worker_id)
+                            if isinstance(completed, Failure):
+                                logger.log_error(completed.failure(), LogLevel.WARNING)
+                        else:
+                            fail_count += 1
+                            status = db.fail_release(
+                                release["release_id"],
+                                worker_id,
+                                failure or "Release failed",
+                                settings,
+                            )
+                            if isinstance(status, Success) and status.unwrap() == STATUS_DEAD:
+                                console.print(
+                                    f"[red]✗[/red] {release['display_name']} "
+                                    f"{release['version']}: giving up after "
+                                    f"{release['attempts']} attempt(s)"
+                                )
 
                 # Clean up downloaded files
                 for file_path in all_downloaded_files:
@@ -158,8 +183,10 @@ def run(ctx: typer.Context) -> None:
                     except OSError:
                         pass
 
-                total = len(pending)
-                if success_count == 0:
+                total = success_count + fail_count
+                if total == 0:
+                    console.print("[yellow][i] No pending releases to process[/yellow]")
+                elif success_count == 0:
                     console.print(f"[red]✗[/red] All {total} releases failed")
                 elif fail_count > 0:
                     msg = f"{success_count}/{total} succeeded ({fail_count} failed, will retry)"
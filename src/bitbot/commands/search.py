@@ -0,0 +1,115 @@
+"""Search command for BitBot CLI.
+
+Queries the local full-text index of release notes (fed by ``gather``) and
+published posts (fed by ``post`` and ``sync``). Runs entirely offline.
+"""
+
+import json
+import time
+from enum import StrEnum
+from typing import TYPE_CHECKING
+
+import typer
+from beartype import beartype
+from returns.result import Failure
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+from bitbot.core import db
+from bitbot.core.db import SearchHit
+from bitbot.core.db.search import HIGHLIGHT_END, HIGHLIGHT_START
+from bitbot.core.error_context import error_context
+from bitbot.core.error_logger import LogLevel
+from bitbot.core.errors import BitBotError
+
+if TYPE_CHECKING:
+    from bitbot.config_models import Config
+    from bitbot.core.container import Container
+
+app = typer.Typer()
+
+
+class DocumentKind(StrEnum):
+    """Kinds of indexed documents."""
+
+    RELEASE = db.KIND_RELEASE
+    POST = db.KIND_POST
+
+
+@beartype
+def _highlight(snippet: str) -> str:
+    """Render snippet match markers as Rich markup."""
+    text = escape(" ".join(snippet.split()))
+    return text.replace(HIGHLIGHT_START, "[bold yellow]").replace(HIGHLIGHT_END, "[/bold yellow]")
+
+
+@beartype
+def print_hits(hits: list[SearchHit], elapsed_ms: float, console: Console) -> None:
+    """Print ranked hits as a table."""
+    table = Table(title_justify="left")
+    table.add_column("#", justify="right")
+    table.add_column("Kind")
+    table.add_column("Document", overflow="fold")
+    table.add_column("Match", overflow="fold")
+    for i, hit in enumerate(hits, 1):
+        name = escape(hit["title"] or hit["ref"])
+        if hit["url"]:
+            name += f"\n[dim]{escape(hit['url'])}[/dim]"
+        table.add_row(str(i), hit["kind"], name, _highlight(hit["snippet"]))
+    table.caption = f"{len(hits)} result(s) in {elapsed_ms:.1f} ms"
+    console.print(table)
+
+
+@beartype
+@app.command()
+def run(  # noqa: PLR0913, PLR0917
+    ctx: typer.Context,
+    query: str = typer.Argument(help="Words to find (all must match)"),
+    kind: DocumentKind | None = typer.Option(None, "--kind", "-k", help="Only this kind"),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Maximum results"),
+    raw: bool = typer.Option(  # noqa: FBT001
+        default=False, help="Treat the query as FTS5 syntax (AND/OR/NEAR, prefix*)"
+    ),
+    as_json: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--json",
+        help="Print results as JSON",
+    ),
+) -> None:
+    """Search indexed release notes and posts, best matches first."""
+    container: Container = ctx.obj["container"]
+    console: Console = container.console()
+    logger = container.logger()
+    config: Config = container.config()
+
+    with error_context(command="search", query=query):
+        try:
+            db.init(config.database)
+            start = time.perf_counter()
+            result = db.search(query, kind.value if kind else None, limit, raw=raw)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if isinstance(result, Failure):
+                raise BitBotError(str(result.failure().message))
+            hits = result.unwrap()
+
+            if as_json:
+                console.print_json(json.dumps(hits))
+            elif not hits:
+                console.print(f"[dim]No matches for {escape(query)!r}[/dim]")
+            else:
+                print_hits(hits, elapsed_ms, console)
+
+        except BitBotError as e:
+            logger.log_error(e, LogLevel.ERROR)
+            console.print(f"[red]✗ Error:[/red] {e.message}")
+            raise typer.Exit(code=1) from None
+        except Exception as e:
+            error = BitBotError(f"Unexpected error: {e}")
+            logger.log_error(error, LogLevel.CRITICAL)
+            console.print(f"[red]✗ Error:[/red] {e}")
+            raise typer.Exit(code=1) from None
+
+
+if __name__ == "__main__":
+    app()
@@ -7,9 +7,11 @@ for what we've announced.
 
 from typing import TYPE_CHECKING
 
+import praw
 import typer
 from beartype import beartype
 from returns.result import Failure, Success
+from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from bitbot.core import db
@@ -17,17 +19,39 @@ from bitbot.core.credentials import get_reddit_username
 from bitbot.core.error_context import error_context
 from bitbot.core.error_logger import LogLevel
 from bitbot.core.errors import BitBotError
-from bitbot.reddit.client import init_reddit
-from bitbot.reddit.state import get_current_post, verify_state
+from bitbot.reddit.client import get_reddit
+from bitbot.reddit.state import PostStatus, get_current_post, verify_posts, verify_state
 
 if TYPE_CHECKING:
-    from rich.console import Console
-
     from bitbot.core.container import Container
 
 app = typer.Typer()
 
 
+@beartype
+def _report_history(
+    reddit: praw.Reddit, username: str, post_ids: list[str], console: Console
+) -> dict[str, PostStatus]:
+    """Verify every post the account made and list those no longer visible.
+
+    Returns the statuses, so the active post need not be fetched again.
+    """
+    result = verify_posts(reddit, username, post_ids)
+    if isinstance(result, Failure):
+        msg = f"Reddit error: {result.failure()}"
+        raise BitBotError(msg)
+    statuses = result.unwrap()
+
+    console.print(f"\n[bold]Post History:[/bold] {len(statuses)} posts checked")
+    hidden = [status for status in statuses.values() if not status.accessible]
+    for status in hidden:
+        reason = status.removal_reason if status.exists else "no longer exists"
+        console.print(f"  ⚠ {status.post_id}: {reason}")
+    if not hidden:
+        console.print("  [green]✓[/green] All posts visible")
+    return statuses
+
+
 @beartype
 @app.command()
 def run(
@@ -35,6 +59,11 @@ def run(
     fix: bool = typer.Option(  # noqa: FBT001
         default=False, help="Auto-fix issues (clear invalid post ID)"
     ),
+    all_posts: bool = typer.Option(  # noqa: FBT001
+        False,  # noqa: FBT003
+        "--all",
+        help="Also verify every post in the account's history (100 per request)",
+    ),
 ) -> None:
     """Verify Reddit state and report issues.
 
@@ -43,7 +72,8 @@ def run(
     - Is it accessible (not removed)?
     - Does content hash match what we stored?
 
-    Use --fix to automatically clear invalid state.
+    Use --fix to automatically clear invalid state. With --all, every post
+    the account has made is checked for removal as well.
     """
     with error_context(operation="sync"):
         try:
@@ -60,30 +90,23 @@ def run(
                 progress.add_task(description="Verifying Reddit state...", total=None)
 
                 # Initialize
-                db.init()
+                db.init(config.database)
                 username = get_reddit_username()
-                account_result = db.get_or_create_account(username, config.reddit.subreddit)
+                account_result = db.AccountState.load(username, config.reddit.subreddit)
                 if isinstance(account_result, Failure):
                     raise BitBotError(f"DB error: {account_result.failure()}")
-                account_id = account_result.unwrap()
+                account = account_result.unwrap()
 
                 # Init Reddit
-                reddit_result = init_reddit(config)
+                reddit_result = get_reddit(config)
                 if isinstance(reddit_result, Failure):
                     raise BitBotError(f"Reddit error: {reddit_result.failure()}")
                 reddit = reddit_result.unwrap()
 
-                # Get local state
-                meta_result = db.get_account(account_id)
-                if isinstance(meta_result, Failure):
-                    raise BitBotError(f"Failed to get account: {meta_result.failure()}")
-
-                meta = meta_result.unwrap()
-                active_post_id = meta.get("active_post_id")
-                stored_hash = meta.get("content_hash")
-
-                versions_result = db.get_posted_versions(account_id)
-                announced = versions_result.unwrap() if isinstance(versions_result, Success) else {}
+                # Local state was loaded as one consistent snapshot
+                active_post_id = account.meta["active_post_id"]
+                stored_hash = account.meta["content_hash"]
+                announced = account.posted_versions
 
                 # Report local state
                 console.print("\n[bold]Local State:[/bold]")
@@ -93,13 +116,19 @@ def run(
                 for app_id, version in sorted(announced.items()):
                     console.print(f"    - {app_id}: v{version}")
 
+                statuses: dict[str, PostStatus] = {}
+                if all_posts:
+                    statuses = _report_history(reddit, username, account.post_ids, console)
+
                 if not active_post_id:
                     console.print("\n[green]✓[/green] No active post - state is clean")
                     return
 
                 # Verify against Reddit
                 console.print("\n[bold]Reddit State:[/bold]")
-                state_check = verify_state(reddit, account_id)
+                state_check = verify_state(
+                    reddit, account.meta, active_status=statuses.get(active_post_id)
+                )
 
                 if state_check.post_ok:
                     console.print(f"  Post exists: [green]Yes[/green]")
@@ -124,7 +153,13 @@ def run(
                         console.print("\n[bold]Fixing issues...[/bold]")
                         if not state_check.post_ok:
                             # Clear invalid post ID
-                            db.update_account(account_id, active_post_id="", content_hash="")
+                            account.update(
+                                active_post_id=None, active_post_created_utc=None, content_hash=None
+                            )
+                            cleared = account.flush()
+                            if isinstance(cleared, Failure):
+                                msg = f"Failed to clear post ID: {cleared.failure()}"
+                                raise BitBotError(msg)
                             console.print("  [green]✓[/green] Cleared invalid post ID")
                         console.print("\n[green]✓[/green] Issues fixed - run 'post' to create new post")
                     else:
@@ -1,5 +1,6 @@
 """Typed configuration models."""
 
+import re
 from typing import Any
 
 from beartype import beartype
@@ -117,6 +118,10 @@ class RedditConfig(BaseModel):
         return v
 
 
+# Regex syntax that older configs used in keywords; keywords now match literally
+_KEYWORD_REGEX_SYNTAX = re.compile(r"[\\^$*+?{}\[\]()|]")
+
+
 class Config(BaseModel):
     """Main configuration."""
 
@@ -134,6 +139,21 @@ class Config(BaseModel):
     parsing: dict[str, str] = Field(default_factory=dict)
     messages: dict[str, str] = Field(default_factory=dict)
     timing: dict[str, int] = Field(default_factory=dict)
+    database: dict[str, Any] = Field(default_factory=dict)
+    queue: dict[str, Any] = Field(default_factory=dict)
+    daemon: dict[str, Any] = Field(default_factory=dict)
+
+    @field_validator("feedback")
+    @classmethod
+    @beartype
+    def validate_feedback_keywords(cls, v: dict[str, Any]) -> dict[str, Any]:
+        """Validate feedback keywords are plain text, not regular expressions."""
+        for key in ("workingKeywords", "notWorkingKeywords"):
+            for keyword in v.get(key, []):
+                if _KEYWORD_REGEX_SYNTAX.search(keyword):
+                    msg = f"{key} entry {keyword!r} looks like a regex; keywords match literally"
+                    raise ValueError(msg)
+        return v
 
     @field_validator("safety", "timing")
     @classmethod
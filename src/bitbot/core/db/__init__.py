@@ -2,14 +2,27 @@
 
 from __future__ import annotations
 
+import atexit
+import contextlib
 import sqlite3
-from collections.abc import Iterator  # noqa: TC003
+import threading
+from collections.abc import Iterator, Mapping  # noqa: TC003
 from contextlib import contextmanager
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from typing import Any
 
 from beartype import beartype
 from returns.result import Failure, Result, Success
 
 from bitbot import paths
+from bitbot.core.db.memory import (
+    JournalingConnection,
+    MemoryStore,
+    ProfilingJournalingConnection,
+)
+from bitbot.core.db.migrations import SCHEMA_VERSION, current_version, migrate
+from bitbot.core.db.profiler import ProfilingConnection, QueryProfiler
 from bitbot.core.errors import StateError
 
 DB_PATH = paths.DATABASE_FILE
@@ -20,92 +33,334 @@ def db_fail(msg: str, e: sqlite3.Error) -> Failure[StateError]:
     return Failure(StateError(f"{msg}: {e}"))
 
 
-_SCHEMA = """
-CREATE TABLE IF NOT EXISTS offline_versions (
-    app_id TEXT PRIMARY KEY,
-    version TEXT NOT NULL
-);
-
-CREATE TABLE IF NOT EXISTS processed_releases (
-    release_id INTEGER PRIMARY KEY
-);
-
-CREATE TABLE IF NOT EXISTS pending_releases (
-    release_id INTEGER PRIMARY KEY,
-    app_id TEXT NOT NULL,
-    display_name TEXT NOT NULL,
-    version TEXT NOT NULL,
-    tag TEXT NOT NULL,
-    asset_name TEXT
-);
-
-CREATE TABLE IF NOT EXISTS accounts (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    username TEXT NOT NULL,
-    subreddit TEXT NOT NULL,
-    active_post_id TEXT,
-    last_check_timestamp TEXT,
-    check_interval_seconds INTEGER,
-    last_comment_count INTEGER DEFAULT 0,
-    content_hash TEXT,
-    UNIQUE(username, subreddit)
-);
-
-CREATE TABLE IF NOT EXISTS posted_versions (
-    account_id INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
-    app_id TEXT NOT NULL,
-    version TEXT NOT NULL,
-    PRIMARY KEY (account_id, app_id)
-);
-
-CREATE TABLE IF NOT EXISTS post_ids (
-    post_id TEXT PRIMARY KEY,
-    account_id INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE
-);
-"""
-
-# Migration to add content_hash column if missing
-_MIGRATIONS = [
-    "ALTER TABLE accounts ADD COLUMN content_hash TEXT",
-]
+@dataclass(frozen=True)
+class ConnectionSettings:
+    """Tunables applied once when a pooled connection is opened."""
+
+    cache_size: int = -8000  # Page cache; negative values are KiB (8 MiB)
+    mmap_size: int = 64 * 1024 * 1024  # Memory-mapped I/O in bytes (0 disables)
+    synchronous: str = "NORMAL"  # Safe with WAL; FULL fsyncs on every commit
+    busy_timeout: float = 30.0  # Seconds to wait on a locked database
+    cached_statements: int = 256  # Prepared statements kept per connection
+    memory: bool = False  # Run against an in-memory copy, written back at exit/checkpoint
+
+
+_SYNCHRONOUS_MODES = frozenset({"OFF", "NORMAL", "FULL", "EXTRA"})
+
+_settings = ConnectionSettings()
+_local = threading.local()
+_pool_lock = threading.Lock()
+# Every open connection, with the thread it belongs to
+_pool: dict[sqlite3.Connection, threading.Thread] = {}
+# Bumped whenever connections must be reopened; each thread's connection
+# remembers the generation it was opened in
+_generation = 0
+_profiler: QueryProfiler | None = None
+_store_lock = threading.Lock()
+_store: MemoryStore | None = None
 
 
-@contextmanager
 @beartype
-def conn() -> Iterator[sqlite3.Connection]:
-    """Database connection context manager with auto-commit."""
-    connection = sqlite3.connect(DB_PATH, timeout=30.0)
+def configure(options: Mapping[str, Any] | None = None) -> Result[None, StateError]:
+    """Set connection tunables (from the ``[database]`` config section).
+
+    Unknown keys are ignored so the section can hold settings for other
+    subsystems. Every thread's pooled connection is reopened with the new
+    settings on its next use.
+    """
+    global _settings  # noqa: PLW0603
+    known = {f.name for f in fields(ConnectionSettings)}
+    updates = {k: v for k, v in (options or {}).items() if k in known}
+    synchronous = str(updates.get("synchronous", _settings.synchronous)).upper()
+    if synchronous not in _SYNCHRONOUS_MODES:
+        return Failure(StateError(f"Invalid synchronous mode: {synchronous}"))
+    updates["synchronous"] = synchronous
+    try:
+        new_settings = replace(_settings, **updates)
+    except TypeError as e:
+        return Failure(StateError(f"Invalid database settings: {e}"))
+    if new_settings != _settings:
+        _settings = new_settings
+        _invalidate_connections()
+        if not new_settings.memory:
+            with contextlib.suppress(sqlite3.Error, OSError):
+                _close_store()
+    return Success(None)
+
+
+@beartype
+def enable_profiling() -> QueryProfiler:
+    """Start profiling statements on every pooled connection.
+
+    Connections are reopened on their next use so they are profiled too.
+    Returns the active profiler (an existing one is kept).
+    """
+    global _profiler  # noqa: PLW0603
+    if _profiler is None:
+        _profiler = QueryProfiler()
+        _invalidate_connections()
+    return _profiler
+
+
+@beartype
+def disable_profiling() -> None:
+    """Stop profiling; pooled connections are reopened on their next use."""
+    global _profiler  # noqa: PLW0603
+    if _profiler is not None:
+        _profiler = None
+        _invalidate_connections()
+
+
+@beartype
+def get_profiler() -> QueryProfiler | None:
+    """Return the active profiler, if profiling is enabled."""
+    return _profiler
+
+
+@beartype
+def _open(
+    path: str | Path, settings: ConnectionSettings, store: MemoryStore | None = None
+) -> sqlite3.Connection:
+    """Open a connection and apply PRAGMAs once."""
+    profiler = _profiler
+    factory: type[sqlite3.Connection] = sqlite3.Connection
+    if store is not None:
+        factory = JournalingConnection if profiler is None else ProfilingJournalingConnection
+    elif profiler is not None:
+        factory = ProfilingConnection
+    connection = sqlite3.connect(
+        store.uri if store is not None else path,
+        timeout=settings.busy_timeout,
+        cached_statements=settings.cached_statements,
+        check_same_thread=False,  # Owned by one thread; closed from another after it ends
+        factory=factory,
+        uri=store is not None,
+    )
+    if isinstance(connection, ProfilingConnection) and profiler is not None:
+        connection.attach(profiler)
+    if isinstance(connection, JournalingConnection) and store is not None:
+        connection.attach_store(store)
     connection.row_factory = sqlite3.Row
-    connection.execute("PRAGMA journal_mode=WAL")
+    if store is None:
+        connection.execute("PRAGMA journal_mode=WAL")
     connection.execute("PRAGMA foreign_keys=ON")
+    connection.execute(f"PRAGMA synchronous={settings.synchronous}")
+    connection.execute(f"PRAGMA cache_size={int(settings.cache_size)}")
+    connection.execute(f"PRAGMA mmap_size={int(settings.mmap_size)}")
+    return connection
+
+
+@beartype
+def _memory_store(path: str | Path) -> MemoryStore:
+    """Return the loaded in-memory copy of ``path``, loading it on first use."""
+    global _store  # noqa: PLW0603
+    with _store_lock:
+        if _store is not None and _store.path == Path(path):
+            return _store
+        old, _store = _store, None
+        if old is not None:
+            _write_back(old)
+        store = MemoryStore(Path(path), fsync=_settings.synchronous in {"FULL", "EXTRA"})
+        store.load()
+        _store = store
+        return store
+
+
+@beartype
+def _write_back(store: MemoryStore) -> None:
+    """Checkpoint a store to disk and release it."""
+    try:
+        store.checkpoint()
+    finally:
+        store.close()
+
+
+@beartype
+def _close_store() -> None:
+    """Write the in-memory database back to disk and release it."""
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+        if store is not None:
+            _write_back(store)
+
+
+@beartype
+def _invalidate_connections() -> None:
+    """Make every thread reopen its pooled connection, this thread's right away."""
+    global _generation  # noqa: PLW0603
+    with _pool_lock:
+        _generation += 1
+    _drop_thread_connection()
+
+
+@beartype
+def _drop_thread_connection() -> None:
+    """Close this thread's pooled connection, if any."""
+    cached = getattr(_local, "connection", None)
+    if cached is None:
+        return
+    _local.connection = None
+    connection = cached[-1]
+    with _pool_lock:
+        _pool.pop(connection, None)
+    connection.close()
+
+
+@beartype
+def get_connection() -> sqlite3.Connection:
+    """Return this thread's long-lived connection to ``DB_PATH``.
+
+    The connection is opened on first use and reused afterwards; if
+    ``DB_PATH`` or the settings changed since, the old connection is closed
+    first (but never inside a transaction, which finishes on it).
+    """
+    path = DB_PATH
+    generation = _generation
+    cached = getattr(_local, "connection", None)
+    if (
+        cached is not None
+        and cached[0] == path
+        and (cached[1] == generation or getattr(_local, "tx_depth", 0))
+    ):
+        return cached[2]
+
+    _drop_thread_connection()
+    store = _memory_store(path) if _settings.memory else None
+    opened = _open(path, _settings, store)
+    _local.connection = (path, generation, opened)
+    with _pool_lock:
+        # Threads that ended without pooled_db() cannot close their own
+        orphans = [c for c, thread in _pool.items() if not thread.is_alive()]
+        for orphan in orphans:
+            del _pool[orphan]
+        _pool[opened] = threading.current_thread()
+    for orphan in orphans:
+        with contextlib.suppress(sqlite3.Error):
+            orphan.close()
+    return opened
+
+
+@contextmanager
+def pooled_db() -> Iterator[None]:
+    """Close the connection this thread opens inside the block on exit.
+
+    Wrap each job run on a short-lived worker thread, so its connection
+    does not outlive the job.
+    """
+    held = getattr(_local, "connection", None)
+    try:
+        yield
+    finally:
+        if held is None and not getattr(_local, "tx_depth", 0):
+            _drop_thread_connection()
+
+
+@beartype
+def checkpoint() -> Result[bool, StateError]:
+    """Write the in-memory database back to disk now.
+
+    Returns False when memory mode is off. Must not be called inside
+    ``transaction()``, since it waits for open write transactions.
+    """
+    store = _store
+    if store is None:
+        return Success(False)  # noqa: FBT003
+    if getattr(_local, "tx_depth", 0):
+        return Failure(StateError("Cannot checkpoint inside a transaction"))
+    try:
+        store.checkpoint()
+    except (sqlite3.Error, OSError) as e:
+        return Failure(StateError(f"Failed to checkpoint in-memory database: {e}"))
+    return Success(True)  # noqa: FBT003
+
+
+@beartype
+def close() -> None:
+    """Close every pooled connection (registered to run at exit).
+
+    In memory mode the database is written back to disk first; if that
+    fails, the statement journal still holds every committed write.
+    """
+    _local.connection = None
+    with _pool_lock:
+        connections = list(_pool)
+        _pool.clear()
+    for connection in connections:
+        with contextlib.suppress(sqlite3.Error):
+            connection.close()
+    with contextlib.suppress(sqlite3.Error, OSError):
+        _close_store()
+
+
+atexit.register(close)
+
+
+@contextmanager
+@beartype
+def conn() -> Iterator[sqlite3.Connection]:
+    """Pooled database connection context manager with auto-commit.
+
+    Inside ``transaction()`` the commit (or rollback) is deferred to the
+    enclosing unit of work.
+    """
+    connection = get_connection()
+    if getattr(_local, "tx_depth", 0):
+        yield connection
+        return
     try:
         yield connection
         connection.commit()
     except Exception:
         connection.rollback()
         raise
-    finally:
-        connection.close()
 
 
+@contextmanager
 @beartype
-def _run_migrations(c: sqlite3.Connection) -> None:
-    """Run schema migrations."""
-    for migration in _MIGRATIONS:
-        try:
-            c.execute(migration)
-        except sqlite3.OperationalError:
-            # Column already exists or migration already applied
-            pass
+def transaction() -> Iterator[sqlite3.Connection]:
+    """Unit of work that batches any mix of db calls into one atomic commit.
+
+    Every ``conn()`` use on this thread joins the transaction until the
+    outermost block exits. Raising inside the block rolls everything back;
+    a ``Failure`` returned by an inner call does not, so check results and
+    raise to abort. Nested blocks join the outer one.
+    """
+    connection = get_connection()
+    depth = getattr(_local, "tx_depth", 0)
+    if depth == 0 and not connection.in_transaction:
+        connection.execute("BEGIN IMMEDIATE")
+    _local.tx_depth = depth + 1
+    try:
+        yield connection
+    except BaseException:
+        _local.tx_depth = depth
+        if depth == 0:
+            connection.rollback()
+        raise
+    _local.tx_depth = depth
+    if depth == 0:
+        connection.commit()
 
 
 @beartype
-def init() -> Result[None, StateError]:
-    """Initialize database schema."""
+def init(options: Mapping[str, Any] | None = None) -> Result[None, StateError]:
+    """Initialize the database, applying connection settings first if given.
+
+    An up-to-date database costs a single ``PRAGMA user_version`` read;
+    otherwise only the missing migrations are applied.
+    """
+    if options is not None:
+        configured = configure(options)
+        if isinstance(configured, Failure):
+            return configured
     try:
-        with conn() as c:
-            c.executescript(_SCHEMA)
-            _run_migrations(c)
+        connection = get_connection()
+        if current_version(connection) == SCHEMA_VERSION:
+            return Success(None)
+        migrated = migrate(connection)
+        if isinstance(migrated, Failure):
+            return Failure(migrated.failure())
         return Success(None)
     except sqlite3.Error as e:
         return db_fail("DB init failed", e)
@@ -129,7 +384,9 @@ def reset_account_state(account_id: int) -> Result[None, StateError]:
         with conn() as c:
             c.execute("DELETE FROM posted_versions WHERE account_id = ?", (account_id,))
             c.execute(
-                "UPDATE accounts SET active_post_id = NULL, content_hash = NULL WHERE id = ?",
+                """UPDATE accounts SET active_post_id = NULL, active_post_created_utc = NULL,
+                          content_hash = NULL
+                   WHERE id = ?""",
                 (account_id,),
             )
         return Success(None)
@@ -139,49 +396,155 @@ def reset_account_state(account_id: int) -> Result[None, StateError]:
 
 from bitbot.core.db.accounts import (  # noqa: E402
     AccountMeta,
+    AccountState,
+    ActiveAccount,
     add_post_id,
     export_account_json,
     get_account,
+    get_active_accounts,
     get_or_create_account,
     get_post_ids,
     get_posted_versions,
     set_posted_version,
+    set_posted_versions,
     update_account,
 )
+from bitbot.core.db.bot_posts import (  # noqa: E402
+    REMOVED_DELETED,
+    BotPost,
+    find_bot_posts,
+    get_bot_post_cursor,
+    record_bot_posts,
+    set_bot_post_banners,
+    set_bot_post_state,
+)
+from bitbot.core.db.catalog import (  # noqa: E402
+    catalog_changelog,
+    catalog_fingerprint,
+    get_catalog,
+    replace_catalog,
+)
+from bitbot.core.db.comments import (  # noqa: E402
+    CommentThread,
+    CommentVerdict,
+    get_comment_thread,
+    get_comment_verdicts,
+    record_comment_verdicts,
+)
+from bitbot.core.db.queue import (  # noqa: E402
+    ClaimedRelease,
+    DeadRelease,
+    QueueSettings,
+    claim_next,
+    complete_release,
+    count_due,
+    fail_release,
+    get_dead_releases,
+    heartbeat,
+    queue_settings,
+    requeue_dead_releases,
+)
 from bitbot.core.db.releases import (  # noqa: E402
+    PROCESSED_RELEASES_KEEP,
     PendingRelease,
     add_pending_release,
+    add_pending_releases_many,
     add_processed_release,
+    add_processed_releases_many,
     clear_pending_releases,
+    compact_processed_releases,
     get_offline_versions,
     get_pending_releases,
+    get_processed_among,
     get_processed_releases,
     remove_pending_release,
     set_offline_version,
 )
+from bitbot.core.db.search import (  # noqa: E402
+    KIND_POST,
+    KIND_RELEASE,
+    SearchDocument,
+    SearchHit,
+    index_documents,
+    search,
+)
 
 __all__ = [
     "DB_PATH",
+    "KIND_POST",
+    "KIND_RELEASE",
+    "PROCESSED_RELEASES_KEEP",
+    "REMOVED_DELETED",
+    "SCHEMA_VERSION",
     "AccountMeta",
+    "AccountState",
+    "ActiveAccount",
+    "BotPost",
+    "ClaimedRelease",
+    "CommentThread",
+    "CommentVerdict",
+    "ConnectionSettings",
+    "DeadRelease",
     "PendingRelease",
+    "QueryProfiler",
+    "QueueSettings",
+    "SearchDocument",
+    "SearchHit",
     "add_pending_release",
+    "add_pending_releases_many",
     "add_post_id",
     "add_processed_release",
+    "add_processed_releases_many",
+    "catalog_changelog",
+    "catalog_fingerprint",
+    "checkpoint",
+    "claim_next",
     "clear_pending_releases",
     "clear_posted_versions",
+    "close",
+    "compact_processed_releases",
+    "complete_release",
+    "configure",
     "conn",
+    "count_due",
+    "disable_profiling",
+    "enable_profiling",
     "export_account_json",
+    "fail_release",
+    "find_bot_posts",
     "get_account",
+    "get_active_accounts",
+    "get_bot_post_cursor",
+    "get_catalog",
+    "get_comment_thread",
+    "get_comment_verdicts",
+    "get_connection",
+    "get_dead_releases",
     "get_offline_versions",
     "get_or_create_account",
     "get_pending_releases",
     "get_post_ids",
     "get_posted_versions",
+    "get_processed_among",
     "get_processed_releases",
+    "get_profiler",
+    "heartbeat",
+    "index_documents",
     "init",
+    "pooled_db",
+    "queue_settings",
+    "record_bot_posts",
+    "record_comment_verdicts",
     "remove_pending_release",
+    "replace_catalog",
+    "requeue_dead_releases",
     "reset_account_state",
+    "search",
+    "set_bot_post_banners",
+    "set_bot_post_state",
     "set_offline_version",
     "set_posted_version",
+    "set_posted_versions",
+    "transaction",
     "update_account",
 ]
@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
+import json
 import sqlite3
-from typing import Any, TypedDict
+from dataclasses import dataclass, field
+from types import TracebackType  # noqa: TC003
+from typing import Any, Self, TypedDict
 
 import icontract
 from beartype import beartype
 from returns.result import Failure, Result, Success
 
-from bitbot.core.db import conn, db_fail
+from bitbot.core.db import conn, db_fail, transaction
 from bitbot.core.errors import StateError
 
 
@@ -17,6 +20,7 @@ class AccountMeta(TypedDict):
     """Account metadata from database."""
 
     active_post_id: str | None
+    active_post_created_utc: float | None
     last_check_timestamp: str | None
     check_interval_seconds: int | None
     last_comment_count: int | None
@@ -76,6 +80,24 @@ def set_posted_version(account_id: int, app_id: str, version: str) -> Result[Non
         return db_fail("Failed to set posted version", e)
 
 
+@icontract.require(lambda account_id: account_id > 0)
+@beartype
+def set_posted_versions(account_id: int, versions: dict[str, str]) -> Result[None, StateError]:
+    """Set posted versions for several apps in one statement batch."""
+    if not versions:
+        return Success(None)
+    try:
+        with conn() as c:
+            c.executemany(
+                """INSERT OR REPLACE INTO posted_versions (account_id, app_id, version)
+                   VALUES (?, ?, ?)""",
+                [(account_id, app_id, version) for app_id, version in versions.items()],
+            )
+        return Success(None)
+    except sqlite3.Error as e:
+        return db_fail("Failed to set posted versions", e)
+
+
 @icontract.require(lambda account_id: account_id > 0)
 @beartype
 def get_account(account_id: int) -> Result[AccountMeta, StateError]:
@@ -83,7 +105,7 @@ def get_account(account_id: int) -> Result[AccountMeta, StateError]:
     try:
         with conn() as c:
             row = c.execute(
-                """SELECT active_post_id, last_check_timestamp,
+                """SELECT active_post_id, active_post_created_utc, last_check_timestamp,
                           check_interval_seconds, last_comment_count, content_hash
                    FROM accounts WHERE id = ?""",
                 (account_id,),
@@ -93,6 +115,7 @@ def get_account(account_id: int) -> Result[AccountMeta, StateError]:
         return Success(
             {
                 "active_post_id": row["active_post_id"],
+                "active_post_created_utc": row["active_post_created_utc"],
                 "last_check_timestamp": row["last_check_timestamp"],
                 "check_interval_seconds": row["check_interval_seconds"],
                 "last_comment_count": row["last_comment_count"],
@@ -103,8 +126,48 @@ def get_account(account_id: int) -> Result[AccountMeta, StateError]:
         return db_fail("Failed to get account", e)
 
 
+class ActiveAccount(TypedDict):
+    """An account with a post being watched."""
+
+    username: str
+    subreddit: str
+    active_post_id: str
+    last_check_timestamp: str | None
+    check_interval_seconds: int | None
+
+
+@beartype
+def get_active_accounts(username: str | None = None) -> Result[list[ActiveAccount], StateError]:
+    """Get accounts with an active post, optionally only those of one user."""
+    try:
+        with conn() as c:
+            rows = c.execute(
+                """SELECT username, subreddit, active_post_id, last_check_timestamp,
+                          check_interval_seconds
+                   FROM accounts
+                   WHERE active_post_id IS NOT NULL AND (:username IS NULL OR username = :username)
+                   ORDER BY id""",
+                {"username": username},
+            ).fetchall()
+        return Success(
+            [
+                {
+                    "username": r["username"],
+                    "subreddit": r["subreddit"],
+                    "active_post_id": r["active_post_id"],
+                    "last_check_timestamp": r["last_check_timestamp"],
+                    "check_interval_seconds": r["check_interval_seconds"],
+                }
+                for r in rows
+            ]
+        )
+    except sqlite3.Error as e:
+        return db_fail("Failed to get active accounts", e)
+
+
 _UPDATE_COLS = {
     "active_post_id": "active_post_id = ?",
+    "active_post_created_utc": "active_post_created_utc = ?",
     "last_check_timestamp": "last_check_timestamp = ?",
     "check_interval_seconds": "check_interval_seconds = ?",
     "last_comment_count": "last_comment_count = ?",
@@ -118,6 +181,7 @@ def update_account(
     account_id: int,
     *,
     active_post_id: str | None = None,
+    active_post_created_utc: float | None = None,
     last_check_timestamp: str | None = None,
     check_interval_seconds: int | None = None,
     last_comment_count: int | None = None,
@@ -130,6 +194,9 @@ def update_account(
     if active_post_id is not None:
         updates.append(_UPDATE_COLS["active_post_id"])
         params.append(active_post_id)
+    if active_post_created_utc is not None:
+        updates.append(_UPDATE_COLS["active_post_created_utc"])
+        params.append(active_post_created_utc)
     if last_check_timestamp is not None:
         updates.append(_UPDATE_COLS["last_check_timestamp"])
         params.append(last_check_timestamp)
@@ -186,37 +253,177 @@ def add_post_id(account_id: int, post_id: str) -> Result[None, StateError]:
         return db_fail("Failed to add post ID", e)
 
 
+_META_FIELDS = tuple(AccountMeta.__annotations__)
+
+_LOAD_STATE_SQL = """
+SELECT a.id, a.active_post_id, a.active_post_created_utc, a.last_check_timestamp,
+       a.check_interval_seconds, a.last_comment_count, a.content_hash,
+       (SELECT json_group_object(v.app_id, v.version)
+        FROM posted_versions AS v WHERE v.account_id = a.id) AS versions,
+       (SELECT json_group_array(p.post_id)
+        FROM (SELECT post_id FROM post_ids WHERE account_id = a.id ORDER BY rowid) AS p
+       ) AS post_ids
+FROM accounts AS a WHERE a.username = ? AND a.subreddit = ?
+"""
+
+
+@dataclass
+class AccountState:
+    """In-memory copy of an account's meta, posted versions and post IDs.
+
+    Loaded with one query; changes are tracked and written back by
+    ``flush()`` in a single transaction. Used as a context manager it
+    flushes on exit, including when the block raises, since recorded
+    changes describe actions already taken on Reddit.
+    """
+
+    account_id: int
+    meta: AccountMeta
+    posted_versions: dict[str, str]
+    post_ids: list[str]
+    _dirty_meta: set[str] = field(default_factory=set, repr=False)
+    _dirty_versions: dict[str, str] = field(default_factory=dict, repr=False)
+    _new_post_ids: list[str] = field(default_factory=list, repr=False)
+    _versions_cleared: bool = field(default=False, repr=False)
+
+    @classmethod
+    @beartype
+    def load(cls, username: str, subreddit: str) -> Result[AccountState, StateError]:
+        """Load (creating if needed) an account's full state."""
+        try:
+            with conn() as c:
+                row = c.execute(_LOAD_STATE_SQL, (username, subreddit)).fetchone()
+                if row is None:
+                    c.execute(
+                        "INSERT OR IGNORE INTO accounts (username, subreddit) VALUES (?, ?)",
+                        (username, subreddit),
+                    )
+                    row = c.execute(_LOAD_STATE_SQL, (username, subreddit)).fetchone()
+            if row is None:
+                return Failure(StateError("Failed to create/get account"))
+            meta: AccountMeta = {name: row[name] for name in _META_FIELDS}  # type: ignore[assignment]
+            return Success(
+                cls(
+                    account_id=row["id"],
+                    meta=meta,
+                    posted_versions=json.loads(row["versions"]),
+                    post_ids=json.loads(row["post_ids"]),
+                )
+            )
+        except sqlite3.Error as e:
+            return db_fail("Failed to load account state", e)
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are changes not yet flushed."""
+        return bool(
+            self._dirty_meta or self._dirty_versions or self._new_post_ids or self._versions_cleared
+        )
+
+    @beartype
+    def update(self, **fields: Any) -> None:  # noqa: ANN401
+        """Set account meta fields (None clears a field)."""
+        unknown = set(fields) - set(_META_FIELDS)
+        if unknown:
+            msg = f"Unknown account fields: {', '.join(sorted(unknown))}"
+            raise StateError(msg)
+        for name, value in fields.items():
+            if self.meta[name] != value:  # type: ignore[literal-required]
+                self.meta[name] = value  # type: ignore[literal-required]
+                self._dirty_meta.add(name)
+
+    @beartype
+    def set_posted_versions(self, versions: dict[str, str]) -> None:
+        """Record announced versions for several apps."""
+        for app_id, version in versions.items():
+            if self.posted_versions.get(app_id) != version:
+                self.posted_versions[app_id] = version
+                self._dirty_versions[app_id] = version
+
+    @beartype
+    def add_post_id(self, post_id: str) -> None:
+        """Record a post ID (ignored if already known)."""
+        if post_id not in self.post_ids:
+            self.post_ids.append(post_id)
+            self._new_post_ids.append(post_id)
+
+    @beartype
+    def reset(self) -> None:
+        """Forget announced versions, the active post and its content hash."""
+        self.posted_versions.clear()
+        self._dirty_versions.clear()
+        self._versions_cleared = True
+        self.update(active_post_id=None, active_post_created_utc=None, content_hash=None)
+
+    @beartype
+    def flush(self) -> Result[None, StateError]:
+        """Write every pending change in one transaction."""
+        if not self.dirty:
+            return Success(None)
+        try:
+            with transaction() as c:
+                if self._dirty_meta:
+                    names = sorted(self._dirty_meta)
+                    assignments = ", ".join(f"{name} = ?" for name in names)
+                    c.execute(
+                        f"UPDATE accounts SET {assignments} WHERE id = ?",  # noqa: S608 - cols whitelisted
+                        [*(self.meta[n] for n in names), self.account_id],  # type: ignore[literal-required]
+                    )
+                if self._versions_cleared:
+                    c.execute(
+                        "DELETE FROM posted_versions WHERE account_id = ?", (self.account_id,)
+                    )
+                c.executemany(
+                    """INSERT OR REPLACE INTO posted_versions (account_id, app_id, version)
+                       VALUES (?, ?, ?)""",
+                    [(self.account_id, a, v) for a, v in self._dirty_versions.items()],
+                )
+                c.executemany(
+                    "INSERT OR IGNORE INTO post_ids (post_id, account_id) VALUES (?, ?)",
+                    [(post_id, self.account_id) for post_id in self._new_post_ids],
+                )
+        except sqlite3.Error as e:
+            return db_fail("Failed to save account state", e)
+        self._dirty_meta.clear()
+        self._dirty_versions.clear()
+        self._new_post_ids.clear()
+        self._versions_cleared = False
+        return Success(None)
+
+    @beartype
+    def to_json(self) -> dict[str, Any]:
+        """Export state as a JSON-compatible dict for other projects."""
+        return {
+            "online": dict(self.posted_versions),
+            "activePostId": self.meta["active_post_id"],
+            "lastCheckTimestamp": self.meta["last_check_timestamp"],
+            "currentIntervalSeconds": self.meta["check_interval_seconds"],
+            "contentHash": self.meta["content_hash"],
+            "allPostIds": list(self.post_ids),
+        }
+
+    def __enter__(self) -> Self:
+        """Use the state for the duration of a command."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Flush pending changes; a flush error only raises if the block succeeded."""
+        result = self.flush()
+        if isinstance(result, Failure) and exc_type is None:
+            raise result.failure()
+
+
 @icontract.require(lambda username: len(username) > 0)
 @icontract.require(lambda subreddit: len(subreddit) > 0)
 @beartype
 def export_account_json(username: str, subreddit: str) -> Result[dict[str, Any], StateError]:
     """Export account state as JSON-compatible dict for other projects."""
-    account_result = get_or_create_account(username, subreddit)
-    if isinstance(account_result, Failure):
-        return Failure(account_result.failure())
-
-    account_id = account_result.unwrap()
-
-    versions = get_posted_versions(account_id)
-    if isinstance(versions, Failure):
-        return Failure(versions.failure())
-
-    meta = get_account(account_id)
-    if isinstance(meta, Failure):
-        return Failure(meta.failure())
-
-    posts = get_post_ids(account_id)
-    if isinstance(posts, Failure):
-        return Failure(posts.failure())
-
-    m = meta.unwrap()
-    return Success(
-        {
-            "online": versions.unwrap(),
-            "activePostId": m["active_post_id"],
-            "lastCheckTimestamp": m["last_check_timestamp"],
-            "currentIntervalSeconds": m["check_interval_seconds"],
-            "contentHash": m["content_hash"],
-            "allPostIds": posts.unwrap(),
-        }
-    )
+    state = AccountState.load(username, subreddit)
+    if isinstance(state, Failure):
+        return Failure(state.failure())
+    return Success(state.unwrap().to_json())
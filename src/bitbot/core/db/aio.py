@@ -0,0 +1,250 @@
+"""Asyncio facade over the database operations.
+
+Reads run in the default executor, so each worker thread uses its own
+pooled connection. Writes are handed to one dedicated writer thread. It
+drains whatever is queued and applies it in a single transaction, with
+one fsync for the whole batch. Every write is isolated in a SAVEPOINT,
+so one failed write cannot undo the others. Only one connection ever
+writes, so coroutines never contend for the WAL write lock.
+
+Usage::
+
+    async with AsyncDB() as adb:
+        pending = await adb.get_pending_releases()
+        await asyncio.gather(*(adb.add_processed_release(i) for i in ids))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import sqlite3
+import threading
+from collections.abc import Callable  # noqa: TC003
+from dataclasses import dataclass, field
+from types import TracebackType  # noqa: TC003
+from typing import Any, Self
+
+from beartype import beartype
+from returns.result import Failure
+
+from bitbot.core import db
+
+# Operations that only read; run concurrently in executor threads
+READ_OPERATIONS = frozenset(
+    {
+        "catalog_changelog",
+        "catalog_fingerprint",
+        "count_due",
+        "export_account_json",
+        "find_bot_posts",
+        "get_account",
+        "get_active_accounts",
+        "get_bot_post_cursor",
+        "get_catalog",
+        "get_comment_thread",
+        "get_comment_verdicts",
+        "get_dead_releases",
+        "get_offline_versions",
+        "get_pending_releases",
+        "get_post_ids",
+        "get_posted_versions",
+        "get_processed_among",
+        "get_processed_releases",
+        "search",
+    }
+)
+
+# Operations that write; serialized through the batching writer thread
+WRITE_OPERATIONS = frozenset(
+    {
+        "add_pending_release",
+        "add_pending_releases_many",
+        "add_post_id",
+        "add_processed_release",
+        "add_processed_releases_many",
+        "claim_next",
+        "clear_pending_releases",
+        "clear_posted_versions",
+        "compact_processed_releases",
+        "complete_release",
+        "fail_release",
+        "get_or_create_account",
+        "heartbeat",
+        "index_documents",
+        "record_bot_posts",
+        "record_comment_verdicts",
+        "remove_pending_release",
+        "replace_catalog",
+        "requeue_dead_releases",
+        "reset_account_state",
+        "set_bot_post_banners",
+        "set_bot_post_state",
+        "set_offline_version",
+        "set_posted_version",
+        "set_posted_versions",
+        "update_account",
+    }
+)
+
+# Connection and lifecycle management; bound to the calling thread, so not forwarded
+LOCAL_OPERATIONS = frozenset(
+    {
+        "checkpoint",
+        "close",
+        "configure",
+        "conn",
+        "disable_profiling",
+        "enable_profiling",
+        "get_connection",
+        "get_profiler",
+        "init",
+        "pooled_db",
+        "queue_settings",
+        "transaction",
+    }
+)
+
+_STOP = object()
+
+
+@dataclass
+class _Job:
+    fn: Callable[..., Any]
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    future: asyncio.Future[Any]
+    loop: asyncio.AbstractEventLoop = field(repr=False)
+
+
+@beartype
+def _settle(future: asyncio.Future[Any], value: Any, error: BaseException | None) -> None:  # noqa: ANN401
+    """Resolve a future on its own loop (skipped if the caller gave up)."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+
+
+class AsyncDB:
+    """Awaitable versions of the ``bitbot.core.db`` operations.
+
+    Every name in ``READ_OPERATIONS`` or ``WRITE_OPERATIONS`` is available
+    as a coroutine method with the same arguments and ``Result`` return.
+    """
+
+    def __init__(self, max_batch: int = 256) -> None:
+        """Create a facade; writes batch up to ``max_batch`` per transaction."""
+        self._max_batch = max_batch
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+
+    async def __aenter__(self) -> Self:
+        """Start the writer thread."""
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Finish queued writes and stop the writer thread."""
+        await self.close()
+
+    def start(self) -> None:
+        """Start the writer thread (no-op if already running)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._writer_loop, name="bitbot-db-writer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    async def close(self) -> None:
+        """Apply every queued write, then stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+
+    async def read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        """Run a read-only db function in an executor thread."""
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def write(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        """Queue a db function for the writer thread and await its result."""
+        if self._thread is None:
+            msg = "AsyncDB writer is not running; use 'async with AsyncDB()'"
+            raise RuntimeError(msg)
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        self._queue.put(_Job(fn, args, kwargs, future, loop))
+        return await future
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        """Expose db operations as coroutine methods."""
+        if name in READ_OPERATIONS:
+            runner = self.read
+        elif name in WRITE_OPERATIONS:
+            runner = self.write
+        else:
+            raise AttributeError(name)
+        fn = getattr(db, name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            return await runner(fn, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = fn.__doc__
+        return call
+
+    def _writer_loop(self) -> None:
+        """Drain the queue in batches until asked to stop."""
+        try:
+            while True:
+                job = self._queue.get()
+                if job is _STOP:
+                    return
+                batch = [job]
+                stop = False
+                while len(batch) < self._max_batch:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is _STOP:
+                        stop = True
+                        break
+                    batch.append(job)
+                self._run_batch(batch)
+                if stop:
+                    return
+        finally:
+            db._drop_thread_connection()  # noqa: SLF001
+
+    def _run_batch(self, batch: list[_Job]) -> None:
+        """Apply a batch of writes in one transaction and resolve their futures."""
+        outcomes: list[tuple[_Job, Any, BaseException | None]] = []
+        try:
+            with db.transaction() as c:
+                for job in batch:
+                    c.execute("SAVEPOINT job")
+                    try:
+                        value = job.fn(*job.args, **job.kwargs)
+                    except Exception as e:  # noqa: BLE001 - handed to the awaiting caller
+                        c.execute("ROLLBACK TO job")
+                        outcomes.append((job, None, e))
+                    else:
+                        if isinstance(value, Failure):
+                            c.execute("ROLLBACK TO job")
+                        outcomes.append((job, value, None))
+                    c.execute("RELEASE job")
+        except sqlite3.Error as e:
+            failure = db.db_fail("Batched write failed", e)
+            outcomes = [(job, failure, None) for job in batch]
+        for job, value, error in outcomes:
+            job.loop.call_soon_threadsafe(_settle, job.future, value, error)
@@ -0,0 +1,169 @@
+"""Cached metadata of the bot account's submissions.
+
+``bot_posts`` mirrors the bot's submission listing: one row per post with
+its subreddit, title, creation time, removal state and body hash. It is
+refreshed incrementally from the newest known post, so finding the bot's
+posts is a query instead of a walk through listing pages. Authors and
+subreddits are stored lower-cased.
+
+``banner_hash`` names the outdated banner a post was last given. It only
+holds while the body is unchanged: any new body hash clears it.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import TYPE_CHECKING, TypedDict
+
+import icontract
+from beartype import beartype
+from returns.result import Result, Success
+
+from bitbot.core.db import conn, db_fail, transaction
+
+if TYPE_CHECKING:
+    from bitbot.core.errors import StateError
+
+# Posts the author deleted drop out of listings, so they cannot be a cursor
+REMOVED_DELETED = "deleted"
+
+
+class BotPost(TypedDict):
+    """One submission; ``removed`` is Reddit's removal category, None if visible."""
+
+    post_id: str
+    subreddit: str
+    title: str
+    url: str
+    created_utc: float
+    removed: str | None
+    body_hash: str | None
+    banner_hash: str | None
+
+
+@icontract.require(lambda author: len(author) > 0)
+@beartype
+def get_bot_post_cursor(author: str) -> Result[str | None, StateError]:
+    """ID of the author's newest post still in listings (None if none is known)."""
+    try:
+        with conn() as c:
+            row = c.execute(
+                """SELECT post_id FROM bot_posts
+                   WHERE author = ? AND removed IS NOT ?
+                   ORDER BY created_utc DESC LIMIT 1""",
+                (author.lower(), REMOVED_DELETED),
+            ).fetchone()
+        return Success(None if row is None else row["post_id"])
+    except sqlite3.Error as e:
+        return db_fail("Failed to read bot post cursor", e)
+
+
+@icontract.require(lambda author: len(author) > 0)
+@beartype
+def record_bot_posts(author: str, posts: list[BotPost]) -> Result[int, StateError]:
+    """Add or refresh posts. Returns how many rows changed."""
+    if not posts:
+        return Success(0)
+    rows = [{**p, "author": author.lower(), "subreddit": p["subreddit"].lower()} for p in posts]
+    try:
+        with transaction() as c:
+            cursor = c.executemany(
+                """INSERT INTO bot_posts (author, post_id, subreddit, title, url, created_utc,
+                                         removed, body_hash)
+                   VALUES (:author, :post_id, :subreddit, :title, :url, :created_utc,
+                           :removed, :body_hash)
+                   ON CONFLICT (post_id) DO UPDATE SET
+                       title = excluded.title, url = excluded.url,
+                       removed = excluded.removed, body_hash = excluded.body_hash,
+                       banner_hash = iif(body_hash IS excluded.body_hash, banner_hash, NULL)
+                   WHERE title != excluded.title OR url != excluded.url
+                      OR removed IS NOT excluded.removed
+                      OR body_hash IS NOT excluded.body_hash""",
+                rows,
+            )
+        return Success(cursor.rowcount)
+    except sqlite3.Error as e:
+        return db_fail("Failed to record bot posts", e)
+
+
+@icontract.require(lambda post_id: len(post_id) > 0)
+@beartype
+def set_bot_post_state(
+    post_id: str, removed: str | None, body_hash: str | None
+) -> Result[bool, StateError]:
+    """Update a known post's removal state and body hash. Returns whether it is known."""
+    try:
+        with transaction() as c:
+            updated = c.execute(
+                """UPDATE bot_posts SET removed = :removed, body_hash = :body_hash,
+                       banner_hash = iif(body_hash IS :body_hash, banner_hash, NULL)
+                   WHERE post_id = :post_id""",
+                {"removed": removed, "body_hash": body_hash, "post_id": post_id},
+            ).rowcount
+        return Success(updated > 0)
+    except sqlite3.Error as e:
+        return db_fail("Failed to update bot post", e)
+
+
+@beartype
+def set_bot_post_banners(banners: dict[str, tuple[str, str]]) -> Result[int, StateError]:
+    """Record ``{post_id: (body hash, banner hash)}`` after banners were applied."""
+    try:
+        with transaction() as c:
+            cursor = c.executemany(
+                "UPDATE bot_posts SET body_hash = ?, banner_hash = ? WHERE post_id = ?",
+                [(body, banner, post_id) for post_id, (body, banner) in banners.items()],
+            )
+        return Success(cursor.rowcount)
+    except sqlite3.Error as e:
+        return db_fail("Failed to record post banners", e)
+
+
+@icontract.require(lambda author: len(author) > 0)
+@icontract.require(lambda subreddit: len(subreddit) > 0)
+@beartype
+def find_bot_posts(
+    author: str,
+    subreddit: str,
+    title_prefix: str,
+    known_post_ids: list[str] | None = None,
+) -> Result[list[BotPost], StateError]:
+    """Get the author's posts in a subreddit, newest first.
+
+    A post matches if its title starts with ``title_prefix`` (case-sensitive)
+    or its ID is one of ``known_post_ids``.
+    """
+    try:
+        with conn() as c:
+            rows = c.execute(
+                """SELECT post_id, subreddit, title, url, created_utc, removed, body_hash,
+                          banner_hash
+                   FROM bot_posts
+                   WHERE author = :author AND subreddit = :subreddit
+                     AND (substr(title, 1, length(:prefix)) = :prefix
+                          OR post_id IN (SELECT value FROM json_each(:known)))
+                   ORDER BY created_utc DESC""",
+                {
+                    "author": author.lower(),
+                    "subreddit": subreddit.lower(),
+                    "prefix": title_prefix,
+                    "known": json.dumps(known_post_ids or []),
+                },
+            ).fetchall()
+        posts: list[BotPost] = [
+            {
+                "post_id": r["post_id"],
+                "subreddit": r["subreddit"],
+                "title": r["title"],
+                "url": r["url"],
+                "created_utc": r["created_utc"],
+                "removed": r["removed"],
+                "body_hash": r["body_hash"],
+                "banner_hash": r["banner_hash"],
+            }
+            for r in rows
+        ]
+        return Success(posts)
+    except sqlite3.Error as e:
+        return db_fail("Failed to find bot posts", e)
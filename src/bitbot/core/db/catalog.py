@@ -0,0 +1,179 @@
+"""Release catalog operations.
+
+``gather`` writes every app's latest release and history into ``catalog``.
+``post`` and ``page`` read from it, and the changelog against an account's
+posted versions is computed in SQL. The sharded files in ``dist/releases/``
+are still written by gather, but only as a published export.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import TYPE_CHECKING, Any
+
+from beartype import beartype
+from returns.result import Result, Success
+
+from bitbot.core.db import conn, db_fail, transaction
+from bitbot.types import Changelog, ReleasesData  # noqa: TC001
+
+if TYPE_CHECKING:
+    from bitbot.core.errors import StateError
+
+_CHANGELOG_SQL = """
+WITH latest AS (
+    SELECT app_id, display_name, version, download_url, position
+    FROM catalog WHERE is_latest = 1
+),
+posted AS (
+    SELECT app_id, version FROM posted_versions WHERE account_id = :account_id
+)
+SELECT * FROM (
+    SELECT 'added' AS kind, l.app_id, l.display_name, l.version, l.download_url,
+           NULL AS old_version, l.position
+    FROM latest AS l
+    WHERE l.app_id IN (SELECT app_id FROM latest EXCEPT SELECT app_id FROM posted)
+    UNION ALL
+    SELECT 'updated', l.app_id, l.display_name, l.version, l.download_url, p.version, l.position
+    FROM latest AS l JOIN posted AS p ON p.app_id = l.app_id
+    WHERE p.version != l.version
+    UNION ALL
+    SELECT 'removed', p.app_id, p.app_id, p.version, '', NULL, NULL
+    FROM posted AS p
+    WHERE p.app_id IN (SELECT app_id FROM posted EXCEPT SELECT app_id FROM latest)
+)
+ORDER BY position IS NULL, position, app_id
+"""
+
+
+@beartype
+def _catalog_rows(apps_data: ReleasesData) -> list[dict[str, Any]]:
+    """Flatten release data into catalog rows, numbered in display order."""
+    rows: list[dict[str, Any]] = []
+    for app_id, app_data in apps_data.items():
+        latest = app_data["latest_release"]
+        entries = [(latest, 1), *((entry, 0) for entry in app_data.get("previous_releases", []))]
+        seen: set[str] = set()
+        for entry, is_latest in entries:
+            if entry["version"] in seen:
+                continue
+            seen.add(entry["version"])
+            rows.append(
+                {
+                    "app_id": app_id,
+                    "version": entry["version"],
+                    "display_name": app_data["display_name"],
+                    "download_url": entry.get("download_url", ""),
+                    "published_at": entry.get("published_at", ""),
+                    "is_latest": is_latest,
+                    "position": len(rows),
+                }
+            )
+    return rows
+
+
+@beartype
+def replace_catalog(apps_data: ReleasesData) -> Result[int, StateError]:
+    """Make the catalog match freshly gathered release data. Returns row count.
+
+    Unchanged rows are updated in place; rows for versions or apps that
+    disappeared are deleted, all in one transaction.
+    """
+    rows = _catalog_rows(apps_data)
+    try:
+        with transaction() as c:
+            # Mark everything stale; upserted rows get a real position back
+            c.execute("UPDATE catalog SET is_latest = 0, position = -1")
+            c.executemany(
+                """INSERT INTO catalog
+                   (app_id, version, display_name, download_url, published_at,
+                    is_latest, position)
+                   VALUES (:app_id, :version, :display_name, :download_url,
+                           :published_at, :is_latest, :position)
+                   ON CONFLICT (app_id, version) DO UPDATE SET
+                       display_name = excluded.display_name,
+                       download_url = excluded.download_url,
+                       published_at = excluded.published_at,
+                       is_latest = excluded.is_latest,
+                       position = excluded.position""",
+                rows,
+            )
+            c.execute("DELETE FROM catalog WHERE position < 0")
+        return Success(len(rows))
+    except sqlite3.Error as e:
+        return db_fail("Failed to update release catalog", e)
+
+
+@beartype
+def get_catalog() -> Result[ReleasesData, StateError]:
+    """Load the catalog as release data, apps in gather order."""
+    try:
+        with conn() as c:
+            rows = c.execute(
+                """SELECT app_id, version, display_name, download_url, published_at, is_latest
+                   FROM catalog ORDER BY position"""
+            ).fetchall()
+    except sqlite3.Error as e:
+        return db_fail("Failed to read release catalog", e)
+
+    releases: ReleasesData = {}
+    for r in rows:
+        entry = {
+            "version": r["version"],
+            "download_url": r["download_url"],
+            "published_at": r["published_at"],
+        }
+        if r["is_latest"]:
+            releases[r["app_id"]] = {
+                "display_name": r["display_name"],
+                "latest_release": entry,  # type: ignore[typeddict-item]
+                "previous_releases": [],
+            }
+        elif r["app_id"] in releases:
+            releases[r["app_id"]]["previous_releases"].append(entry)  # type: ignore[arg-type]
+    return Success(releases)
+
+
+@beartype
+def catalog_fingerprint() -> Result[str, StateError]:
+    """Summarize the latest version of every app; changes whenever one does."""
+    try:
+        with conn() as c:
+            row = c.execute(
+                """SELECT coalesce(group_concat(app_id || '=' || version || '@' || download_url,
+                                                char(10)), '')
+                   FROM (SELECT app_id, version, download_url FROM catalog
+                         WHERE is_latest = 1 ORDER BY app_id)"""
+            ).fetchone()
+        return Success(row[0])
+    except sqlite3.Error as e:
+        return db_fail("Failed to read release catalog", e)
+
+
+@beartype
+def catalog_changelog(account_id: int) -> Result[Changelog, StateError]:
+    """Diff the catalog's latest versions against what an account announced."""
+    try:
+        with conn() as c:
+            rows = c.execute(_CHANGELOG_SQL, {"account_id": account_id}).fetchall()
+    except sqlite3.Error as e:
+        return db_fail("Failed to compute changelog", e)
+
+    changelog: Changelog = {"added": {}, "updated": {}, "removed": {}}
+    for r in rows:
+        if r["kind"] == "removed":
+            changelog["removed"][r["app_id"]] = {
+                "display_name": r["display_name"],
+                "version": r["version"],
+            }
+            continue
+        info = {
+            "display_name": r["display_name"],
+            "version": r["version"],
+            "url": r["download_url"],
+        }
+        if r["kind"] == "added":
+            changelog["added"][r["app_id"]] = info  # type: ignore[assignment]
+        else:
+            changelog["updated"][r["app_id"]] = {"new": info, "old": r["old_version"]}  # type: ignore[typeddict-item]
+    return Success(changelog)
@@ -0,0 +1,125 @@
+"""Comment ledger for incremental feedback checks.
+
+Every scored comment on a bot post is recorded in ``comment_ledger`` with
+its edited timestamp and verdict (+1 working, -1 broken, 0 neither).
+Triggers keep the per-thread tallies in ``comment_threads`` current, so a
+check only scores comments that are new or were edited since they were
+last seen, and never rescans the thread.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import TYPE_CHECKING, TypedDict
+
+import icontract
+from beartype import beartype
+from returns.result import Result, Success
+
+from bitbot.core.db import conn, db_fail, transaction
+
+if TYPE_CHECKING:
+    from bitbot.core.errors import StateError
+
+
+class CommentVerdict(TypedDict):
+    """Score of one comment as of its last edit (0 if never edited)."""
+
+    comment_id: str
+    edited: float
+    verdict: int
+
+
+class CommentThread(TypedDict):
+    """Running tallies for a post's comments.
+
+    ``last_seen`` is the fullname of the newest comment fetched so far;
+    None means the thread has not been scanned yet.
+    """
+
+    score: int
+    comments: int
+    last_seen: str | None
+
+
+@icontract.require(lambda post_id: len(post_id) > 0)
+@beartype
+def get_comment_thread(post_id: str) -> Result[CommentThread, StateError]:
+    """Get a post's tallies (zeros if it was never scanned)."""
+    try:
+        with conn() as c:
+            row = c.execute(
+                "SELECT score, comments, last_seen FROM comment_threads WHERE post_id = ?",
+                (post_id,),
+            ).fetchone()
+    except sqlite3.Error as e:
+        return db_fail("Failed to get comment thread", e)
+    if row is None:
+        return Success({"score": 0, "comments": 0, "last_seen": None})
+    return Success(
+        {"score": row["score"], "comments": row["comments"], "last_seen": row["last_seen"]}
+    )
+
+
+@beartype
+def get_comment_verdicts(comment_ids: list[str]) -> Result[dict[str, CommentVerdict], StateError]:
+    """Return the recorded verdicts of those given comments already in the ledger."""
+    if not comment_ids:
+        return Success({})
+    try:
+        with conn() as c:
+            rows = c.execute(
+                """SELECT l.comment_id, l.edited, l.verdict FROM json_each(?) AS j
+                   JOIN comment_ledger AS l ON l.comment_id = j.value""",
+                (json.dumps(comment_ids),),
+            ).fetchall()
+        return Success(
+            {
+                r["comment_id"]: {
+                    "comment_id": r["comment_id"],
+                    "edited": r["edited"],
+                    "verdict": r["verdict"],
+                }
+                for r in rows
+            }
+        )
+    except sqlite3.Error as e:
+        return db_fail("Failed to read comment ledger", e)
+
+
+@icontract.require(lambda post_id: len(post_id) > 0)
+@beartype
+def record_comment_verdicts(
+    post_id: str, verdicts: list[CommentVerdict], last_seen: str | None = None
+) -> Result[CommentThread, StateError]:
+    """Record new or re-scored comments and advance the fetch cursor.
+
+    Returns the thread's updated tallies. A verdict for a comment whose
+    edited timestamp is unchanged is ignored, so replaying a batch is safe.
+    """
+    try:
+        with transaction() as c:
+            c.execute(
+                """INSERT INTO comment_threads (post_id, last_seen) VALUES (?, ?)
+                   ON CONFLICT (post_id) DO UPDATE SET
+                       last_seen = coalesce(excluded.last_seen, last_seen)""",
+                (post_id, last_seen),
+            )
+            c.executemany(
+                """INSERT INTO comment_ledger (comment_id, post_id, edited, verdict)
+                   VALUES (:comment_id, :post_id, :edited, :verdict)
+                   ON CONFLICT (comment_id) DO UPDATE SET
+                       edited = excluded.edited, verdict = excluded.verdict
+                   WHERE edited != excluded.edited""",
+                [{**v, "post_id": post_id} for v in verdicts],
+            )
+            row = c.execute(
+                "SELECT score, comments, last_seen FROM comment_threads WHERE post_id = ?",
+                (post_id,),
+            ).fetchone()
+        return Success(
+            {"score": row["score"], "comments": row["comments"], "last_seen": row["last_seen"]}
+        )
+    except sqlite3.Error as e:
+        return db_fail("Failed to record comment verdicts", e)
@@ -0,0 +1,173 @@
+"""Retention, compaction and vacuuming for bitbot.db.
+
+``maintain()`` prunes tables that only ever grow, frees their pages, and
+leaves a small file. Steps run in order:
+
+1. Retention: each rule in ``RETENTION_RULES`` keeps the newest N rows of
+   its table. Limits come from ``[database.retention]``.
+2. Vacuum: incremental vacuum releases free pages. A database that was not
+   created with ``auto_vacuum = INCREMENTAL`` is converted by one full
+   ``VACUUM``.
+3. ``PRAGMA optimize`` refreshes planner statistics.
+4. ``wal_checkpoint(TRUNCATE)`` folds the WAL into the file and empties it.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from beartype import beartype
+from returns.result import Failure, Result, Success
+
+from bitbot.core.db import conn, db_fail, get_connection, transaction
+from bitbot.core.db.queue import STATUS_DEAD
+from bitbot.core.db.releases import PROCESSED_RELEASES_KEEP, compact_processed_releases
+from bitbot.core.errors import StateError
+
+RetentionRule = Callable[[sqlite3.Connection, int], int]
+
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+@beartype
+def _prune_post_ids(c: sqlite3.Connection, keep: int) -> int:
+    """Keep each account's newest post IDs, and always its active post."""
+    return c.execute(
+        """DELETE FROM post_ids WHERE rowid IN (
+               SELECT rowid FROM (
+                   SELECT p.rowid, p.post_id, a.active_post_id,
+                          ROW_NUMBER() OVER (
+                              PARTITION BY p.account_id ORDER BY p.rowid DESC
+                          ) AS n
+                   FROM post_ids AS p JOIN accounts AS a ON a.id = p.account_id
+               )
+               WHERE n > ? AND post_id IS NOT active_post_id
+           )""",
+        (keep,),
+    ).rowcount
+
+
+@beartype
+def _prune_processed_releases(_c: sqlite3.Connection, keep: int) -> int:
+    """Fold old processed IDs into a range (see ``compact_processed_releases``)."""
+    result = compact_processed_releases(keep)
+    if isinstance(result, Failure):
+        raise sqlite3.OperationalError(result.failure().message)
+    return result.unwrap()
+
+
+@beartype
+def _prune_dead_releases(c: sqlite3.Connection, keep: int) -> int:
+    """Keep only the newest dead-lettered releases."""
+    return c.execute(
+        """DELETE FROM pending_releases WHERE status = :dead AND rowid NOT IN (
+               SELECT rowid FROM pending_releases WHERE status = :dead
+               ORDER BY rowid DESC LIMIT :keep
+           )""",
+        {"dead": STATUS_DEAD, "keep": keep},
+    ).rowcount
+
+
+@beartype
+def _prune_comment_threads(c: sqlite3.Connection, keep: int) -> int:
+    """Drop ledgers of older threads (never an active post's); rows cascade."""
+    return c.execute(
+        """DELETE FROM comment_threads
+           WHERE post_id NOT IN (SELECT active_post_id FROM accounts
+                                 WHERE active_post_id IS NOT NULL)
+             AND rowid NOT IN (SELECT rowid FROM comment_threads ORDER BY rowid DESC LIMIT ?)""",
+        (keep,),
+    ).rowcount
+
+
+# Table → pruning rule; register cache tables here as they are added
+RETENTION_RULES: dict[str, RetentionRule] = {
+    "post_ids": _prune_post_ids,
+    "processed_releases": _prune_processed_releases,
+    "dead_releases": _prune_dead_releases,
+    "comment_threads": _prune_comment_threads,
+}
+
+DEFAULT_RETENTION: dict[str, int] = {
+    "post_ids": 100,
+    "processed_releases": PROCESSED_RELEASES_KEEP,
+    "dead_releases": 100,
+    "comment_threads": 20,
+}
+
+
+@dataclass
+class MaintenanceReport:
+    """What a maintenance run did."""
+
+    size_before: int
+    size_after: int = 0
+    pruned: dict[str, int] = field(default_factory=dict)
+    pages_freed: int = 0
+    converted_to_incremental: bool = False
+    wal_checkpointed: bool = False
+
+
+@beartype
+def retention_limits(
+    options: Mapping[str, Any] | None = None,
+) -> Result[dict[str, int], StateError]:
+    """Merge ``[database.retention]`` over the defaults, rejecting bad entries."""
+    limits = dict(DEFAULT_RETENTION)
+    for table, keep in (options or {}).items():
+        if table not in RETENTION_RULES:
+            return Failure(StateError(f"No retention rule for table: {table}"))
+        if not isinstance(keep, int) or isinstance(keep, bool) or keep < 0:
+            return Failure(StateError(f"Retention for {table} must be a non-negative integer"))
+        limits[table] = keep
+    return Success(limits)
+
+
+@beartype
+def database_size() -> int:
+    """Bytes used by the database pages plus any write-ahead log."""
+    c = get_connection()
+    pages = c.execute("PRAGMA page_count").fetchone()[0]
+    page_size = c.execute("PRAGMA page_size").fetchone()[0]
+    file_name = c.execute("PRAGMA database_list").fetchone()["file"]
+    wal = Path(f"{file_name}-wal") if file_name else None
+    wal_size = wal.stat().st_size if wal is not None and wal.exists() else 0
+    return pages * page_size + wal_size
+
+
+@beartype
+def maintain(
+    retention: Mapping[str, int] | None = None, *, vacuum: bool = True
+) -> Result[MaintenanceReport, StateError]:
+    """Apply retention, vacuum, optimize and checkpoint. See module docstring."""
+    limits = dict(DEFAULT_RETENTION if retention is None else retention)
+    try:
+        report = MaintenanceReport(size_before=database_size())
+        with transaction() as c:
+            for table, keep in limits.items():
+                report.pruned[table] = RETENTION_RULES[table](c, keep)
+
+        c = get_connection()
+        if vacuum:
+            free_before = c.execute("PRAGMA freelist_count").fetchone()[0]
+            if c.execute("PRAGMA auto_vacuum").fetchone()[0] != _AUTO_VACUUM_INCREMENTAL:
+                # Only takes effect through a full VACUUM; later runs are incremental
+                c.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                c.execute("VACUUM")
+                report.converted_to_incremental = True
+            else:
+                c.execute("PRAGMA incremental_vacuum").fetchall()  # Frees a page per row
+            report.pages_freed = free_before - c.execute("PRAGMA freelist_count").fetchone()[0]
+
+        with conn() as c:
+            c.execute("PRAGMA optimize")
+        row = c.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        report.wal_checkpointed = row is not None and row[0] == 0
+        report.size_after = database_size()
+        return Success(report)
+    except sqlite3.Error as e:
+        return db_fail("Database maintenance failed", e)
@@ -0,0 +1,334 @@
+"""In-memory database mode with write-back to disk.
+
+``MemoryStore`` copies the database file into a shared in-memory database
+(SQLite's ``memdb`` VFS) with the backup API, so every pooled connection
+reads and writes memory only. ``checkpoint()`` backs the memory image up to
+a temporary file and atomically replaces the database file with it.
+
+Between checkpoints, each committed transaction is appended to a statement
+journal (``<db>-memjournal``, one JSON record per line) with its
+parameters. Every record carries a sequence number that is also written
+to ``memory_checkpoint`` in the same transaction, so a checkpointed image
+knows exactly which records it already contains. After a crash, loading
+replays the records newer than the file. Records are flushed but not
+fsynced unless ``synchronous`` is FULL or EXTRA, so a killed process
+loses nothing and a power loss loses at most the unsynced tail.
+
+Only one process should use memory mode on a database file at a time.
+"""
+
+from __future__ import annotations
+
+import base64
+import contextlib
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, TextIO, cast
+
+from beartype import beartype
+
+from bitbot.core.db.profiler import ProfilingConnection, ProfilingCursor
+
+_store_ids = itertools.count(1)
+
+# Leading keywords of statements that never change the database
+_READ_ONLY = frozenset({"SELECT", "VALUES", "EXPLAIN", "BEGIN"})
+_COMMIT = frozenset({"COMMIT", "END"})
+
+
+@beartype
+def _keyword(sql: str) -> str:
+    """Leading keyword of a statement, upper-cased."""
+    words = sql.lstrip().split(None, 1)
+    return words[0].upper() if words else ""
+
+
+@beartype
+def _is_write(sql: str) -> bool:
+    """Whether a statement must be journaled to be replayed."""
+    keyword = _keyword(sql)
+    if keyword == "PRAGMA":
+        # Per-connection tunables are reapplied on open; only the schema version persists
+        return "user_version" in sql.lower() and "=" in sql
+    return keyword not in _READ_ONLY and keyword not in _COMMIT and keyword != "VACUUM"
+
+
+@beartype
+def _ends_transaction(sql: str) -> bool:
+    """Whether a statement is a full ROLLBACK (not ``ROLLBACK TO`` a savepoint)."""
+    words = sql.upper().split()
+    return words[:1] == ["ROLLBACK"] and "TO" not in words[1:3]
+
+
+def _encode(value: Any) -> Any:  # noqa: ANN401
+    """Make a bound parameter JSON-safe (blobs become tagged base64)."""
+    if isinstance(value, bytes | bytearray | memoryview):
+        return {"$blob": base64.b64encode(bytes(value)).decode("ascii")}
+    return value
+
+
+def _decode(value: Any) -> Any:  # noqa: ANN401
+    """Reverse ``_encode``."""
+    if isinstance(value, dict) and set(value) == {"$blob"}:
+        return base64.b64decode(value["$blob"])
+    return value
+
+
+def _encode_params(params: Any) -> Any:  # noqa: ANN401
+    if isinstance(params, Mapping):
+        return {k: _encode(v) for k, v in params.items()}
+    return [_encode(v) for v in params]
+
+
+def _decode_params(params: Any) -> Any:  # noqa: ANN401
+    if isinstance(params, dict):
+        return {k: _decode(v) for k, v in params.items()}
+    return [_decode(v) for v in params]
+
+
+class MemoryStore:
+    """Shared in-memory copy of a database file, with journal and write-back."""
+
+    def __init__(self, path: Path, *, fsync: bool = False) -> None:
+        """Create a store for ``path`` (call ``load()`` before use)."""
+        self.path = path
+        self.journal_path = path.with_name(path.name + "-memjournal")
+        self.uri = f"file:/bitbot-{os.getpid()}-{next(_store_ids)}?vfs=memdb"
+        self._fsync = fsync
+        self._lock = threading.Lock()  # Serializes checkpoints and journal rewrites
+        self._journal_lock = threading.Lock()
+        self._keeper: sqlite3.Connection | None = None
+        self._journal: TextIO | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the memory database is loaded."""
+        return self._keeper is not None
+
+    def connect(self, **kwargs: Any) -> sqlite3.Connection:  # noqa: ANN401
+        """Open a connection to the memory database."""
+        return sqlite3.connect(self.uri, uri=True, **kwargs)
+
+    def load(self) -> int:
+        """Copy the database file into memory and replay the journal.
+
+        Returns the number of journal records replayed.
+        """
+        # The keeper holds the memory database open until close()
+        keeper = self.connect(check_same_thread=False, isolation_level=None)
+        try:
+            disk = sqlite3.connect(self.path)
+            try:
+                # Fold any WAL into the file so replacing it later leaves no stale -wal
+                disk.execute("PRAGMA journal_mode=DELETE")
+                disk.backup(keeper)
+            finally:
+                disk.close()
+            keeper.execute("PRAGMA foreign_keys=ON")
+            keeper.execute(
+                """CREATE TABLE IF NOT EXISTS memory_checkpoint (
+                       id INTEGER PRIMARY KEY CHECK (id = 1),
+                       seq INTEGER NOT NULL
+                   )"""
+            )
+            keeper.execute("INSERT OR IGNORE INTO memory_checkpoint (id, seq) VALUES (1, 0)")
+            replayed = self._replay(keeper)
+        except BaseException:
+            keeper.close()
+            raise
+        self._keeper = keeper
+        self._journal = self.journal_path.open("a", encoding="utf-8")
+        return replayed
+
+    def _replay(self, keeper: sqlite3.Connection) -> int:
+        """Apply journal records newer than the loaded image, in order."""
+        if not self.journal_path.exists():
+            return 0
+        applied = keeper.execute("SELECT seq FROM memory_checkpoint").fetchone()[0]
+        records = []
+        with self.journal_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # Torn final write from a crash
+        replayed = 0
+        for record in sorted(records, key=lambda r: r["seq"]):
+            if record["seq"] <= applied:
+                continue
+            keeper.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params, many in record["ops"]:
+                    if many:
+                        keeper.executemany(sql, [_decode_params(p) for p in params])
+                    else:
+                        keeper.execute(sql, _decode_params(params))
+                keeper.execute("UPDATE memory_checkpoint SET seq = ?", (record["seq"],))
+                keeper.execute("COMMIT")
+            except BaseException:
+                keeper.execute("ROLLBACK")
+                raise
+            applied = record["seq"]
+            replayed += 1
+        return replayed
+
+    @beartype
+    def append(self, seq: int, ops: list[list[Any]]) -> None:
+        """Journal one committed transaction."""
+        line = json.dumps({"seq": seq, "ops": ops}, separators=(",", ":")) + "\n"
+        with self._journal_lock:
+            if self._journal is None:
+                return
+            self._journal.write(line)
+            self._journal.flush()
+            if self._fsync:
+                os.fsync(self._journal.fileno())
+
+    def checkpoint(self) -> int:
+        """Atomically write the memory image to the database file.
+
+        Waits for in-flight write transactions on other connections, so it
+        must not be called while this thread holds one. Returns the journal
+        sequence number the file now includes.
+        """
+        with self._lock:
+            if self._keeper is None:
+                msg = "Memory database is not loaded"
+                raise sqlite3.OperationalError(msg)
+            fd, name = tempfile.mkstemp(
+                prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent
+            )
+            os.close(fd)
+            tmp = Path(name)
+            try:
+                target = sqlite3.connect(tmp)
+                try:
+                    self._keeper.backup(target)
+                    target.execute("PRAGMA journal_mode=DELETE")
+                    seq = target.execute("SELECT seq FROM memory_checkpoint").fetchone()[0]
+                finally:
+                    target.close()
+                with tmp.open("rb+") as f:
+                    os.fsync(f.fileno())
+                tmp.replace(self.path)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+            _fsync_dir(self.path.parent)
+            self._trim_journal(seq)
+            return seq
+
+    def _trim_journal(self, seq: int) -> None:
+        """Drop journal records already contained in the database file."""
+        with self._journal_lock:
+            if self._journal is None:
+                return
+            self._journal.close()
+            kept = []
+            with self.journal_path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        if json.loads(line)["seq"] > seq:
+                            kept.append(line)
+                    except json.JSONDecodeError:
+                        break
+            tmp = self.journal_path.with_name(self.journal_path.name + ".tmp")
+            tmp.write_text("".join(kept), encoding="utf-8")
+            tmp.replace(self.journal_path)
+            self._journal = self.journal_path.open("a", encoding="utf-8")
+
+    def close(self) -> None:
+        """Release the memory database (without writing it back)."""
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+
+
+@beartype
+def _fsync_dir(directory: Path) -> None:
+    """Persist a rename in ``directory`` (no-op where unsupported)."""
+    with contextlib.suppress(OSError):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class JournalingConnection(sqlite3.Connection):
+    """Connection that journals committed writes to a ``MemoryStore``."""
+
+    store: MemoryStore
+    _ops: list[list[Any]]
+
+    def attach_store(self, store: MemoryStore) -> None:
+        """Journal this connection's commits to a store."""
+        self.store = store
+        self._ops = []
+
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:  # noqa: ANN401
+        """Execute a statement, remembering it if it writes."""
+        if _keyword(sql) in _COMMIT:
+            self.commit()
+            return self.cursor()
+        cursor = super().execute(sql, parameters)
+        if _ends_transaction(sql):
+            self._ops = []
+        elif _is_write(sql):
+            self._record([sql, _encode_params(parameters), False])
+        return cursor
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> sqlite3.Cursor:  # noqa: ANN401
+        """Execute a batched statement, remembering it if it writes."""
+        rows = list(seq_of_parameters)
+        cursor = super().executemany(sql, rows)
+        if _is_write(sql):
+            self._record([sql, [_encode_params(p) for p in rows], True])
+        return cursor
+
+    def _record(self, op: list[Any]) -> None:
+        self._ops.append(op)
+        if not self.in_transaction:
+            self.commit()  # Autocommitted (e.g. DDL outside a transaction): journal it now
+
+    def commit(self) -> None:
+        """Commit, journaling the transaction's writes."""
+        if not self._ops:
+            super().commit()
+            return
+        # Stamped inside the transaction, so the file image and the journal agree
+        seq = super().execute("UPDATE memory_checkpoint SET seq = seq + 1 RETURNING seq").fetchall()
+        super().commit()
+        self.store.append(seq[0][0], self._ops)
+        self._ops = []
+
+    def rollback(self) -> None:
+        """Roll back and forget the transaction's writes."""
+        super().rollback()
+        self._ops = []
+
+
+class ProfilingJournalingConnection(JournalingConnection, ProfilingConnection):
+    """Journaling connection whose statements are also profiled.
+
+    Journaling runs first and reaches the profiling cursor through ``super()``,
+    so every cursor handed out is a ``ProfilingCursor``.
+    """
+
+    def execute(self, sql: str, parameters: Any = (), /) -> ProfilingCursor:  # noqa: ANN401
+        """Execute a statement, journaled and profiled."""
+        return cast("ProfilingCursor", super().execute(sql, parameters))
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> ProfilingCursor:  # noqa: ANN401
+        """Execute a batched statement, journaled and profiled."""
+        return cast("ProfilingCursor", super().executemany(sql, seq_of_parameters))
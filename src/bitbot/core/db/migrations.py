@@ -0,0 +1,361 @@
+"""Versioned schema migrations tracked in ``PRAGMA user_version``.
+
+Each migration upgrades the schema by one version. ``migrate()`` applies
+only the ones a database is missing, all in one ``BEGIN IMMEDIATE``
+transaction together with the version bump, so concurrent commands cannot
+apply the same step twice and a failed step leaves the database untouched.
+
+To change the schema, append a new function to ``MIGRATIONS``; never edit
+one that has shipped.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Callable
+
+from beartype import beartype
+from returns.result import Failure, Result, Success
+
+from bitbot.core.errors import StateError
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+@beartype
+def _columns(c: sqlite3.Connection, table: str) -> set[str]:
+    """Return the column names of a table."""
+    return {row[1] for row in c.execute(f"PRAGMA table_info({table})")}
+
+
+@beartype
+def _v1_base_schema(c: sqlite3.Connection) -> None:
+    """Create the original tables (no-op for databases that predate versioning)."""
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS offline_versions (
+            app_id TEXT PRIMARY KEY,
+            version TEXT NOT NULL
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS processed_releases (
+            release_id INTEGER PRIMARY KEY
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pending_releases (
+            release_id INTEGER PRIMARY KEY,
+            app_id TEXT NOT NULL,
+            display_name TEXT NOT NULL,
+            version TEXT NOT NULL,
+            tag TEXT NOT NULL,
+            asset_name TEXT
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            subreddit TEXT NOT NULL,
+            active_post_id TEXT,
+            last_check_timestamp TEXT,
+            check_interval_seconds INTEGER,
+            last_comment_count INTEGER DEFAULT 0,
+            UNIQUE(username, subreddit)
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS posted_versions (
+            account_id INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+            app_id TEXT NOT NULL,
+            version TEXT NOT NULL,
+            PRIMARY KEY (account_id, app_id)
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS post_ids (
+            post_id TEXT PRIMARY KEY,
+            account_id INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE
+        )
+        """
+    )
+
+
+@beartype
+def _v2_account_content_hash(c: sqlite3.Connection) -> None:
+    """Add accounts.content_hash (already present on some unversioned databases)."""
+    if "content_hash" not in _columns(c, "accounts"):
+        c.execute("ALTER TABLE accounts ADD COLUMN content_hash TEXT")
+
+
+@beartype
+def _v3_release_queue(c: sqlite3.Connection) -> None:
+    """Add lease, retry and dead-letter columns to pending_releases."""
+    columns = _columns(c, "pending_releases")
+    for name, ddl in (
+        ("status", "status TEXT NOT NULL DEFAULT 'pending'"),
+        ("attempts", "attempts INTEGER NOT NULL DEFAULT 0"),
+        ("not_before", "not_before REAL NOT NULL DEFAULT 0"),
+        ("lease_owner", "lease_owner TEXT"),
+        ("lease_expires_at", "lease_expires_at REAL"),
+        ("heartbeat_at", "heartbeat_at REAL"),
+        ("last_error", "last_error TEXT"),
+    ):
+        if name not in columns:
+            c.execute(f"ALTER TABLE pending_releases ADD COLUMN {ddl}")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_pending_releases_due"
+        " ON pending_releases (status, not_before)"
+    )
+
+
+@beartype
+def _v4_processed_ranges(c: sqlite3.Connection) -> None:
+    """Add processed_ranges, holding compacted runs of processed release IDs."""
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS processed_ranges (
+            lo INTEGER PRIMARY KEY,
+            hi INTEGER NOT NULL CHECK (hi >= lo)
+        )
+        """
+    )
+
+
+@beartype
+def _v5_catalog(c: sqlite3.Connection) -> None:
+    """Add the release catalog written by gather (latest release plus history per app)."""
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalog (
+            app_id TEXT NOT NULL,
+            version TEXT NOT NULL,
+            display_name TEXT NOT NULL,
+            download_url TEXT NOT NULL,
+            published_at TEXT NOT NULL DEFAULT '',
+            is_latest INTEGER NOT NULL DEFAULT 0 CHECK (is_latest IN (0, 1)),
+            position INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (app_id, version)
+        )
+        """
+    )
+    c.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_catalog_latest"
+        " ON catalog (app_id) WHERE is_latest = 1"
+    )
+
+
+@beartype
+def _v6_search_index(c: sqlite3.Connection) -> None:
+    """Add searchable documents with an FTS5 index kept in sync by triggers."""
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS search_documents (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            ref TEXT NOT NULL,
+            title TEXT NOT NULL DEFAULT '',
+            body TEXT NOT NULL DEFAULT '',
+            url TEXT,
+            UNIQUE (kind, ref)
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title, body,
+            content = 'search_documents', content_rowid = 'id',
+            tokenize = 'porter unicode61'
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+            INSERT INTO search_index (rowid, title, body) VALUES (new.id, new.title, new.body);
+        END
+        """
+    )
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+            INSERT INTO search_index (search_index, rowid, title, body)
+            VALUES ('delete', old.id, old.title, old.body);
+        END
+        """
+    )
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS search_documents_au
+        AFTER UPDATE OF title, body ON search_documents BEGIN
+            INSERT INTO search_index (search_index, rowid, title, body)
+            VALUES ('delete', old.id, old.title, old.body);
+            INSERT INTO search_index (rowid, title, body) VALUES (new.id, new.title, new.body);
+        END
+        """
+    )
+
+
+@beartype
+def _v7_comment_ledger(c: sqlite3.Connection) -> None:
+    """Add the per-comment verdict ledger and per-thread running tallies."""
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS comment_threads (
+            post_id TEXT PRIMARY KEY,
+            score INTEGER NOT NULL DEFAULT 0,
+            comments INTEGER NOT NULL DEFAULT 0,
+            last_seen TEXT
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS comment_ledger (
+            comment_id TEXT PRIMARY KEY,
+            post_id TEXT NOT NULL REFERENCES comment_threads(post_id) ON DELETE CASCADE,
+            edited REAL NOT NULL DEFAULT 0,
+            verdict INTEGER NOT NULL DEFAULT 0 CHECK (verdict IN (-1, 0, 1))
+        )
+        """
+    )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_comment_ledger_post ON comment_ledger (post_id)")
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS comment_ledger_ai AFTER INSERT ON comment_ledger BEGIN
+            UPDATE comment_threads SET score = score + new.verdict, comments = comments + 1
+            WHERE post_id = new.post_id;
+        END
+        """
+    )
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS comment_ledger_au
+        AFTER UPDATE OF verdict ON comment_ledger BEGIN
+            UPDATE comment_threads SET score = score - old.verdict + new.verdict
+            WHERE post_id = new.post_id;
+        END
+        """
+    )
+
+
+@beartype
+def _v8_oauth_tokens(c: sqlite3.Connection) -> None:
+    """Add the encrypted OAuth access token cache."""
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS oauth_tokens (
+            name TEXT PRIMARY KEY,
+            sealed BLOB NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """
+    )
+
+
+@beartype
+def _v9_bot_posts(c: sqlite3.Connection) -> None:
+    """Add cached metadata of the bot account's submissions."""
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS bot_posts (
+            post_id TEXT PRIMARY KEY,
+            author TEXT NOT NULL,
+            subreddit TEXT NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL DEFAULT '',
+            created_utc REAL NOT NULL,
+            removed TEXT,
+            body_hash TEXT
+        )
+        """
+    )
+    c.execute(
+        """CREATE INDEX IF NOT EXISTS idx_bot_posts_author
+           ON bot_posts (author, subreddit, created_utc DESC)"""
+    )
+
+
+@beartype
+def _v10_bot_post_banner(c: sqlite3.Connection) -> None:
+    """Record which outdated banner a bot post carries."""
+    c.execute("ALTER TABLE bot_posts ADD COLUMN banner_hash TEXT")
+
+
+@beartype
+def _v11_active_post_created(c: sqlite3.Connection) -> None:
+    """Store when each account's active post was created.
+
+    Existing rows start out NULL; ``post run`` reads the time once and saves it.
+    """
+    c.execute("ALTER TABLE accounts ADD COLUMN active_post_created_utc REAL")
+
+
+@beartype
+def _v12_drop_oauth_tokens(c: sqlite3.Connection) -> None:
+    """Drop the OAuth token cache; tokens moved out of the committed database.
+
+    Freed pages are zeroed, so no token survives in the file that is committed.
+    """
+    previous = c.execute("PRAGMA secure_delete").fetchone()[0]
+    c.execute("PRAGMA secure_delete = ON")
+    c.execute("DROP TABLE IF EXISTS oauth_tokens")
+    c.execute(f"PRAGMA secure_delete = {int(previous)}")
+
+
+MIGRATIONS: list[Migration] = [
+    _v1_base_schema,
+    _v2_account_content_hash,
+    _v3_release_queue,
+    _v4_processed_ranges,
+    _v5_catalog,
+    _v6_search_index,
+    _v7_comment_ledger,
+    _v8_oauth_tokens,
+    _v9_bot_posts,
+    _v10_bot_post_banner,
+    _v11_active_post_created,
+    _v12_drop_oauth_tokens,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+@beartype
+def current_version(c: sqlite3.Connection) -> int:
+    """Read the schema version recorded in the database header."""
+    return int(c.execute("PRAGMA user_version").fetchone()[0])
+
+
+@beartype
+def migrate(c: sqlite3.Connection) -> Result[int, StateError]:
+    """Apply missing migrations atomically. Returns the number applied."""
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read under the write lock: another process may have migrated meanwhile
+        version = current_version(c)
+        if version > SCHEMA_VERSION:
+            c.rollback()
+            return Failure(
+                StateError(f"Database schema v{version} is newer than supported v{SCHEMA_VERSION}")
+            )
+        for migration in MIGRATIONS[version:]:
+            migration(c)
+        c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        c.commit()
+    except BaseException:
+        c.rollback()
+        raise
+    return Success(SCHEMA_VERSION - version)
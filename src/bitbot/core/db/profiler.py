@@ -0,0 +1,241 @@
+"""Opt-in SQL profiling for pooled connections.
+
+When enabled, connections are opened with ``ProfilingConnection``:
+``sqlite3.set_trace_callback`` counts every statement SQLite runs (including
+each row of an ``executemany`` and implicit ``BEGIN``/``COMMIT``), while
+wall-clock timers around ``execute``/``fetch*`` measure latency and rows
+returned. Statements are grouped by normalized text with literals replaced
+by ``?``, so ``... WHERE id = 7`` and ``... WHERE id = ?`` share one entry.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from beartype import beartype
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_BLOB = re.compile(r"\b[xX]\?")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+_NAMED = re.compile(r"[:@$][A-Za-z_]\w*")
+_NULL = re.compile(r"([=(,]\s*)NULL\b", re.IGNORECASE)
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@beartype
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and replace literals/parameters with ``?``."""
+    text = _STRING.sub("?", sql)
+    text = _BLOB.sub("?", text)
+    text = _NAMED.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _NULL.sub(r"\1?", text)
+    text = _LIST.sub("(?, ...)", text)
+    return _SPACE.sub(" ", text).strip().rstrip(";")
+
+
+@dataclass(frozen=True)
+class QueryStats:
+    """Aggregated timings for one normalized statement."""
+
+    sql: str
+    calls: int
+    total_ms: float
+    p95_ms: float
+    rows: int
+
+
+@dataclass
+class _Entry:
+    calls: int = 0
+    rows: int = 0
+    samples: list[float] = field(default_factory=list)
+
+
+@beartype
+def _percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of the samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+class QueryProfiler:
+    """Thread-safe collector of per-statement counts, latency and rows."""
+
+    def __init__(self) -> None:
+        """Create an empty profiler."""
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+
+    def _entry(self, sql: str) -> _Entry:
+        key = normalize_sql(sql)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        return entry
+
+    def trace(self, sql: str) -> None:
+        """Count one statement execution (``set_trace_callback`` hook)."""
+        with self._lock:
+            self._entry(sql).calls += 1
+
+    def record(self, sql: str, seconds: float, rows: int = 0) -> None:
+        """Add one timed call and the rows it returned."""
+        with self._lock:
+            entry = self._entry(sql)
+            entry.samples.append(seconds * 1000)
+            entry.rows += rows
+
+    def add_rows(self, sql: str, rows: int, seconds: float) -> None:
+        """Attribute rows and fetch time to the statement's latest call."""
+        with self._lock:
+            entry = self._entry(sql)
+            entry.rows += rows
+            if entry.samples:
+                entry.samples[-1] += seconds * 1000
+            else:
+                entry.samples.append(seconds * 1000)
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._entries.clear()
+
+    @beartype
+    def stats(self) -> list[QueryStats]:
+        """Per-statement stats, slowest total first."""
+        with self._lock:
+            items = [
+                QueryStats(
+                    sql=sql,
+                    calls=max(entry.calls, len(entry.samples)),
+                    total_ms=round(sum(entry.samples), 3),
+                    p95_ms=round(_percentile(entry.samples, 95.0), 3),
+                    rows=entry.rows,
+                )
+                for sql, entry in self._entries.items()
+            ]
+        return sorted(items, key=lambda s: (-s.total_ms, -s.calls, s.sql))
+
+    @beartype
+    def as_dicts(self) -> list[dict[str, Any]]:
+        """Stats as JSON-serializable dicts."""
+        return [asdict(s) for s in self.stats()]
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor that times execution and counts fetched rows."""
+
+    profiler: QueryProfiler
+    _sql: str = ""
+
+    def execute(self, sql: str, parameters: Any = (), /) -> ProfilingCursor:  # noqa: ANN401
+        """Execute and time a statement."""
+        self._sql = sql
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.profiler.record(sql, time.perf_counter() - start)
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> ProfilingCursor:  # noqa: ANN401
+        """Execute and time a batched statement."""
+        self._sql = sql
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self.profiler.record(sql, time.perf_counter() - start)
+
+    def fetchone(self) -> Any:  # noqa: ANN401
+        """Fetch one row, timing the step."""
+        start = time.perf_counter()
+        row = super().fetchone()
+        self.profiler.add_rows(self._sql, int(row is not None), time.perf_counter() - start)
+        return row
+
+    def fetchmany(self, size: int | None = None) -> list[Any]:
+        """Fetch several rows, timing the steps."""
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self.profiler.add_rows(self._sql, len(rows), time.perf_counter() - start)
+        return rows
+
+    def fetchall(self) -> list[Any]:
+        """Fetch remaining rows, timing the steps."""
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self.profiler.add_rows(self._sql, len(rows), time.perf_counter() - start)
+        return rows
+
+    def __next__(self) -> Any:  # noqa: ANN401
+        """Fetch the next row while iterating, counting it as it streams."""
+        start = time.perf_counter()
+        row = super().__next__()
+        self.profiler.add_rows(self._sql, 1, time.perf_counter() - start)
+        return row
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """Connection whose cursors report to a ``QueryProfiler``."""
+
+    profiler: QueryProfiler
+
+    def attach(self, profiler: QueryProfiler) -> None:
+        """Route this connection's statements to a profiler."""
+        self.profiler = profiler
+        self.set_trace_callback(profiler.trace)
+
+    def cursor(self, factory: Any = ProfilingCursor) -> Any:  # noqa: ANN401
+        """Open a profiling cursor."""
+        cursor = super().cursor(factory)
+        cursor.profiler = self.profiler
+        return cursor
+
+    def execute(self, sql: str, parameters: Any = (), /) -> ProfilingCursor:  # noqa: ANN401
+        """Execute via a profiling cursor."""
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> ProfilingCursor:  # noqa: ANN401
+        """Execute a batch via a profiling cursor."""
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script: str, /) -> sqlite3.Cursor:
+        """Execute and time a script (statements are counted by the trace hook)."""
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self.profiler.record("<script>", time.perf_counter() - start)
+
+    def commit(self) -> None:
+        """Commit, timing it when a transaction is open."""
+        if not self.in_transaction:
+            super().commit()
+            return
+        start = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            self.profiler.record("COMMIT", time.perf_counter() - start)
+
+    def rollback(self) -> None:
+        """Roll back, timing it when a transaction is open."""
+        if not self.in_transaction:
+            super().rollback()
+            return
+        start = time.perf_counter()
+        try:
+            super().rollback()
+        finally:
+            self.profiler.record("ROLLBACK", time.perf_counter() - start)
@@ -0,0 +1,286 @@
+"""Leased job-queue operations on pending_releases.
+
+A row moves through ``pending`` → ``leased`` → (deleted | ``pending`` | ``dead``).
+Workers claim due rows atomically, keep their lease alive with heartbeats,
+then complete (delete) or fail them. A failed row is retried after an
+exponential backoff until ``max_attempts``, then parked as ``dead``. A lease
+that expires (crashed worker) makes the row claimable again.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Mapping  # noqa: TC003
+from dataclasses import dataclass, fields, replace
+from typing import Any
+
+import icontract
+from beartype import beartype
+from returns.result import Failure, Result, Success
+
+from bitbot.core.db import conn, db_fail, transaction
+from bitbot.core.db.releases import PendingRelease
+from bitbot.core.errors import StateError
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DEAD = "dead"
+
+
+class ClaimedRelease(PendingRelease):
+    """Pending release leased to a worker."""
+
+    attempts: int
+
+
+class DeadRelease(PendingRelease):
+    """Release that exhausted its attempts."""
+
+    attempts: int
+    last_error: str | None
+
+
+@dataclass(frozen=True)
+class QueueSettings:
+    """Lease and retry policy (from the ``[queue]`` config section)."""
+
+    lease_seconds: float = 600.0  # How long a claim is held without a heartbeat
+    max_attempts: int = 5  # Claims before a release is dead-lettered
+    retry_base_seconds: float = 60.0  # First backoff; doubles per attempt
+    retry_max_seconds: float = 3600.0  # Backoff ceiling
+    claim_batch: int = 1  # Releases claimed per round trip
+
+
+@beartype
+def queue_settings(options: Mapping[str, Any] | None = None) -> Result[QueueSettings, StateError]:
+    """Build queue settings from config, ignoring unknown keys."""
+    known = {f.name for f in fields(QueueSettings)}
+    updates = {k: v for k, v in (options or {}).items() if k in known}
+    try:
+        settings = replace(QueueSettings(), **updates)
+    except TypeError as e:
+        return Failure(StateError(f"Invalid queue settings: {e}"))
+    if settings.lease_seconds <= 0 or settings.retry_base_seconds <= 0:
+        return Failure(StateError("Queue lease and retry times must be positive"))
+    if settings.max_attempts < 1 or settings.claim_batch < 1:
+        return Failure(StateError("Queue max_attempts and claim_batch must be at least 1"))
+    return Success(settings)
+
+
+@beartype
+def backoff_seconds(attempts: int, settings: QueueSettings) -> float:
+    """Delay before retrying a release that has failed ``attempts`` times."""
+    exponent = min(max(attempts - 1, 0), 32)
+    return float(min(settings.retry_base_seconds * 2**exponent, settings.retry_max_seconds))
+
+
+@icontract.require(lambda n: n > 0)
+@icontract.require(lambda worker_id: len(worker_id) > 0)
+@beartype
+def claim_next(
+    n: int,
+    worker_id: str,
+    settings: QueueSettings | None = None,
+    now: float | None = None,
+) -> Result[list[ClaimedRelease], StateError]:
+    """Atomically lease up to ``n`` due releases to a worker, oldest first.
+
+    Due means pending with ``not_before`` passed, or leased with an expired
+    lease. Expired leases that already used every attempt are dead-lettered
+    instead of being handed out again.
+    """
+    settings = settings or QueueSettings()
+    now = time.time() if now is None else now
+    try:
+        with transaction() as c:
+            c.execute(
+                """UPDATE pending_releases
+                   SET status = :dead, lease_owner = NULL, lease_expires_at = NULL,
+                       last_error = COALESCE(last_error, 'Lease expired')
+                   WHERE status = :leased AND lease_expires_at <= :now
+                     AND attempts >= :max_attempts""",
+                {
+                    "dead": STATUS_DEAD,
+                    "leased": STATUS_LEASED,
+                    "now": now,
+                    "max_attempts": settings.max_attempts,
+                },
+            )
+            rows = c.execute(
+                """UPDATE pending_releases
+                   SET status = :leased, lease_owner = :owner,
+                       lease_expires_at = :expires, heartbeat_at = :now,
+                       attempts = attempts + 1
+                   WHERE rowid IN (
+                       SELECT rowid FROM pending_releases
+                       WHERE (status = :pending AND not_before <= :now)
+                          OR (status = :leased AND lease_expires_at <= :now)
+                       ORDER BY rowid LIMIT :n
+                   )
+                   RETURNING release_id, app_id, display_name, version, tag,
+                             asset_name, attempts""",
+                {
+                    "pending": STATUS_PENDING,
+                    "leased": STATUS_LEASED,
+                    "owner": worker_id,
+                    "now": now,
+                    "expires": now + settings.lease_seconds,
+                    "n": n,
+                },
+            ).fetchall()
+        claimed: list[ClaimedRelease] = [
+            {
+                "release_id": r["release_id"],
+                "app_id": r["app_id"],
+                "display_name": r["display_name"],
+                "version": r["version"],
+                "tag": r["tag"],
+                "asset_name": r["asset_name"],
+                "attempts": r["attempts"],
+            }
+            for r in sorted(rows, key=lambda r: r["release_id"])
+        ]
+        return Success(claimed)
+    except sqlite3.Error as e:
+        return db_fail("Failed to claim releases", e)
+
+
+@icontract.require(lambda release_id: release_id > 0)
+@beartype
+def heartbeat(
+    release_id: int,
+    worker_id: str,
+    settings: QueueSettings | None = None,
+    now: float | None = None,
+) -> Result[bool, StateError]:
+    """Extend a lease. Returns False if the worker no longer holds it."""
+    settings = settings or QueueSettings()
+    now = time.time() if now is None else now
+    try:
+        with conn() as c:
+            cursor = c.execute(
+                """UPDATE pending_releases
+                   SET lease_expires_at = ?, heartbeat_at = ?
+                   WHERE release_id = ? AND status = ? AND lease_owner = ?""",
+                (now + settings.lease_seconds, now, release_id, STATUS_LEASED, worker_id),
+            )
+        return Success(cursor.rowcount == 1)
+    except sqlite3.Error as e:
+        return db_fail("Failed to extend lease", e)
+
+
+@icontract.require(lambda release_id: release_id > 0)
+@beartype
+def complete_release(release_id: int, worker_id: str) -> Result[bool, StateError]:
+    """Remove a finished release. Returns False if the worker lost the lease."""
+    try:
+        with conn() as c:
+            cursor = c.execute(
+                """DELETE FROM pending_releases
+                   WHERE release_id = ? AND status = ? AND lease_owner = ?""",
+                (release_id, STATUS_LEASED, worker_id),
+            )
+        return Success(cursor.rowcount == 1)
+    except sqlite3.Error as e:
+        return db_fail("Failed to complete release", e)
+
+
+@icontract.require(lambda release_id: release_id > 0)
+@beartype
+def fail_release(
+    release_id: int,
+    worker_id: str,
+    error: str,
+    settings: QueueSettings | None = None,
+    now: float | None = None,
+) -> Result[str | None, StateError]:
+    """Release a failed lease for retry with backoff, or dead-letter it.
+
+    Returns the new status, or None if the worker no longer held the lease.
+    """
+    settings = settings or QueueSettings()
+    now = time.time() if now is None else now
+    try:
+        with transaction() as c:
+            row = c.execute(
+                """SELECT attempts FROM pending_releases
+                   WHERE release_id = ? AND status = ? AND lease_owner = ?""",
+                (release_id, STATUS_LEASED, worker_id),
+            ).fetchone()
+            if row is None:
+                return Success(None)
+            attempts = row["attempts"]
+            status = STATUS_DEAD if attempts >= settings.max_attempts else STATUS_PENDING
+            c.execute(
+                """UPDATE pending_releases
+                   SET status = ?, not_before = ?, last_error = ?,
+                       lease_owner = NULL, lease_expires_at = NULL
+                   WHERE release_id = ?""",
+                (status, now + backoff_seconds(attempts, settings), error, release_id),
+            )
+        return Success(status)
+    except sqlite3.Error as e:
+        return db_fail("Failed to record release failure", e)
+
+
+@beartype
+def count_due(now: float | None = None) -> Result[int, StateError]:
+    """Count releases ``claim_next`` would hand out now."""
+    now = time.time() if now is None else now
+    try:
+        with conn() as c:
+            row = c.execute(
+                """SELECT count(*) FROM pending_releases
+                   WHERE (status = :pending AND not_before <= :now)
+                      OR (status = :leased AND lease_expires_at <= :now)""",
+                {"pending": STATUS_PENDING, "leased": STATUS_LEASED, "now": now},
+            ).fetchone()
+        return Success(row[0])
+    except sqlite3.Error as e:
+        return db_fail("Failed to count due releases", e)
+
+
+@beartype
+def get_dead_releases() -> Result[list[DeadRelease], StateError]:
+    """Get dead-lettered releases in insertion order."""
+    try:
+        with conn() as c:
+            rows = c.execute(
+                """SELECT release_id, app_id, display_name, version, tag, asset_name,
+                          attempts, last_error
+                   FROM pending_releases WHERE status = ? ORDER BY rowid""",
+                (STATUS_DEAD,),
+            ).fetchall()
+        dead: list[DeadRelease] = [
+            {
+                "release_id": r["release_id"],
+                "app_id": r["app_id"],
+                "display_name": r["display_name"],
+                "version": r["version"],
+                "tag": r["tag"],
+                "asset_name": r["asset_name"],
+                "attempts": r["attempts"],
+                "last_error": r["last_error"],
+            }
+            for r in rows
+        ]
+        return Success(dead)
+    except sqlite3.Error as e:
+        return db_fail("Failed to get dead releases", e)
+
+
+@beartype
+def requeue_dead_releases() -> Result[int, StateError]:
+    """Give every dead-lettered release a fresh set of attempts. Returns count."""
+    try:
+        with conn() as c:
+            cursor = c.execute(
+                """UPDATE pending_releases
+                   SET status = ?, attempts = 0, not_before = 0
+                   WHERE status = ?""",
+                (STATUS_PENDING, STATUS_DEAD),
+            )
+        return Success(cursor.rowcount)
+    except sqlite3.Error as e:
+        return db_fail("Failed to requeue dead releases", e)
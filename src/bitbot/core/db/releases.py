@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 import sqlite3
 from typing import TypedDict
 
@@ -9,9 +10,12 @@ import icontract
 from beartype import beartype
 from returns.result import Failure, Result, Success
 
-from bitbot.core.db import conn, db_fail
+from bitbot.core.db import conn, db_fail, transaction
 from bitbot.core.errors import StateError
 
+# Newest processed IDs kept individually; older ones are folded into a range
+PROCESSED_RELEASES_KEEP = 1000
+
 
 class PendingRelease(TypedDict):
     """Pending release from queue."""
@@ -53,7 +57,7 @@ def set_offline_version(app_id: str, version: str) -> Result[None, StateError]:
 
 @beartype
 def get_processed_releases() -> Result[set[int], StateError]:
-    """Get processed source release IDs."""
+    """Get individually stored processed release IDs (compacted ranges excluded)."""
     try:
         with conn() as c:
             rows = c.execute("SELECT release_id FROM processed_releases").fetchall()
@@ -62,6 +66,72 @@ def get_processed_releases() -> Result[set[int], StateError]:
         return db_fail("Failed to get processed releases", e)
 
 
+@beartype
+def get_processed_among(release_ids: list[int]) -> Result[set[int], StateError]:
+    """Return which of the given release IDs were already processed.
+
+    The membership test runs in SQLite against both stored IDs and compacted
+    ranges, so only the batch being checked is loaded into memory.
+    """
+    if not release_ids:
+        return Success(set())
+    try:
+        with conn() as c:
+            rows = c.execute(
+                """SELECT DISTINCT j.value AS release_id FROM json_each(?) AS j
+                   WHERE EXISTS (
+                       SELECT 1 FROM processed_releases AS p WHERE p.release_id = j.value
+                   ) OR EXISTS (
+                       SELECT 1 FROM processed_ranges AS r
+                       WHERE r.lo <= j.value AND j.value <= r.hi
+                   )""",
+                (json.dumps(release_ids),),
+            ).fetchall()
+        return Success({r["release_id"] for r in rows})
+    except sqlite3.Error as e:
+        return db_fail("Failed to check processed releases", e)
+
+
+@icontract.require(lambda keep: keep >= 0)
+@beartype
+def compact_processed_releases(keep: int = PROCESSED_RELEASES_KEEP) -> Result[int, StateError]:
+    """Fold all but the newest ``keep`` processed IDs into one range record.
+
+    Relies on GitHub release IDs growing over time: everything at or below
+    the high-water mark counts as processed. Returns the number of IDs folded.
+    """
+    try:
+        with transaction() as c:
+            row = c.execute(
+                """SELECT release_id FROM processed_releases
+                   ORDER BY release_id DESC LIMIT 1 OFFSET ?""",
+                (keep,),
+            ).fetchone()
+            if row is None:
+                return Success(0)
+            cutoff = row["release_id"]
+            bounds = c.execute(
+                """SELECT MIN(lo) AS lo, MAX(hi) AS hi FROM (
+                       SELECT MIN(release_id) AS lo, MAX(release_id) AS hi
+                       FROM processed_releases WHERE release_id <= :cutoff
+                       UNION ALL
+                       SELECT lo, hi FROM processed_ranges WHERE lo <= :cutoff
+                   )""",
+                {"cutoff": cutoff},
+            ).fetchone()
+            c.execute("DELETE FROM processed_ranges WHERE lo <= ?", (cutoff,))
+            c.execute(
+                "INSERT INTO processed_ranges (lo, hi) VALUES (?, ?)",
+                (bounds["lo"], max(bounds["hi"], cutoff)),
+            )
+            folded = c.execute(
+                "DELETE FROM processed_releases WHERE release_id <= ?", (cutoff,)
+            ).rowcount
+        return Success(folded)
+    except sqlite3.Error as e:
+        return db_fail("Failed to compact processed releases", e)
+
+
 @icontract.require(lambda release_id: release_id > 0)
 @beartype
 def add_processed_release(release_id: int) -> Result[None, StateError]:
@@ -77,14 +147,31 @@ def add_processed_release(release_id: int) -> Result[None, StateError]:
         return db_fail("Failed to add processed release", e)
 
 
+@icontract.require(lambda release_ids: all(r > 0 for r in release_ids))
+@beartype
+def add_processed_releases_many(release_ids: list[int]) -> Result[None, StateError]:
+    """Mark several source releases as processed in a single transaction."""
+    if not release_ids:
+        return Success(None)
+    try:
+        with conn() as c:
+            c.executemany(
+                "INSERT OR IGNORE INTO processed_releases (release_id) VALUES (?)",
+                [(release_id,) for release_id in release_ids],
+            )
+        return Success(None)
+    except sqlite3.Error as e:
+        return db_fail("Failed to add processed releases", e)
+
+
 @beartype
 def get_pending_releases() -> Result[list[PendingRelease], StateError]:
-    """Get pending releases from queue in insertion order."""
+    """Get queued releases (pending or leased, not dead-lettered) in order."""
     try:
         with conn() as c:
             rows = c.execute(
                 """SELECT release_id, app_id, display_name, version, tag, asset_name
-                   FROM pending_releases ORDER BY rowid"""
+                   FROM pending_releases WHERE status != 'dead' ORDER BY rowid"""
             ).fetchall()
         releases: list[PendingRelease] = [
             {
@@ -131,6 +218,33 @@ def add_pending_release(  # noqa: PLR0913
         return db_fail("Failed to add pending release", e)
 
 
+@icontract.require(lambda releases: all(r["release_id"] > 0 for r in releases))
+@beartype
+def add_pending_releases_many(releases: list[PendingRelease]) -> Result[list[int], StateError]:
+    """Add several releases to the pending queue in a single transaction.
+
+    Releases already in the queue are skipped. Returns the IDs actually added.
+    """
+    if not releases:
+        return Success([])
+    try:
+        with transaction() as c:
+            added = [
+                release["release_id"]
+                for release in releases
+                if c.execute(
+                    """INSERT OR IGNORE INTO pending_releases
+                       (release_id, app_id, display_name, version, tag, asset_name)
+                       VALUES (:release_id, :app_id, :display_name, :version, :tag,
+                               :asset_name)""",
+                    release,
+                ).rowcount
+            ]
+        return Success(added)
+    except sqlite3.Error as e:
+        return db_fail("Failed to add pending releases", e)
+
+
 @icontract.require(lambda release_id: release_id > 0)
 @beartype
 def remove_pending_release(release_id: int) -> Result[None, StateError]:
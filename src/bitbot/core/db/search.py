@@ -0,0 +1,128 @@
+"""Offline full-text search over release notes and published posts.
+
+Documents live in ``search_documents``; triggers mirror them into the FTS5
+table ``search_index``, so indexing is just an upsert. Re-indexing an
+unchanged document is a no-op, which lets ``gather`` feed every release it
+streams without rewriting the index.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import TYPE_CHECKING, TypedDict
+
+import icontract
+from beartype import beartype
+from returns.result import Result, Success
+
+from bitbot.core.db import conn, db_fail
+
+if TYPE_CHECKING:
+    from bitbot.core.errors import StateError
+
+KIND_RELEASE = "release"
+KIND_POST = "post"
+
+# Wrapped around matched terms in snippets (control characters, never in text)
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+
+class SearchDocument(TypedDict):
+    """Text to index, identified by kind and an external reference."""
+
+    kind: str
+    ref: str
+    title: str
+    body: str
+    url: str | None
+
+
+class SearchHit(TypedDict):
+    """Ranked search result (lower rank is better)."""
+
+    kind: str
+    ref: str
+    title: str
+    url: str | None
+    snippet: str
+    rank: float
+
+
+@beartype
+def match_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word as typed.
+
+    Each word becomes a quoted string, so input like ``3.21`` or
+    ``BitLife-Mod.ipa`` is matched literally instead of being parsed as
+    query syntax.
+    """
+    terms = [word.replace('"', '""') for word in text.split()]
+    return " ".join(f'"{term}"' for term in terms)
+
+
+@beartype
+def index_documents(documents: list[SearchDocument]) -> Result[int, StateError]:
+    """Add or update documents in the search index. Returns how many changed."""
+    if not documents:
+        return Success(0)
+    try:
+        with conn() as c:
+            cursor = c.executemany(
+                """INSERT INTO search_documents (kind, ref, title, body, url)
+                   VALUES (:kind, :ref, :title, :body, :url)
+                   ON CONFLICT (kind, ref) DO UPDATE SET
+                       title = excluded.title, body = excluded.body, url = excluded.url
+                   WHERE title != excluded.title OR body != excluded.body
+                      OR url IS NOT excluded.url""",
+                documents,
+            )
+        return Success(cursor.rowcount)
+    except sqlite3.Error as e:
+        return db_fail("Failed to index documents", e)
+
+
+@icontract.require(lambda limit: limit > 0)
+@beartype
+def search(
+    query: str, kind: str | None = None, limit: int = 20, *, raw: bool = False
+) -> Result[list[SearchHit], StateError]:
+    """Rank indexed documents against a query (titles weigh more than bodies).
+
+    ``raw`` passes the query through as FTS5 syntax (``AND``/``OR``/``NEAR``,
+    prefixes, column filters); otherwise every word must match.
+    """
+    expression = query if raw else match_query(query)
+    if not expression.strip():
+        return Success([])
+    try:
+        with conn() as c:
+            rows = c.execute(
+                """SELECT d.kind, d.ref, d.title, d.url,
+                          snippet(search_index, 1, :start, :end, '…', 16) AS snippet,
+                          bm25(search_index, 5.0, 1.0) AS rank
+                   FROM search_index JOIN search_documents AS d ON d.id = search_index.rowid
+                   WHERE search_index MATCH :query AND (:kind IS NULL OR d.kind = :kind)
+                   ORDER BY rank LIMIT :limit""",
+                {
+                    "query": expression,
+                    "kind": kind,
+                    "limit": limit,
+                    "start": HIGHLIGHT_START,
+                    "end": HIGHLIGHT_END,
+                },
+            ).fetchall()
+    except sqlite3.Error as e:
+        return db_fail("Search failed", e)
+    hits: list[SearchHit] = [
+        {
+            "kind": r["kind"],
+            "ref": r["ref"],
+            "title": r["title"],
+            "url": r["url"],
+            "snippet": r["snippet"],
+            "rank": r["rank"],
+        }
+        for r in rows
+    ]
+    return Success(hits)
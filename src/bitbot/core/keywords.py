@@ -0,0 +1,98 @@
+"""Multi-pattern keyword matching.
+
+``KeywordMatcher`` compiles any number of keyword classes into one
+Aho-Corasick automaton, so a text is scanned once however many keywords
+there are, and every class it mentions is reported together.
+"""
+
+from collections.abc import Iterable, Mapping
+
+from beartype import beartype
+
+
+@beartype
+def _is_word(ch: str) -> bool:
+    r"""Whether a character is part of a word (same as regex ``\w``)."""
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    r"""Aho-Corasick automaton over named classes of literal keywords.
+
+    Matching is case-insensitive (both sides are case-folded). With
+    ``whole_words``, a keyword only matches where its first and last word
+    characters are not joined to neighbouring word characters, like ``\b``.
+    """
+
+    @beartype
+    def __init__(self, keywords: Mapping[str, Iterable[str]], *, whole_words: bool = False) -> None:
+        """Build the automaton for ``{class name: keywords}``."""
+        self.classes = tuple(keywords)
+        self.whole_words = whole_words
+        self._all = (1 << len(self.classes)) - 1
+        # Per node: transitions, failure link, and (class bit, length, check start, check end)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[int, int, bool, bool]]] = [[]]
+
+        for bit, words in enumerate(keywords.values()):
+            for word in words:
+                folded = word.casefold()
+                if folded:
+                    self._add(folded, 1 << bit)
+        self._link()
+
+    def _add(self, word: str, mask: int) -> None:
+        """Insert one keyword into the trie."""
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((mask, len(word), _is_word(word[0]), _is_word(word[-1])))
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge suffix outputs."""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    @beartype
+    def scan(self, text: str) -> frozenset[str]:
+        """Return the classes with at least one keyword in ``text``."""
+        folded = text.casefold()
+        goto, fail, out = self._goto, self._fail, self._out
+        whole_words = self.whole_words
+        end = len(folded)
+        found = 0
+        node = 0
+        for i, ch in enumerate(folded):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            for mask, length, check_start, check_end in out[node]:
+                if found & mask:
+                    continue
+                if whole_words:
+                    start = i - length + 1
+                    before = folded[start - 1] if check_start and start > 0 else " "
+                    after = folded[i + 1] if check_end and i + 1 < end else " "
+                    if before.isalnum() or before == "_" or after.isalnum() or after == "_":
+                        continue
+                found |= mask
+            if found == self._all:
+                break
+        return frozenset(name for bit, name in enumerate(self.classes) if found >> bit & 1)
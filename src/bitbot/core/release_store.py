@@ -0,0 +1,218 @@
+"""Sharded on-disk store for gathered release data.
+
+Layout (under ``dist/releases/``):
+- ``index.json`` = small index of apps, their shard file and content hash
+- ``<app_id>.json`` = one shard per app with latest release and history
+
+Only shards whose content hash changed are rewritten. Every write goes through
+a temp file plus ``os.replace`` so readers never see a half-written file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TypedDict
+
+from beartype import beartype
+from returns.result import Failure, Result, Success
+
+from bitbot import paths
+from bitbot.core.errors import StateError
+from bitbot.types import AppReleaseData, ReleasesData  # noqa: TC001
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class IndexEntry(TypedDict):
+    """Index entry for a single app shard."""
+
+    file: str
+    hash: str
+    display_name: str
+    latest_version: str
+
+
+@dataclass
+class WriteStats:
+    """Outcome of a sharded write."""
+
+    written: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+@beartype
+def _releases_dir(directory: Path | None) -> Path:
+    """Resolve the shard directory (read at call time so tests can patch paths)."""
+    return directory if directory is not None else paths.RELEASES_DIR
+
+
+@beartype
+def shard_filename(app_id: str) -> str:
+    """Return a filesystem/URL-safe shard file name for an app."""
+    return f"{_UNSAFE_CHARS.sub('_', app_id)}.json"
+
+
+@beartype
+def content_hash(app_data: AppReleaseData) -> str:
+    """Compute a stable hash of an app's release data."""
+    canonical = json.dumps(app_data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+@beartype
+def atomic_write_json(path: Path, data: Any, indent: int | None = None) -> None:  # noqa: ANN401
+    """Write JSON to path atomically via temp file plus rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    separators = (",", ":") if indent is None else None
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent, separators=separators)
+            f.flush()
+            os.fsync(f.fileno())
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+@beartype
+def load_index(directory: Path | None = None) -> Result[dict[str, IndexEntry], StateError]:
+    """Load the app index. Returns an empty index if nothing was written yet."""
+    index_file = _releases_dir(directory) / INDEX_FILE
+    if not index_file.exists():
+        return Success({})
+    try:
+        with index_file.open() as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        return Failure(StateError(f"Failed to read release index: {e}"))
+
+    apps = data.get("apps") if isinstance(data, dict) else None
+    if not isinstance(apps, dict):
+        return Failure(StateError("Release index has invalid format"))
+    return Success(apps)
+
+
+@beartype
+def _read_shard(
+    releases_dir: Path, app_id: str, entry: IndexEntry
+) -> Result[AppReleaseData, StateError]:
+    """Read one app shard referenced by the index."""
+    try:
+        with (releases_dir / entry["file"]).open() as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        return Failure(StateError(f"Failed to read release shard for {app_id}: {e}"))
+
+    if not isinstance(data, dict):
+        return Failure(StateError(f"Release shard for {app_id} has invalid format"))
+    return Success(data)  # type: ignore[arg-type]
+
+
+@beartype
+def load_app(
+    app_id: str, directory: Path | None = None
+) -> Result[AppReleaseData | None, StateError]:
+    """Load a single app's release data without reading the whole catalog."""
+    index_result = load_index(directory)
+    if isinstance(index_result, Failure):
+        return Failure(index_result.failure())
+
+    entry = index_result.unwrap().get(app_id)
+    if entry is None:
+        return Success(None)
+    return _read_shard(_releases_dir(directory), app_id, entry)
+
+
+@beartype
+def load_all(directory: Path | None = None) -> Result[ReleasesData, StateError]:
+    """Load release data for every indexed app."""
+    index_result = load_index(directory)
+    if isinstance(index_result, Failure):
+        return Failure(index_result.failure())
+
+    releases_dir = _releases_dir(directory)
+    releases: ReleasesData = {}
+    for app_id, entry in index_result.unwrap().items():
+        app_result = _read_shard(releases_dir, app_id, entry)
+        if isinstance(app_result, Failure):
+            return Failure(app_result.failure())
+        releases[app_id] = app_result.unwrap()
+    return Success(releases)
+
+
+@beartype
+def write_releases(
+    apps_data: ReleasesData,
+    directory: Path | None = None,
+    indent: int | None = None,
+) -> Result[WriteStats, StateError]:
+    """Write per-app shards, rewriting only apps whose content changed.
+
+    Shards for apps no longer present are removed. The index is rewritten
+    only when at least one entry changed. Fails without writing if two app
+    IDs share a shard file name.
+    """
+    releases_dir = _releases_dir(directory)
+    index_result = load_index(releases_dir)
+    # A corrupt index just means every shard gets rewritten
+    old_index = index_result.unwrap() if isinstance(index_result, Success) else {}
+
+    # Refuse IDs that sanitize to one file name before anything is written
+    owners: dict[str, str] = {}
+    for app_id in apps_data:
+        other = owners.setdefault(shard_filename(app_id), app_id)
+        if other != app_id:
+            return Failure(
+                StateError(f"Apps {other!r} and {app_id!r} map to the same release shard")
+            )
+
+    stats = WriteStats()
+    new_index: dict[str, IndexEntry] = {}
+    try:
+        for app_id, app_data in apps_data.items():
+            digest = content_hash(app_data)
+            filename = shard_filename(app_id)
+            new_index[app_id] = {
+                "file": filename,
+                "hash": digest,
+                "display_name": app_data["display_name"],
+                "latest_version": app_data["latest_release"]["version"],
+            }
+
+            old = old_index.get(app_id)
+            if old and old["hash"] == digest and (releases_dir / filename).exists():
+                stats.unchanged.append(app_id)
+                continue
+
+            atomic_write_json(releases_dir / filename, app_data, indent)
+            stats.written.append(app_id)
+
+        if new_index != old_index or not (releases_dir / INDEX_FILE).exists():
+            atomic_write_json(
+                releases_dir / INDEX_FILE, {"version": INDEX_VERSION, "apps": new_index}, indent
+            )
+
+        live_files = {entry["file"] for entry in new_index.values()}
+        for app_id, old in old_index.items():
+            if app_id in new_index:
+                continue
+            stats.removed.append(app_id)
+            if old["file"] in live_files:
+                continue
+            (releases_dir / old["file"]).unlink(missing_ok=True)
+    except OSError as e:
+        return Failure(StateError(f"Failed to write release shards: {e}"))
+
+    return Success(stats)
@@ -0,0 +1,156 @@
+"""Due-time scheduler for recurring jobs.
+
+``DueScheduler`` keeps keys in a min-heap ordered by when they are next
+due. ``run()`` sleeps until the earliest one is due (or a job finishes),
+hands due keys to a thread pool up to a concurrency limit, and reschedules
+each key at the time its job returns.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import icontract
+from beartype import beartype
+
+# A job checks one key and returns when it is next due (None to drop it)
+Job = Callable[[Any], float | None]
+
+
+@dataclass(order=True)
+class _Entry[K: Hashable]:
+    """Heap entry; cancelled entries stay in the heap until popped."""
+
+    due: float
+    seq: int
+    key: K = field(compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+class DueScheduler[K: Hashable]:
+    """Min-heap of keys by next due time, drained by a bounded thread pool.
+
+    Thread-safe: jobs may schedule other keys while ``run()`` is waiting.
+    A key is scheduled at most once; scheduling it again moves it.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        """Create an empty scheduler reading time from ``clock``."""
+        self._clock = clock
+        self._heap: list[_Entry[K]] = []
+        self._entries: dict[K, _Entry[K]] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = 0
+        self._stopped = False
+        self._error: BaseException | None = None
+
+    def __len__(self) -> int:
+        """Number of scheduled keys (not counting running jobs)."""
+        with self._cond:
+            return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        """Whether a key is scheduled."""
+        with self._cond:
+            return key in self._entries
+
+    @beartype
+    def schedule(self, key: K, due: float) -> None:
+        """Schedule ``key`` at ``due`` (moving it if already scheduled)."""
+        with self._cond:
+            self._push(key, due)
+            self._cond.notify_all()
+
+    @beartype
+    def cancel(self, key: K) -> bool:
+        """Unschedule ``key``. Returns whether it was scheduled."""
+        with self._cond:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            entry.cancelled = True
+            return True
+
+    def next_due(self) -> float | None:
+        """When the earliest key is due, or None if nothing is scheduled."""
+        with self._cond:
+            self._drop_cancelled()
+            return self._heap[0].due if self._heap else None
+
+    def stop(self) -> None:
+        """Make ``run()`` return once running jobs finish."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _push(self, key: K, due: float) -> None:
+        old = self._entries.get(key)
+        if old is not None:
+            old.cancelled = True
+        entry = _Entry(due, next(self._seq), key)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _drop_cancelled(self) -> None:
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+
+    @icontract.require(lambda max_workers: max_workers > 0)
+    @beartype
+    def run(self, job: Job, *, max_workers: int = 4, until: float | None = None) -> None:
+        """Run due jobs, at most ``max_workers`` at a time, until stopped.
+
+        With ``until``, returns once no job is running and nothing is due
+        at or before that time (keys due later stay scheduled). Without it,
+        runs until ``stop()`` or until nothing is scheduled. An exception
+        from a job stops the run and is re-raised here.
+        """
+        self._stopped = False
+        pool = ThreadPoolExecutor(max_workers, thread_name_prefix="bitbot-job")
+        with pool, self._cond:
+            while not self._stopped:
+                now = self._clock()
+                self._drop_cancelled()
+                while self._running < max_workers and self._heap and self._heap[0].due <= now:
+                    entry = heapq.heappop(self._heap)
+                    del self._entries[entry.key]
+                    self._running += 1
+                    pool.submit(self._run_job, job, entry.key)
+                    self._drop_cancelled()
+
+                if not self._running and (
+                    not self._heap or (until is not None and self._heap[0].due > until)
+                ):
+                    break
+                timeout = None
+                if self._heap and self._running < max_workers:
+                    timeout = max(self._heap[0].due - now, 0.0)
+                self._cond.wait(timeout)
+
+            while self._running:  # Let in-flight jobs report back
+                self._cond.wait()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run_job(self, job: Job, key: K) -> None:
+        due: float | None = None
+        error: BaseException | None = None
+        try:
+            due = job(key)
+        except BaseException as e:  # noqa: BLE001 - re-raised by run()
+            error = e
+        with self._cond:
+            self._running -= 1
+            if error is not None:
+                self._error = self._error or error
+                self._stopped = True
+            elif due is not None and key not in self._entries:
+                self._push(key, due)
+            self._cond.notify_all()
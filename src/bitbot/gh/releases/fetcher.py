@@ -1,7 +1,12 @@
 """GitHub release fetching."""
 
+import contextlib
 import json
+import queue
 import subprocess
+import tempfile
+import threading
+from collections.abc import Generator, Iterable, Iterator
 from typing import Any
 
 import icontract
@@ -53,6 +58,145 @@ def get_github_data(url: str) -> Result[dict[str, Any] | list[Any], GitHubAPIErr
         return Failure(GitHubAPIError(f"Failed to parse GitHub API response: {e}"))
 
 
+_WHITESPACE = " \t\r\n"
+_STREAM_CHUNK_SIZE = 64 * 1024
+_PREFETCH_CHUNKS = 16
+
+
+@beartype
+def iter_json_array_items(chunks: Iterable[str]) -> Iterator[Any]:
+    """Incrementally decode items from a stream of JSON arrays.
+
+    Accepts one or more concatenated top-level arrays (as emitted by
+    ``gh api --paginate``) split across arbitrary chunk boundaries and yields
+    each array element as soon as it is complete.
+
+    Raises:
+        json.JSONDecodeError: If the stream is not a sequence of JSON arrays.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    in_array = False
+
+    for chunk in chunks:
+        buf = buf[pos:] + chunk
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(buf):
+                break
+            char = buf[pos]
+            if not in_array:
+                if char != "[":
+                    msg = "Expected start of JSON array"
+                    raise json.JSONDecodeError(msg, buf, pos)
+                in_array = True
+                pos += 1
+            elif char == "]":
+                in_array = False
+                pos += 1
+            elif char == ",":
+                pos += 1
+            else:
+                try:
+                    item, pos = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # Element is incomplete - wait for the next chunk
+                    break
+                yield item
+
+    rest = buf[pos:].strip(_WHITESPACE)
+    if in_array or rest:
+        msg = "Unexpected end of JSON stream"
+        raise json.JSONDecodeError(msg, rest, 0)
+
+
+@beartype
+def _prefetch(chunks: Iterator[str], maxsize: int = _PREFETCH_CHUNKS) -> Generator[str]:
+    """Read chunks on a background thread so decoding overlaps network reads."""
+    buffer: queue.Queue[str | BaseException | None] = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def reader() -> None:
+        try:
+            for chunk in chunks:
+                if stop.is_set():
+                    return
+                buffer.put(chunk)
+            buffer.put(None)
+        except BaseException as e:  # re-raised on the consumer side
+            buffer.put(e)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while (item := buffer.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Drain so a reader blocked on a full buffer can observe the stop flag
+        while thread.is_alive():
+            with contextlib.suppress(queue.Empty):
+                buffer.get(timeout=0.05)
+
+
+@icontract.require(
+    lambda url: url.startswith("/"),
+    description="GitHub API URLs must start with / for relative paths",
+)
+@beartype
+def stream_github_list(url: str) -> Iterator[dict[str, Any]]:
+    """Stream items from a paginated GitHub list endpoint via ``gh api --paginate``.
+
+    Pages are decoded as they arrive, so memory stays flat regardless of how
+    many items the endpoint returns.
+
+    Raises:
+        GitHubAPIError: If gh fails or returns malformed JSON.
+    """
+    with tempfile.TemporaryFile(mode="w+") as stderr:
+        try:
+            process = subprocess.Popen(
+                ["gh", "api", "--paginate", url],  # noqa: S607
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                text=True,
+            )
+        except OSError as e:
+            msg = f"Command failed: gh api {url}: {e}"
+            raise GitHubAPIError(msg) from e
+
+        stdout = process.stdout
+        if stdout is None:
+            process.kill()
+            msg = f"Command failed: gh api {url}: no output stream"
+            raise GitHubAPIError(msg)
+
+        chunks = _prefetch(iter(lambda: stdout.read(_STREAM_CHUNK_SIZE), ""))
+        try:
+            for item in iter_json_array_items(chunks):
+                if isinstance(item, dict):
+                    yield item
+        except json.JSONDecodeError as e:
+            msg = f"Failed to parse GitHub API response: {e}"
+            raise GitHubAPIError(msg) from e
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            chunks.close()
+            stdout.close()
+
+        if process.returncode != 0:
+            stderr.seek(0)
+            msg = f"Command failed: gh api {url}: {stderr.read().strip()}"
+            raise GitHubAPIError(msg)
+
+
 @icontract.require(
     lambda repo: "/" in repo,
     description="Repository must be in owner/name format",
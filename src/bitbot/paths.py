@@ -12,8 +12,13 @@ ROOT_DIR: Path = Path(__file__).parent.parent.parent.resolve()
 CONFIG_FILE: Path = ROOT_DIR / "config.toml"
 DATABASE_FILE: Path = ROOT_DIR / "bitbot.db"
 
+# Local caches, kept out of git; the token cache holds credentials
+CACHE_DIR: Path = ROOT_DIR / ".cache"
+TOKEN_CACHE_FILE: Path = CACHE_DIR / "reddit-tokens.json"
+
 # Output and Artifact Directories
 DIST_DIR: Path = ROOT_DIR / "dist"
+RELEASES_DIR: Path = DIST_DIR / "releases"
 
 # Template Directory
 TEMPLATES_DIR: Path = ROOT_DIR / "templates"
@@ -1,6 +1,12 @@
 """Reddit client initialization."""
 
+import hashlib
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
 import praw
+import prawcore
 from beartype import beartype
 from returns.result import Failure, Result, Success
 
@@ -13,24 +19,100 @@ from bitbot.core.credentials import (
     get_reddit_username,
 )
 from bitbot.core.errors import RedditAPIError
-from bitbot.core.retry import retry_on_err
+from bitbot.reddit.tokens import CachedScriptAuthorizer
 
 
-@retry_on_err()
 @beartype
 def init_reddit(_config: Config | None = None) -> Result[praw.Reddit, RedditAPIError]:
-    """Initializes and returns a PRAW Reddit instance."""
+    """Initializes and returns a PRAW Reddit instance.
+
+    Makes no requests: a token cached in the database is reused, and the
+    credentials are only checked by the first API call that needs a new one.
+    """
     try:
+        client_id = get_reddit_client_id()
+        client_secret = get_reddit_client_secret()
+        username = get_reddit_username()
+        password = get_reddit_password()
         reddit = praw.Reddit(
-            client_id=get_reddit_client_id(),
-            client_secret=get_reddit_client_secret(),
+            client_id=client_id,
+            client_secret=client_secret,
             user_agent=get_reddit_user_agent(_config),
-            username=get_reddit_username(),
-            password=get_reddit_password(),
+            username=username,
+            password=password,
             validate_on_submit=True,
         )
-        # Test connection
-        reddit.user.me()
+        # Reaches into PRAW's private session wiring (praw 7.7-8.x, prawcore 2.x-4.x):
+        # _authorized_core is the script-auth session PRAW builds from the password
+        core = reddit._authorized_core  # noqa: SLF001
+        if core is None:
+            return Failure(RedditAPIError("Reddit client has no authorized session"))
+        authenticator = core._authorizer.authenticator  # noqa: SLF001
+        secret = hashlib.sha256(
+            f"{client_id}\0{client_secret}\0{username}\0{password}".encode()
+        ).digest()
+        authorizer = CachedScriptAuthorizer(
+            authenticator=authenticator, username=username, password=password, secret=secret
+        )
+        # Swap in a session that authorizes through the token cache
+        session: prawcore.Session = prawcore.session(
+            authorizer=authorizer, window_size=reddit.config.window_size
+        )
+        reddit._core = reddit._authorized_core = session  # noqa: SLF001
         return Success(reddit)
     except (ValueError, praw.exceptions.PRAWException) as e:
         return Failure(RedditAPIError(f"Failed to initialize Reddit client: {e}"))
+
+
+# PRAW instances are not safe to share between threads, so each thread gets
+# its own; worker jobs lend theirs back to the pool when they finish
+_clients = threading.local()
+_pool: list[praw.Reddit] = []
+_pool_lock = threading.Lock()
+
+
+@beartype
+def get_reddit(config: Config | None = None) -> Result[praw.Reddit, RedditAPIError]:
+    """Return this thread's Reddit client, taking one from the pool on first use.
+
+    Reusing clients keeps their HTTP sessions and OAuth tokens alive, so a
+    long-running process (``bitbot daemon``) authenticates once per client.
+    """
+    reddit = getattr(_clients, "reddit", None)
+    if reddit is not None:
+        return Success(reddit)
+    with _pool_lock:
+        reddit = _pool.pop() if _pool else None
+    if reddit is None:
+        result = init_reddit(config)
+        if isinstance(result, Failure):
+            return result
+        reddit = result.unwrap()
+    _clients.reddit = reddit
+    return Success(reddit)
+
+
+@contextmanager
+def pooled_reddit() -> Iterator[None]:
+    """Return the client this thread takes up inside the block to the pool on exit.
+
+    Wrap each job run on a short-lived worker thread, so the next worker
+    reuses its client instead of authenticating again.
+    """
+    held = getattr(_clients, "reddit", None)
+    try:
+        yield
+    finally:
+        reddit = getattr(_clients, "reddit", None)
+        if held is None and reddit is not None:
+            _clients.reddit = None
+            with _pool_lock:
+                _pool.append(reddit)
+
+
+@beartype
+def reset_reddit() -> None:
+    """Drop this thread's client and every pooled one (e.g. after credentials change)."""
+    _clients.reddit = None
+    with _pool_lock:
+        _pool.clear()
@@ -12,6 +12,7 @@ from bitbot.config_models import Config
 from bitbot.core.error_logger import get_logger
 from bitbot.core.errors import RedditAPIError
 from bitbot.core.retry import retry_on_err
+from bitbot.reddit.submissions import SubmissionCache
 
 if TYPE_CHECKING:
     import praw
@@ -54,15 +55,19 @@ def _check_link_safety(post_body: str, config: Config) -> Result[None, RedditAPI
 @retry_on_err()
 @beartype
 def update_post(
-    reddit: "praw.Reddit", post_id: str, post_body: str, config: Config
+    reddit: "praw.Reddit",
+    post_id: str,
+    post_body: str,
+    config: Config,
+    submissions: SubmissionCache | None = None,
 ) -> Result["praw.models.Submission", RedditAPIError]:
-    """Update existing Reddit post."""
+    """Update existing Reddit post (taken from ``submissions`` if given)."""
     safety_check = _check_link_safety(post_body, config)
     if isinstance(safety_check, Failure):
         return Failure(safety_check.failure())
 
     try:
-        submission = reddit.submission(id=post_id)
+        submission = submissions.get(post_id) if submissions else reddit.submission(id=post_id)
         submission.edit(post_body)
         return Success(submission)
     except RedditAPIException as e:
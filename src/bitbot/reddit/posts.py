@@ -1,119 +1,304 @@
-"""Reddit post management."""
+"""Reddit post management.
 
+The bot's submissions are mirrored in the ``bot_posts`` table. Each lookup
+first lists only the submissions newer than the newest known one, then
+filters the table in SQL. The table also records which outdated banner
+each post carries, so rolling a banner out only touches posts without it.
+"""
+
+import hashlib
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+import icontract
 import praw
 import praw.models
 from beartype import beartype
+from praw.exceptions import RedditAPIException
 from returns.result import Failure, Result, Success
 
 from bitbot import paths
 from bitbot.config_models import Config
+from bitbot.core import db
 from bitbot.core.error_logger import get_logger
 from bitbot.core.errors import RedditAPIError
 from bitbot.core.retry import retry_on_err
+from bitbot.reddit.client import get_reddit
+from bitbot.reddit.throttle import SharedRateLimit, ratelimit_delay
 
 logger = get_logger()
 
+# Title prefix of bot posts whose IDs are not known locally
+POST_IDENTIFIER = "[BitBot]"
+
+_LISTING_LIMIT = 100
+# Fullnames per /api/info request
+INFO_BATCH_SIZE = 100
+_EDIT_ATTEMPTS = 3  # Tries per edit while Reddit answers RATELIMIT
+
+_OUTDATED_HEADING = "## ⚠️ Outdated Post"
+_OUTDATED_BLOCK = re.compile(f"^{re.escape(_OUTDATED_HEADING)}.*?---", re.DOTALL | re.MULTILINE)
+
+
+@dataclass
+class BannerRollout:
+    """Post IDs by what rolling out an outdated banner did to them."""
+
+    edited: list[str] = field(default_factory=list)
+    current: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+
+@beartype
+def compute_content_hash(body: str) -> str:
+    """Compute hash of post body for change detection."""
+    # Normalize: lowercase, collapse whitespace
+    normalized = " ".join(body.lower().split())
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+@beartype
+def bot_post_row(submission: praw.models.Submission) -> db.BotPost:
+    """Row for a fully loaded submission (from a listing or /api/info)."""
+    return {
+        "post_id": submission.id,
+        "subreddit": submission.subreddit.display_name,
+        "title": submission.title,
+        "url": submission.url,
+        "created_utc": float(submission.created_utc),
+        "removed": submission.removed_by_category,
+        "body_hash": compute_content_hash(submission.selftext),
+        "banner_hash": None,
+    }
+
 
 @retry_on_err()
+@beartype
+def refresh_bot_posts(
+    reddit: praw.Reddit, username: str
+) -> Result[list[praw.models.Submission], RedditAPIError]:
+    """Record the user's submissions newer than the newest one in ``bot_posts``.
+
+    The first refresh reads one listing page. Later ones page towards the
+    present from the newest known post. Reddit also answers an empty page
+    when that post was deleted, so an empty answer is checked against the
+    first page: a cursor post missing from it is marked deleted, and the
+    page is recorded instead. New posts are also indexed for search.
+    """
+    cursor = db.get_bot_post_cursor(username)
+    if isinstance(cursor, Failure):
+        return Failure(RedditAPIError(f"Failed to read bot posts: {cursor.failure()}"))
+    cursor_id = cursor.unwrap()
+    before = f"t3_{cursor_id}" if cursor_id else None
+
+    try:
+        submissions: list[praw.models.Submission] = []
+        while True:
+            params = {"before": before} if before else {}
+            listing = reddit.redditor(username).submissions.new(limit=_LISTING_LIMIT, params=params)
+            batch = list(listing)
+            submissions.extend(batch)
+            if before is None or len(batch) < _LISTING_LIMIT:
+                break
+            before = batch[0].fullname  # Listings are newest first
+        if cursor_id and not submissions:
+            listing = reddit.redditor(username).submissions.new(limit=_LISTING_LIMIT)
+            first_page = list(listing)
+            if all(s.id != cursor_id for s in first_page):
+                deleted = db.set_bot_post_state(cursor_id, db.REMOVED_DELETED, None)
+                if isinstance(deleted, Failure):
+                    msg = f"Failed to update bot posts: {deleted.failure()}"
+                    return Failure(RedditAPIError(msg))
+                submissions = first_page
+        posts = [bot_post_row(s) for s in submissions]
+    except Exception as e:
+        return Failure(RedditAPIError(f"Failed to fetch bot posts: {e}"))
+
+    recorded = db.record_bot_posts(username, posts)
+    if isinstance(recorded, Failure):
+        return Failure(RedditAPIError(f"Failed to record bot posts: {recorded.failure()}"))
+    indexed = db.index_documents(
+        [
+            {
+                "kind": db.KIND_POST,
+                "ref": s.id,
+                "title": s.title,
+                "body": s.selftext,
+                "url": s.url,
+            }
+            for s in submissions
+        ]
+    )
+    if isinstance(indexed, Failure):
+        logger.warning("Bot posts not indexed for search: %s", indexed.failure())
+    return Success(submissions)
+
+
 @beartype
 def get_bot_posts(
     reddit: praw.Reddit,
     config: Config,
     known_post_ids: set[str] | None = None,
-) -> Result[list[praw.models.Submission], RedditAPIError]:
-    """Fetches bot's release posts from the configured subreddit.
+) -> Result[list[db.BotPost], RedditAPIError]:
+    """Fetches bot's release posts in the configured subreddit, newest first.
 
     Detection uses:
     1. Primary: Check if post.id in known_post_ids (if provided)
     2. Fallback: Check author == bot_user AND title.startswith("[BitBot]")
     """
-    try:
-        bot_user = reddit.user.me()
-        target_subreddit = config.reddit.subreddit.lower()
-        post_identifier = "[BitBot]"
-        known = known_post_ids or set()
-
-        posts = []
-        for submission in bot_user.submissions.new(limit=100):
-            if submission.subreddit.display_name.lower() != target_subreddit:
-                continue
-            if submission.id in known or submission.title.startswith(post_identifier):
-                posts.append(submission)
-
-        return Success(posts)
-    except Exception as e:
-        return Failure(RedditAPIError(f"Failed to fetch bot posts: {e}"))
+    username = reddit.config.username
+    if not username:
+        return Failure(RedditAPIError("Reddit client has no username"))
+
+    refreshed = refresh_bot_posts(reddit, username)
+    if isinstance(refreshed, Failure):
+        return Failure(refreshed.failure())
+
+    posts = db.find_bot_posts(
+        username, config.reddit.subreddit, POST_IDENTIFIER, sorted(known_post_ids or ())
+    )
+    if isinstance(posts, Failure):
+        return Failure(RedditAPIError(f"Failed to read bot posts: {posts.failure()}"))
+    return Success(posts.unwrap())
+
+
+@beartype
+def _outdated_banner(latest_release_details: dict[str, Any], config: Config) -> str | None:
+    """Render the outdated banner, or None if inject mode has no template."""
+    mode = config.outdated_post_handling.get("mode", "overwrite")
+
+    placeholders = {
+        "{{latest_post_title}}": latest_release_details["title"],
+        "{{latest_post_url}}": latest_release_details["url"],
+        "{{latest_version}}": latest_release_details["version"],
+        "{{asset_name}}": config.github.asset_file_name,
+        "{{bot_name}}": config.reddit.bot_name,
+    }
+
+    raw_template = ""
+    if mode == "inject":
+        template_name = config.reddit.templates.inject_banner
+        if not template_name:
+            return None
+
+        template_path = paths.get_template_path(Path(template_name).name)
+
+        try:
+            with Path(template_path).open() as f:
+                raw_template = f.read()
+        except FileNotFoundError:
+            return None
+
+    ignore_block = config.skip_content
+    start_marker, end_marker = ignore_block.get("startTag"), ignore_block.get("endTag")
+    if start_marker and end_marker and start_marker in raw_template:
+        pattern = re.compile(f"{re.escape(start_marker)}.*?{re.escape(end_marker)}", re.DOTALL)
+        banner_template = re.sub(pattern, "", raw_template).strip()
+    else:
+        banner_template = raw_template
+
+    injection_banner = banner_template
+    for placeholder, value in placeholders.items():
+        injection_banner = injection_banner.replace(placeholder, str(value))
+    return injection_banner
+
+
+@beartype
+def _with_banner(body: str, banner: str) -> str:
+    """A post body carrying ``banner``, replacing any earlier outdated banner."""
+    if _OUTDATED_HEADING in body:
+        return _OUTDATED_BLOCK.sub(f"{banner}\n\n---", body, 1)
+    return f"{banner}\n\n---\n\n{body}"
 
 
+@beartype
+def _edit_post(config: Config, post_id: str, body: str, throttle: SharedRateLimit) -> bool:
+    """Edit one post through this thread's client. Returns whether it was edited."""
+    reddit_result = get_reddit(config)
+    if isinstance(reddit_result, Failure):
+        logger.warning("Failed to update post %s: %s", post_id, reddit_result.failure())
+        return False
+    reddit = reddit_result.unwrap()
+
+    for _ in range(_EDIT_ATTEMPTS):
+        throttle.wait()
+        try:
+            reddit.submission(id=post_id).edit(body=body)
+        except RedditAPIException as e:
+            delay = ratelimit_delay(e)
+            if delay is None:
+                logger.warning("Failed to update post %s: %s", post_id, e)
+                return False
+            throttle.back_off(delay)
+        except Exception as e:
+            logger.warning("Failed to update post %s: %s", post_id, e)
+            return False
+        else:
+            return True
+        finally:
+            throttle.observe(reddit)
+    logger.warning("Failed to update post %s: still rate limited", post_id)
+    return False
+
+
+@icontract.require(lambda max_workers: max_workers > 0)
 @beartype
 def update_older_posts(
-    older_posts: list[praw.models.Submission],
+    reddit: praw.Reddit,
+    older_posts: list[db.BotPost],
     latest_release_details: dict[str, Any],
     config: Config,
-) -> Result[None, RedditAPIError]:
-    """Updates older posts by injecting an 'outdated' banner."""
-    try:
-        mode = config.outdated_post_handling.get("mode", "overwrite")
-
-        placeholders = {
-            "{{latest_post_title}}": latest_release_details["title"],
-            "{{latest_post_url}}": latest_release_details["url"],
-            "{{latest_version}}": latest_release_details["version"],
-            "{{asset_name}}": config.github.asset_file_name,
-            "{{bot_name}}": config.reddit.bot_name,
-        }
-
-        raw_template = ""
-        if mode == "inject":
-            template_name = config.reddit.templates.inject_banner
-            if not template_name:
-                return Success(None)
-
-            template_path = paths.get_template_path(Path(template_name).name)
-
-            try:
-                with Path(template_path).open() as f:
-                    raw_template = f.read()
-            except FileNotFoundError:
-                return Success(None)
-
-        ignore_block = config.skip_content
-        start_marker, end_marker = ignore_block.get("startTag"), ignore_block.get("endTag")
-        if start_marker and end_marker and start_marker in raw_template:
-            pattern = re.compile(f"{re.escape(start_marker)}.*?{re.escape(end_marker)}", re.DOTALL)
-            banner_template = re.sub(pattern, "", raw_template).strip()
-        else:
-            banner_template = raw_template
-
-        injection_banner = banner_template
-        for placeholder, value in placeholders.items():
-            injection_banner = injection_banner.replace(placeholder, str(value))
+    *,
+    max_workers: int = 4,
+) -> Result[BannerRollout, RedditAPIError]:
+    """Updates older posts by injecting an 'outdated' banner.
 
-        existence_check_string = "## ⚠️ Outdated Post"
+    Posts that are removed, or whose ``banner_hash`` shows they already
+    carry this banner, are skipped without a request. The rest are fetched
+    100 per request and only those whose body would change are edited, by
+    up to ``max_workers`` threads pacing themselves on a shared rate limit.
+    """
+    rollout = BannerRollout()
+    try:
+        banner = _outdated_banner(latest_release_details, config)
+        if banner is None:
+            return Success(rollout)
+        banner_hash = compute_content_hash(banner)
 
-        for old_post in older_posts:
-            original_body = old_post.selftext
-            new_body = ""
+        live = [p for p in older_posts if not p["removed"]]
+        rollout.current = [p["post_id"] for p in live if p["banner_hash"] == banner_hash]
+        stale = [f"t3_{p['post_id']}" for p in live if p["banner_hash"] != banner_hash]
 
-            try:
-                if existence_check_string in original_body:
-                    pattern = re.compile(
-                        f"^{re.escape(existence_check_string)}.*?---", re.DOTALL | re.MULTILINE
-                    )
-                    new_body = pattern.sub(f"{injection_banner}\n\n---", original_body, 1)
+        targets: dict[str, str] = {}
+        applied: dict[str, tuple[str, str]] = {}
+        for i in range(0, len(stale), INFO_BATCH_SIZE):
+            for submission in reddit.info(fullnames=stale[i : i + INFO_BATCH_SIZE]):
+                target = _with_banner(submission.selftext, banner)
+                if target == submission.selftext or not target.strip():
+                    rollout.current.append(submission.id)
+                    applied[submission.id] = (compute_content_hash(target), banner_hash)
                 else:
-                    new_body = f"{injection_banner}\n\n---\n\n{original_body}"
-
-                if new_body.strip() and new_body != original_body:
-                    old_post.edit(body=new_body)
-            except Exception as e:
-                logger.warning("Failed to update post %s: %s", old_post.id, e)
-                continue
+                    targets[submission.id] = target
 
-        return Success(None)
+        throttle = SharedRateLimit()
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="bitbot-banner") as pool:
+            edits = {
+                post_id: pool.submit(_edit_post, config, post_id, body, throttle)
+                for post_id, body in targets.items()
+            }
+        for post_id, edit in edits.items():
+            if edit.result():
+                rollout.edited.append(post_id)
+                applied[post_id] = (compute_content_hash(targets[post_id]), banner_hash)
+            else:
+                rollout.failed.append(post_id)
     except Exception as e:
         return Failure(RedditAPIError(f"Failed to update older posts: {e}"))
+
+    recorded = db.set_bot_post_banners(applied)
+    if isinstance(recorded, Failure):
+        logger.warning("Post banners not recorded: %s", recorded.failure())
+    return Success(rollout)
@@ -1,7 +1,8 @@
 """Reddit state management.
 
 Architecture:
-- releases.json = source of truth for what versions exist
+- bitbot.db catalog = source of truth for what versions exist (written by
+  gather; dist/releases/ is only its published export)
 - Local DB = our record of what we've announced (not parsed from Reddit)
 - Reddit = output destination, verified but not parsed for data
 
@@ -11,7 +12,6 @@ We don't parse versions from Reddit posts. Instead:
 3. If state is wrong, user can --reset and re-announce
 """
 
-import hashlib
 from dataclasses import dataclass
 
 import praw
@@ -20,8 +20,16 @@ from returns.result import Failure, Result, Success
 
 from bitbot.config_models import Config
 from bitbot.core import db
-from bitbot.core.errors import RedditAPIError
-from bitbot.reddit.posts import get_bot_posts
+from bitbot.core.db import AccountMeta
+from bitbot.core.errors import RedditAPIError, StateError
+from bitbot.core.retry import retry_on_err
+from bitbot.reddit.posts import (
+    INFO_BATCH_SIZE,
+    bot_post_row,
+    compute_content_hash,
+    get_bot_posts,
+)
+from bitbot.reddit.submissions import SubmissionCache
 
 
 @dataclass
@@ -36,6 +44,7 @@ class PostStatus:
     current_hash: str | None
     is_removed: bool
     removal_reason: str | None
+    title: str | None = None
 
 
 @dataclass
@@ -50,23 +59,24 @@ class StateCheck:
 
 
 @beartype
-def compute_content_hash(body: str) -> str:
-    """Compute hash of post body for change detection."""
-    # Normalize: lowercase, collapse whitespace
-    normalized = " ".join(body.lower().split())
-    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+def check_post_exists(
+    reddit: praw.Reddit, post_id: str, submissions: SubmissionCache | None = None
+) -> PostStatus:
+    """Check if a Reddit post exists and is accessible.
 
-
-@beartype
-def check_post_exists(reddit: praw.Reddit, post_id: str) -> PostStatus:
-    """Check if a Reddit post exists and is accessible."""
+    With ``submissions``, a post already read in this run is not fetched again.
+    """
     try:
-        submission = reddit.submission(id=post_id)
+        submission = (submissions or SubmissionCache(reddit)).get(post_id)
         # Access an attribute to trigger the fetch
         _ = submission.selftext
 
         is_removed = bool(submission.removed_by_category)
         removal_reason = submission.removed_by_category if is_removed else None
+        current_hash = compute_content_hash(submission.selftext)
+
+        # Keep the bot_posts row current while the post is at hand
+        db.set_bot_post_state(post_id, removal_reason, current_hash)
 
         return PostStatus(
             exists=True,
@@ -74,9 +84,10 @@ def check_post_exists(reddit: praw.Reddit, post_id: str) -> PostStatus:
             post_id=post_id,
             post_url=submission.url,
             current_body=submission.selftext,
-            current_hash=compute_content_hash(submission.selftext),
+            current_hash=current_hash,
             is_removed=is_removed,
             removal_reason=removal_reason,
+            title=submission.title,
         )
     except Exception:
         return PostStatus(
@@ -91,11 +102,76 @@ def check_post_exists(reddit: praw.Reddit, post_id: str) -> PostStatus:
         )
 
 
+@retry_on_err()
+@beartype
+def verify_posts(
+    reddit: praw.Reddit, username: str, post_ids: list[str]
+) -> Result[dict[str, PostStatus], RedditAPIError]:
+    """Check many posts at once and refresh their ``bot_posts`` rows.
+
+    Makes one /api/info request per 100 posts instead of one per post.
+    Posts Reddit no longer returns are reported as not existing and
+    recorded as deleted, in the same transaction as the refreshed rows.
+    """
+    post_ids = list(dict.fromkeys(post_ids))
+    statuses: dict[str, PostStatus] = {}
+    rows: list[db.BotPost] = []
+    try:
+        for i in range(0, len(post_ids), INFO_BATCH_SIZE):
+            fullnames = [f"t3_{post_id}" for post_id in post_ids[i : i + INFO_BATCH_SIZE]]
+            for submission in reddit.info(fullnames=fullnames):
+                if not isinstance(submission, praw.models.Submission):
+                    continue
+                row = bot_post_row(submission)
+                rows.append(row)
+                statuses[row["post_id"]] = PostStatus(
+                    exists=True,
+                    accessible=not row["removed"],
+                    post_id=row["post_id"],
+                    post_url=row["url"],
+                    current_body=submission.selftext,
+                    current_hash=row["body_hash"],
+                    is_removed=bool(row["removed"]),
+                    removal_reason=row["removed"],
+                    title=row["title"],
+                )
+    except Exception as e:
+        return Failure(RedditAPIError(f"Failed to verify posts: {e}"))
+
+    missing = [post_id for post_id in post_ids if post_id not in statuses]
+    try:
+        with db.transaction():
+            recorded = db.record_bot_posts(username, rows)
+            if isinstance(recorded, Failure):
+                raise recorded.failure()
+            for post_id in missing:
+                deleted = db.set_bot_post_state(post_id, db.REMOVED_DELETED, None)
+                if isinstance(deleted, Failure):
+                    raise deleted.failure()
+    except StateError as e:
+        return Failure(RedditAPIError(f"Failed to record post states: {e}"))
+
+    for post_id in missing:
+        statuses[post_id] = PostStatus(
+            exists=False,
+            accessible=False,
+            post_id=post_id,
+            post_url=None,
+            current_body=None,
+            current_hash=None,
+            is_removed=False,
+            removal_reason=None,
+        )
+    return Success({post_id: statuses[post_id] for post_id in post_ids})
+
+
 @beartype
 def verify_state(
     reddit: praw.Reddit,
-    account_id: int,
+    meta: AccountMeta,
     expected_body: str | None = None,
+    submissions: SubmissionCache | None = None,
+    active_status: PostStatus | None = None,
 ) -> StateCheck:
     """Verify local state against Reddit.
 
@@ -103,21 +179,13 @@ def verify_state(
     1. Does the active post exist?
     2. Is it accessible (not removed)?
     3. Does content hash match what we stored?
+
+    ``active_status`` is the active post's status when the caller already
+    has it (from ``verify_posts``); the post is then not fetched again.
     """
     issues: list[str] = []
 
-    # Get stored state
-    meta_result = db.get_account(account_id)
-    if isinstance(meta_result, Failure):
-        return StateCheck(
-            post_ok=False,
-            content_matches=False,
-            stored_hash=None,
-            current_hash=None,
-            issues=["Failed to get account metadata"],
-        )
-
-    meta = meta_result.unwrap()
+    # Stored state comes from the command's loaded account
     active_post_id = meta.get("active_post_id")
     stored_hash = meta.get("content_hash")
 
@@ -131,7 +199,7 @@ def verify_state(
         )
 
     # Check post on Reddit
-    status = check_post_exists(reddit, active_post_id)
+    status = active_status or check_post_exists(reddit, active_post_id, submissions)
 
     if not status.exists:
         issues.append(f"Post {active_post_id} no longer exists on Reddit")
@@ -180,7 +248,11 @@ def verify_state(
 def get_current_post(
     reddit: praw.Reddit, config: Config
 ) -> Result[PostStatus | None, RedditAPIError]:
-    """Get the current active post from Reddit."""
+    """Get the bot's latest post from the ``bot_posts`` cache.
+
+    The body is not fetched (``current_body`` is None); the removal state and
+    hash are as of the last listing or ``check_post_exists`` of the post.
+    """
     try:
         posts_result = get_bot_posts(reddit, config)
         if isinstance(posts_result, Failure):
@@ -191,18 +263,21 @@ def get_current_post(
             return Success(None)
 
         latest = posts[0]
-        is_removed = bool(latest.removed_by_category)
-
-        return Success(PostStatus(
-            exists=True,
-            accessible=not is_removed,
-            post_id=latest.id,
-            post_url=latest.url,
-            current_body=latest.selftext,
-            current_hash=compute_content_hash(latest.selftext),
-            is_removed=is_removed,
-            removal_reason=latest.removed_by_category if is_removed else None,
-        ))
+        is_removed = bool(latest["removed"])
+
+        return Success(
+            PostStatus(
+                exists=True,
+                accessible=not is_removed,
+                post_id=latest["post_id"],
+                post_url=latest["url"],
+                current_body=None,
+                current_hash=latest["body_hash"],
+                is_removed=is_removed,
+                removal_reason=latest["removed"],
+                title=latest["title"],
+            )
+        )
     except Exception as e:
         return Failure(RedditAPIError(f"Failed to get current post: {e}"))
 
@@ -0,0 +1,37 @@
+"""Per-run cache of Reddit submissions.
+
+PRAW submissions are lazy: the first attribute read fetches the whole
+submission, and ``edit()`` refreshes it from the response. Handing every
+step of a run the same object therefore costs one read at most, where a
+new ``reddit.submission(id=...)`` per step would fetch it again each time.
+"""
+
+import praw
+from beartype import beartype
+from praw.models import Submission
+
+
+class SubmissionCache:
+    """Submissions a run has looked up or created, keyed by ID."""
+
+    def __init__(self, reddit: praw.Reddit) -> None:
+        """Create an empty cache over ``reddit``."""
+        self._reddit = reddit
+        self._submissions: dict[str, Submission] = {}
+
+    @beartype
+    def get(self, post_id: str) -> Submission:
+        """The submission with ``post_id``; nothing is fetched until it is read."""
+        submission = self._submissions.get(post_id)
+        if submission is None:
+            submission = self._submissions[post_id] = self._reddit.submission(id=post_id)
+        return submission
+
+    @beartype
+    def add(self, submission: Submission) -> None:
+        """Keep a submission obtained elsewhere (e.g. just posted)."""
+        self._submissions[submission.id] = submission
+
+    def __contains__(self, post_id: object) -> bool:
+        """Whether ``post_id`` was looked up or added in this run."""
+        return post_id in self._submissions
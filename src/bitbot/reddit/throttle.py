@@ -0,0 +1,89 @@
+"""Pacing for several Reddit clients that share one rate limit.
+
+Each PRAW client paces itself from the ``X-Ratelimit-*`` headers it sees,
+but the limit belongs to the OAuth client and account, not to the
+connection. ``SharedRateLimit`` pools what every worker's client learns,
+so a burst from a worker pool waits as long as the most cautious client
+would, and a ``RATELIMIT`` error from one worker holds back all of them.
+"""
+
+import re
+import threading
+import time
+from collections.abc import Callable
+
+import praw
+from beartype import beartype
+from praw.exceptions import RedditAPIException
+
+_NANOSECONDS = 1_000_000_000
+
+# Reddit allows 100 requests a minute per OAuth client; never go faster than that
+MIN_SPACING_SECONDS = 0.6
+
+# The wait in messages like "Take a break for 9 minutes before trying again."
+_RATELIMIT_DELAY = re.compile(r"(\d+) (minute|second)")
+
+
+@beartype
+def ratelimit_delay(exception: RedditAPIException) -> float | None:
+    """Seconds a ``RATELIMIT`` API error asks to wait, or None for other errors."""
+    for item in exception.items:
+        if item.error_type == "RATELIMIT":
+            match = _RATELIMIT_DELAY.search(item.message or "")
+            if match is None:
+                return 60.0
+            amount = int(match.group(1))
+            return float(amount * 60 if match.group(2) == "minute" else amount)
+    return None
+
+
+class SharedRateLimit:
+    """Thread-safe gate that workers pass before each request."""
+
+    def __init__(
+        self,
+        clock: Callable[[], int] = time.monotonic_ns,
+        sleep: Callable[[float], None] = time.sleep,
+        min_spacing: float = MIN_SPACING_SECONDS,
+    ) -> None:
+        """Create an open gate reading time (in ns) from ``clock``.
+
+        Requests are let through at least ``min_spacing`` seconds apart.
+        """
+        self._clock = clock
+        self._sleep = sleep
+        self._spacing_ns = int(min_spacing * _NANOSECONDS)
+        self._lock = threading.Lock()
+        self._next_ns = 0
+
+    def wait(self) -> None:
+        """Block until the pooled rate limit allows another request.
+
+        Each caller reserves its slot under the lock, so workers released
+        together are spread out instead of all sending at once.
+        """
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next_ns)
+            self._next_ns = start + self._spacing_ns
+        delay_ns = start - now
+        if delay_ns > 0:
+            self._sleep(delay_ns / _NANOSECONDS)
+
+    @beartype
+    def observe(self, reddit: praw.Reddit) -> None:
+        """Adopt the pacing a client worked out from its latest response headers."""
+        core = reddit._core  # noqa: SLF001
+        if core is None:
+            return
+        next_ns = core.rate_limiter.next_request_timestamp_ns
+        if next_ns is not None:
+            with self._lock:
+                self._next_ns = max(self._next_ns, next_ns)
+
+    @beartype
+    def back_off(self, seconds: float) -> None:
+        """Hold every worker back for ``seconds`` (after a ``RATELIMIT`` error)."""
+        with self._lock:
+            self._next_ns = max(self._next_ns, self._clock() + int(seconds * _NANOSECONDS))
@@ -0,0 +1,138 @@
+"""Persisted Reddit OAuth tokens.
+
+A script app trades the username and password for an access token that
+lasts about a day. ``CachedScriptAuthorizer`` keeps that token in
+``CACHE_FILE``, so each run reuses it instead of repeating the password
+grant, and a new token is only requested once it expires or Reddit
+rejects it (prawcore re-authorizes on a 401 by itself).
+
+The cache file is a secret: a token in it acts as the bot account until it
+expires. It lives outside ``bitbot.db``, which is committed, and is kept out
+of git. Tokens are sealed with Fernet (AES-CBC with an HMAC-SHA256 tag)
+under a key derived from the app secret and account password, so changing
+either makes old tokens unreadable.
+"""
+
+import base64
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+
+from beartype import beartype
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from prawcore.auth import BaseAuthenticator, ScriptAuthorizer
+
+from bitbot import paths
+from bitbot.core.release_store import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE: Path = paths.TOKEN_CACHE_FILE
+
+# A cached token this close to expiry is not worth loading
+EXPIRY_MARGIN_SECONDS = 60.0
+
+# Serializes read-modify-write of the cache file between worker threads
+_cache_lock = threading.Lock()
+
+
+@beartype
+def _fernet(secret: bytes) -> Fernet:
+    """Build the Fernet cipher whose key is derived from ``secret``."""
+    key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"bitbot token").derive(secret)
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+@beartype
+def seal(plaintext: bytes, secret: bytes) -> bytes:
+    """Encrypt and authenticate ``plaintext`` under ``secret``."""
+    return _fernet(secret).encrypt(plaintext)
+
+
+@beartype
+def unseal(sealed: bytes, secret: bytes) -> bytes | None:
+    """Decrypt a sealed blob, or None if it was tampered with or the secret differs."""
+    try:
+        return _fernet(secret).decrypt(sealed)
+    except InvalidToken:
+        return None
+
+
+@beartype
+def _read_cache() -> dict[str, dict[str, str | float]]:
+    """Read every cached entry (empty if the file is missing)."""
+    if not CACHE_FILE.exists():
+        return {}
+    with CACHE_FILE.open(encoding="utf-8") as f:
+        entries: dict[str, dict[str, str | float]] = json.load(f)
+    return entries
+
+
+class CachedScriptAuthorizer(ScriptAuthorizer):
+    """Script authorizer that loads its token from the cache file and saves new ones.
+
+    Failures to read or write the cache are logged and otherwise ignored:
+    the authorizer then behaves like a plain ``ScriptAuthorizer``.
+    """
+
+    def __init__(
+        self,
+        *,
+        authenticator: BaseAuthenticator,
+        username: str,
+        password: str,
+        secret: bytes,
+    ) -> None:
+        """Create the authorizer and load a cached token if there is one."""
+        super().__init__(authenticator=authenticator, password=password, username=username)
+        self._cache_name = f"reddit:{username}"
+        self._secret = secret
+        self.load()
+
+    @beartype
+    def load(self) -> bool:
+        """Adopt the cached token. Returns whether a usable one was found."""
+        try:
+            entry = _read_cache().get(self._cache_name)
+        except (OSError, ValueError) as e:
+            logger.warning("Reddit token cache unavailable: %s", e)
+            return False
+        if entry is None or float(entry["expires_at"]) <= time.time() + EXPIRY_MARGIN_SECONDS:
+            return False
+        plaintext = unseal(str(entry["sealed"]).encode(), self._secret)
+        if plaintext is None:
+            return False
+        token = json.loads(plaintext)
+        remaining = token["expires_at"] - time.time()
+        self.access_token = token["access_token"]
+        self.scopes = set(token["scopes"])
+        self._expiration_timestamp_ns = time.monotonic_ns() + int(remaining * 1e9)
+        return True
+
+    def refresh(self) -> None:
+        """Request a new token with the password grant and cache it."""
+        super().refresh()
+        remaining = (self._expiration_timestamp_ns - time.monotonic_ns()) / 1e9
+        expires_at = time.time() + remaining
+        plaintext = json.dumps(
+            {
+                "access_token": self.access_token,
+                "scopes": sorted(self.scopes or ()),
+                "expires_at": expires_at,
+            }
+        ).encode()
+        sealed = seal(plaintext, self._secret).decode()
+        try:
+            with _cache_lock:
+                try:
+                    entries = _read_cache()
+                except ValueError:
+                    entries = {}  # Unreadable cache; start a new one
+                entries[self._cache_name] = {"sealed": sealed, "expires_at": expires_at}
+                atomic_write_json(CACHE_FILE, entries)
+        except OSError as e:
+            logger.warning("Could not cache Reddit token: %s", e)
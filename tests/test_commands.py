@@ -1,10 +1,14 @@
 """Tests for BitBot CLI commands."""
 
+from typing import Any
 from unittest.mock import MagicMock, patch
 
+import pytest
 from returns.result import Failure, Success
 from typer.testing import CliRunner
 
+from bitbot.core import db
+
 runner = CliRunner()
 
 
@@ -96,69 +100,846 @@ class TestPatchCommand:
 class TestPostCommandHelpers:
     """Tests for post command helper functions."""
 
-    def test_build_changelog_data_added(self):
-        """Test changelog detects added apps."""
-        from bitbot.commands.post import _build_changelog
-
-        releases_data = {
-            "newapp": {
-                "display_name": "New App",
-                "latest_release": {"version": "1.0.0", "download_url": "http://example.com"},
+    @pytest.fixture
+    def account_id(self, tmp_path, monkeypatch):
+        """Fresh database with one account; returns its ID."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "post.db")
+        db.init()
+        return db.get_or_create_account("bot", "sub").unwrap()
+
+    @staticmethod
+    def _gathered(**versions: str) -> dict[str, Any]:
+        return {
+            app_id: {
+                "display_name": app_id.title(),
+                "latest_release": {"version": version, "download_url": "http://example.com"},
                 "previous_releases": [],
             }
+            for app_id, version in versions.items()
         }
-        online_versions: dict[str, str] = {}
 
-        changelog = _build_changelog(releases_data, online_versions)
+    def test_rollover_uses_stored_creation_time(self, config):
+        """A stored creation time decides the rollover without reading the post."""
+        import time
+
+        import praw
+        from praw.models import Submission
+
+        from bitbot.commands.post import _should_create_new_post
+        from bitbot.reddit.submissions import SubmissionCache
+
+        reddit = MagicMock(spec=praw.Reddit)
+        submissions = SubmissionCache(reddit)
+        week = 7 * 86400
+
+        assert _should_create_new_post(submissions, "p1", time.time() - 60, config) is False
+        assert _should_create_new_post(submissions, "p1", time.time() - week, config) is True
+        reddit.submission.assert_not_called()
+
+        reddit.submission.return_value = MagicMock(spec=Submission)
+        reddit.submission.return_value.created_utc = time.time() - 60
+        assert _should_create_new_post(submissions, "p1", None, config) is False
+        assert _should_create_new_post(submissions, "p1", None, config) is False
+        reddit.submission.assert_called_once_with(id="p1")
+
+    def test_missing_creation_time_is_read_once(self, config, account_id):
+        """An upgraded account's creation time is read from Reddit once, then stored."""
+        import praw
+        from praw.models import Submission
+
+        from bitbot.commands.post import _active_post_created
+        from bitbot.reddit.submissions import SubmissionCache
+
+        db.update_account(account_id, active_post_id="p1")
+        reddit = MagicMock(spec=praw.Reddit)
+        reddit.submission.return_value = MagicMock(spec=Submission)
+        reddit.submission.return_value.created_utc = 1700000000
+
+        account = db.AccountState.load("bot", "sub").unwrap()
+        assert _active_post_created(SubmissionCache(reddit), account) == 1700000000.0
+
+        account = db.AccountState.load("bot", "sub").unwrap()
+        assert _active_post_created(SubmissionCache(reddit), account) == 1700000000.0
+        reddit.submission.assert_called_once_with(id="p1")
+
+    def test_build_changelog_data_added(self, account_id):
+        """Test changelog detects added apps."""
+        from bitbot.commands.post import _build_changelog
+
+        db.replace_catalog(self._gathered(newapp="1.0.0"))
+
+        changelog = _build_changelog(account_id)
 
         assert "newapp" in changelog["added"]
         assert changelog["added"]["newapp"]["version"] == "1.0.0"
+        assert changelog["added"]["newapp"]["url"] == "http://example.com"
 
-    def test_build_changelog_data_updated(self):
+    def test_build_changelog_data_updated(self, account_id):
         """Test changelog detects updated apps."""
         from bitbot.commands.post import _build_changelog
 
-        releases_data = {
-            "app1": {
-                "display_name": "App 1",
-                "latest_release": {"version": "2.0.0", "download_url": "http://example.com"},
-                "previous_releases": [],
-            }
-        }
-        online_versions = {"app1": "1.0.0"}
+        db.replace_catalog(self._gathered(app1="2.0.0"))
+        db.set_posted_versions(account_id, {"app1": "1.0.0"})
 
-        changelog = _build_changelog(releases_data, online_versions)
+        changelog = _build_changelog(account_id)
 
         assert "app1" in changelog["updated"]
         assert changelog["updated"]["app1"]["old"] == "1.0.0"
         assert changelog["updated"]["app1"]["new"]["version"] == "2.0.0"
 
-    def test_build_changelog_data_removed(self):
+    def test_build_changelog_data_removed(self, account_id):
         """Test changelog detects removed apps."""
         from bitbot.commands.post import _build_changelog
 
-        releases_data: dict = {}
-        online_versions = {"oldapp": "1.0.0"}
+        db.set_posted_versions(account_id, {"oldapp": "1.0.0"})
 
-        changelog = _build_changelog(releases_data, online_versions)
+        changelog = _build_changelog(account_id)
 
-        assert "oldapp" in changelog["removed"]
+        assert changelog["removed"] == {"oldapp": {"display_name": "oldapp", "version": "1.0.0"}}
 
-    def test_build_changelog_data_no_changes(self):
+    def test_build_changelog_data_no_changes(self, account_id):
         """Test changelog with no changes."""
         from bitbot.commands.post import _build_changelog
 
-        releases_data = {
-            "app1": {
-                "display_name": "App 1",
-                "latest_release": {"version": "1.0.0", "download_url": "http://example.com"},
-                "previous_releases": [],
-            }
-        }
-        online_versions = {"app1": "1.0.0"}
+        db.replace_catalog(self._gathered(app1="1.0.0"))
+        db.set_posted_versions(account_id, {"app1": "1.0.0"})
 
-        changelog = _build_changelog(releases_data, online_versions)
+        changelog = _build_changelog(account_id)
 
         assert len(changelog["added"]) == 0
         assert len(changelog["updated"]) == 0
         assert len(changelog["removed"]) == 0
+
+    def test_build_changelog_is_per_account(self, account_id):
+        """Versions announced by another account do not count."""
+        from bitbot.commands.post import _build_changelog
+
+        other = db.get_or_create_account("other", "sub").unwrap()
+        db.replace_catalog(self._gathered(app1="1.0.0"))
+        db.set_posted_versions(other, {"app1": "1.0.0"})
+
+        assert list(_build_changelog(account_id)["added"]) == ["app1"]
+
+
+class TestSearchCommand:
+    """Tests for the offline search command."""
+
+    def test_search_prints_ranked_matches(self, tmp_path, monkeypatch):
+        """Matches are printed with their kind and highlighted snippet."""
+        import io
+
+        from rich.console import Console
+
+        from bitbot.commands.search import app
+
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "search.db")
+        db.init()
+        db.index_documents(
+            [
+                {
+                    "kind": "release",
+                    "ref": "1",
+                    "title": "v3.21",
+                    "body": "app: BitLife\nversion: 3.21",
+                    "url": None,
+                }
+            ]
+        )
+        output = io.StringIO()
+        mock_container = MagicMock()
+        mock_container.console.return_value = Console(file=output, width=120)
+        mock_container.config.return_value.database = {}
+
+        result = runner.invoke(
+            app, ["3.21", "--kind", "release"], obj={"container": mock_container}
+        )
+
+        assert result.exit_code == 0
+        assert "v3.21" in output.getvalue()
+        assert "1 result(s)" in output.getvalue()
+
+    def test_search_json_output(self, tmp_path, monkeypatch):
+        """--json prints the hits as JSON."""
+        import io
+        import json
+
+        from rich.console import Console
+
+        from bitbot.commands.search import app
+
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "search.db")
+        db.init()
+        output = io.StringIO()
+        mock_container = MagicMock()
+        mock_container.console.return_value = Console(file=output)
+        mock_container.config.return_value.database = {}
+
+        result = runner.invoke(app, ["nothing", "--json"], obj={"container": mock_container})
+
+        assert result.exit_code == 0
+        assert json.loads(output.getvalue()) == []
+
+
+class TestDbMaintainCommand:
+    """Tests for the database maintenance command."""
+
+    def test_maintain_reports_sizes(self, tmp_path, monkeypatch):
+        """Retention from config is applied and sizes are reported."""
+        import io
+
+        from rich.console import Console
+
+        from bitbot.commands.database import app
+
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "maintain.db")
+        db.init()
+        account_id = db.get_or_create_account("bot", "sub").unwrap()
+        for i in range(3):
+            db.add_post_id(account_id, f"p{i}")
+        output = io.StringIO()
+        mock_container = MagicMock()
+        mock_container.console.return_value = Console(file=output, width=120)
+        mock_container.config.return_value.database = {"retention": {"post_ids": 1}}
+
+        result = runner.invoke(app, [], obj={"container": mock_container})
+
+        assert result.exit_code == 0
+        assert "post_ids: pruned 2 row(s)" in output.getvalue()
+        assert "reclaimed" in output.getvalue()
+        assert db.get_post_ids(account_id).unwrap() == ["p2"]
+
+    def test_maintain_rejects_unknown_table(self, tmp_path, monkeypatch):
+        """A retention entry without a rule is an error."""
+        import io
+
+        from rich.console import Console
+
+        from bitbot.commands.database import app
+
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "maintain.db")
+        mock_container = MagicMock()
+        mock_container.console.return_value = Console(file=io.StringIO())
+        mock_container.config.return_value.database = {"retention": {"nope": 1}}
+
+        result = runner.invoke(app, [], obj={"container": mock_container})
+
+        assert result.exit_code == 1
+
+
+class TestSyncHistory:
+    """Tests for verifying an account's whole post history."""
+
+    def test_reports_hidden_posts(self):
+        """Removed and vanished posts are listed; visible ones are only counted."""
+        import io
+
+        import praw
+        from rich.console import Console
+
+        from bitbot.commands.sync import _report_history
+        from bitbot.reddit.state import PostStatus
+
+        def status(post_id, *, exists=True, removed=None):
+            return PostStatus(
+                exists=exists,
+                accessible=exists and not removed,
+                post_id=post_id,
+                post_url=None,
+                current_body=None,
+                current_hash=None,
+                is_removed=bool(removed),
+                removal_reason=removed,
+            )
+
+        statuses = {
+            "a": status("a"),
+            "b": status("b", removed="moderator"),
+            "c": status("c", exists=False),
+        }
+        output = io.StringIO()
+        with patch("bitbot.commands.sync.verify_posts", return_value=Success(statuses)) as verify:
+            _report_history(
+                MagicMock(spec=praw.Reddit), "bot", ["a", "b", "c"], Console(file=output)
+            )
+
+        verify.assert_called_once()
+        text = output.getvalue()
+        assert "3 posts checked" in text
+        assert "b: moderator" in text
+        assert "c: no longer exists" in text
+        assert "a:" not in text
+
+
+class TestCheckComments:
+    """Tests for incremental comment checks."""
+
+    @pytest.fixture
+    def account(self, tmp_path, monkeypatch):
+        """Account with an active post that is due for a check."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "check.db")
+        db.init()
+        account = db.AccountState.load("bot", "sub").unwrap()
+        account.update(active_post_id="post1")
+        return account
+
+    @staticmethod
+    def comment(comment_id, body, link_id="t3_post1", edited=False, is_root=True) -> MagicMock:
+        from praw.models import Comment
+
+        comment = MagicMock(spec=Comment)
+        comment.id = comment_id
+        comment.fullname = f"t1_{comment_id}"
+        comment.body = body
+        comment.link_id = link_id
+        comment.edited = edited
+        comment.is_root = is_root
+        return comment
+
+    def _serve(self, submission, top_level, replies=(), *, truncated=False):
+        """Serve a comment page: ``top_level`` comments plus ``replies``.
+
+        With ``truncated``, Reddit also sent a "load more" stub, which is dropped.
+        """
+        for reply in replies:
+            reply.is_root = False
+        submission.comments.list.return_value = [*top_level, *replies]
+        submission.comments.replace_more.return_value = [MagicMock()] if truncated else []
+
+    @pytest.fixture
+    def reddit(self):
+        """Fake Reddit whose active post has a status line."""
+        import praw
+        from praw.models import Submission
+
+        reddit = MagicMock(spec=praw.Reddit)
+        reddit.subreddit = MagicMock()  # Set per instance by praw, so not in the spec
+        submission = MagicMock(spec=Submission)
+        submission.selftext = "**Status:** Unknown"
+        reddit.submission.return_value = submission
+        return reddit
+
+    def _check(self, config, account, reddit):
+        from bitbot.commands.check import check_comments
+
+        account.update(last_check_timestamp="2000-01-01T00:00:00+00:00")
+        with patch("bitbot.commands.check.get_reddit", return_value=Success(reddit)):
+            return check_comments(config, account)
+
+    def test_first_check_scans_thread_then_only_recent_comments(self, config, account, reddit):
+        """The tree is read once; later checks read the newest page back to the cursor."""
+        submission = reddit.submission.return_value
+        self._serve(
+            submission,
+            [self.comment("a1", "works great"), self.comment("a2", "broken on iOS")],
+            [self.comment("a3", "working, thanks")],
+        )
+
+        assert isinstance(self._check(config, account, reddit), Success)
+        assert db.get_comment_thread("post1").unwrap() == {
+            "score": 1,
+            "comments": 3,
+            "last_seen": "t1_a3",
+        }
+        submission.edit.assert_not_called()  # Still "Unknown"
+
+        submission.comments.replace_more.reset_mock()
+        self._serve(
+            submission,
+            [self.comment("a4", "works for me"), self.comment("a2", "broken on iOS")],
+            [self.comment("a3", "working, thanks")],
+        )
+        assert isinstance(self._check(config, account, reddit), Success)
+
+        assert submission.comment_sort == "new"
+        assert submission.comment_limit == 100
+        submission.comments.replace_more.assert_called_once()
+        assert db.get_comment_thread("post1").unwrap() == {
+            "score": 2,
+            "comments": 4,
+            "last_seen": "t1_a4",
+        }
+        submission.edit.assert_called_once_with(body="**Status:** Working")
+        assert account.meta["last_comment_count"] == 4
+
+    def test_deleted_cursor_comment_does_not_stall(self, config, account, reddit):
+        """The cursor is an ID to compare against, so its comment may disappear."""
+        db.record_comment_verdicts(
+            "post1", [{"comment_id": "a1", "edited": 0.0, "verdict": 0}], "t1_a2"
+        )
+        submission = reddit.submission.return_value
+        self._serve(submission, [self.comment("a3", "works"), self.comment("a1", "hi")])
+
+        assert isinstance(self._check(config, account, reddit), Success)
+
+        assert reddit.submission.call_count == 1  # The page reached back to the cursor
+        assert db.get_comment_thread("post1").unwrap() == {
+            "score": 1,
+            "comments": 2,
+            "last_seen": "t1_a3",
+        }
+
+    def test_page_short_of_cursor_fetches_whole_thread(self, config, account, reddit):
+        """A page holding only newer top-level comments falls back to the full tree."""
+        from praw.models import Submission
+
+        db.record_comment_verdicts("post1", [], "t1_a2")
+        full = MagicMock(spec=Submission)
+        full.selftext = "**Status:** Unknown"
+        self._serve(full, [self.comment("a1", "broken"), self.comment("a4", "broken")])
+        page = reddit.submission.return_value
+        page.id = "post1"
+        self._serve(page, [self.comment("a4", "broken")])
+        reddit.submission.side_effect = [page, full]
+
+        assert isinstance(self._check(config, account, reddit), Success)
+
+        assert db.get_comment_thread("post1").unwrap()["comments"] == 2
+        assert db.get_comment_thread("post1").unwrap()["last_seen"] == "t1_a4"
+
+    def test_truncated_page_fetches_reply_under_old_comment(self, config, account, reddit):
+        """A new reply under an older comment left off the page is still scored."""
+        from praw.models import Submission
+
+        db.record_comment_verdicts(
+            "post1",
+            [
+                {"comment_id": "a1", "edited": 0.0, "verdict": 0},
+                {"comment_id": "a2", "edited": 0.0, "verdict": 0},
+            ],
+            "t1_a3",
+        )
+        full = MagicMock(spec=Submission)
+        full.selftext = "**Status:** Unknown"
+        self._serve(
+            full,
+            [self.comment("a4", "hello"), self.comment("a2", "hi"), self.comment("a1", "hey")],
+            [self.comment("a5", "broken", is_root=False)],
+        )
+        page = reddit.submission.return_value
+        page.id = "post1"
+        self._serve(page, [self.comment("a4", "hello"), self.comment("a2", "hi")], truncated=True)
+        reddit.submission.side_effect = [page, full]
+
+        assert isinstance(self._check(config, account, reddit), Success)
+
+        assert db.get_comment_thread("post1").unwrap() == {
+            "score": -1,
+            "comments": 4,
+            "last_seen": "t1_a5",
+        }
+
+    def test_quiet_check_restores_status_line(self, config, account, reddit):
+        """The status line is reconciled even when no comment changed."""
+        db.record_comment_verdicts(
+            "post1", [{"comment_id": "a1", "edited": 0.0, "verdict": 0}], "t1_a1"
+        )
+        submission = reddit.submission.return_value
+        submission.selftext = "**Status:** Working"
+        self._serve(submission, [self.comment("a1", "hello")])
+
+        assert isinstance(self._check(config, account, reddit), Success)
+
+        submission.edit.assert_called_once_with(body="**Status:** Unknown")
+
+    def test_no_new_comments_leaves_post_alone(self, config, account, reddit):
+        """A quiet check neither scores nor edits anything."""
+        db.record_comment_verdicts("post1", [], "t1_z9")
+        self._serve(reddit.submission.return_value, [])
+
+        assert isinstance(self._check(config, account, reddit), Success)
+
+        reddit.submission.return_value.edit.assert_not_called()
+        assert db.get_comment_thread("post1").unwrap()["last_seen"] == "t1_z9"
+
+    def test_score_changed_skips_unedited_comments(self, config):
+        """Only new or edited comments are scored; edits adjust the score."""
+        from bitbot.commands.check import _score_changed
+
+        known = {
+            "a1": {"comment_id": "a1", "edited": 0.0, "verdict": 1},
+            "a2": {"comment_id": "a2", "edited": 0.0, "verdict": 1},
+        }
+        comments = [
+            self.comment("a1", "works"),
+            self.comment("a2", "broken now", edited=1700000000.0),
+            self.comment("a3", "works"),
+        ]
+
+        verdicts, delta = _score_changed(comments, known, config)
+
+        assert [v["comment_id"] for v in verdicts] == ["a2", "a3"]
+        assert delta == -1 - 1 + 1
+
+
+class TestCommentStream:
+    """Tests for scoring streamed comments."""
+
+    @pytest.fixture
+    def reddit(self, tmp_path, monkeypatch):
+        """Fake Reddit over a fresh database; every post reads "Unknown"."""
+        import praw
+        from praw.models import Submission
+
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "stream.db")
+        db.init()
+        reddit = MagicMock(spec=praw.Reddit)
+        reddit.subreddit = MagicMock()
+
+        def submission(id):  # noqa: A002
+            post = MagicMock(spec=Submission)
+            post.id = id
+            post.selftext = "**Status:** Unknown"
+            return post
+
+        reddit.submission = MagicMock(side_effect=submission)
+        return reddit
+
+    def test_scores_watched_posts_and_debounces_edits(self, config, reddit):
+        """Tallies update per comment; each post is edited at most once per window."""
+        from bitbot.commands.check import CommentStream
+
+        now = [0.0]
+        stream = CommentStream(config, reddit, debounce_seconds=30.0, clock=lambda: now[0])
+        stream.watch(["post1"])
+        comment = TestCheckComments.comment
+
+        assert stream.handle(comment("z1", "works", link_id="t3_other")).unwrap() is False
+        for comment_id in ("a1", "a2"):
+            assert stream.handle(comment(comment_id, "works")).unwrap() is True
+        assert stream.handle(comment("a2", "works")).unwrap() is False  # Already scored
+        assert stream.flush() == []
+        assert db.get_comment_thread("post1").unwrap()["score"] == 2
+        reddit.submission.assert_called_once_with(id="post1")
+
+        # Changes inside the window collapse into one later edit
+        reddit.submission.reset_mock()
+        for comment_id in ("a3", "a4", "a5", "a6"):
+            stream.handle(comment(comment_id, "broken"))
+        now[0] = 10.0
+        stream.flush()
+        reddit.submission.assert_not_called()
+        now[0] = 30.0
+        stream.flush()
+        reddit.submission.assert_called_once_with(id="post1")
+
+    def test_edit_text_and_retry(self, config, reddit):
+        """The status line is rewritten; a failed edit stays pending until forced."""
+        from bitbot.commands.check import CommentStream
+
+        post = reddit.submission(id="post1")
+        post.edit.side_effect = [RuntimeError("503"), None]
+        reddit.submission.side_effect = None
+        reddit.submission.return_value = post
+        stream = CommentStream(config, reddit, clock=lambda: 0.0)
+        stream.watch(["post1"])
+        stream.handle(TestCheckComments.comment("a1", "works"))
+        stream.handle(TestCheckComments.comment("a2", "works"))
+
+        errors = stream.flush()
+        assert [e.message for e in errors] == ["Failed to update status of post1: 503"]
+        assert stream.flush() == []  # Still inside the window
+        assert stream.flush(force=True) == []
+        post.edit.assert_called_with(body="**Status:** Working")
+
+    def test_stream_command_loop(self, config, reddit):
+        """The loop streams the active posts' subreddits and flushes on exit."""
+        import io
+
+        from rich.console import Console
+
+        from bitbot.commands.check import stream_comments
+        from bitbot.core.error_logger import ErrorLogger
+
+        account_id = db.get_or_create_account("bot", "sub").unwrap()
+        db.update_account(account_id, active_post_id="post1")
+        comments = [TestCheckComments.comment(c, "works") for c in ("a1", "a2")]
+        feed = reddit.subreddit.return_value.stream.comments
+        feed.return_value = iter([comments[0], None, comments[1]])
+
+        with patch("bitbot.commands.check.get_reddit", return_value=Success(reddit)):
+            stream_comments(
+                config,
+                Console(file=io.StringIO()),
+                MagicMock(spec=ErrorLogger),
+                username="bot",
+                debounce_seconds=60.0,
+            )
+
+        reddit.subreddit.assert_called_once_with("sub")
+        feed.assert_called_once_with(skip_existing=True, pause_after=0)
+        assert db.get_comment_thread("post1").unwrap()["score"] == 2
+        assert reddit.submission.call_count == 2  # One in the window, one on exit
+
+
+class TestCheckAll:
+    """Tests for checking every account of a user."""
+
+    @pytest.fixture
+    def accounts(self, tmp_path, monkeypatch):
+        """Accounts in three subreddits; one is due, one is not, one is another user's."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "check_all.db")
+        db.init()
+        recent = "2100-01-01T00:00:00+00:00"
+        for user, subreddit, last_check in (
+            ("bot", "due", None),
+            ("bot", "later", recent),
+            ("other", "due", None),
+        ):
+            account_id = db.get_or_create_account(user, subreddit).unwrap()
+            db.update_account(account_id, active_post_id=f"{subreddit}1")
+            if last_check:
+                db.update_account(account_id, last_check_timestamp=last_check)
+
+    def test_runs_only_due_checks_of_user(self, config, accounts):
+        """One pass checks due posts of the given user and returns."""
+        import io
+
+        from rich.console import Console
+
+        from bitbot.commands.check import CheckResult, check_all
+        from bitbot.core.error_logger import ErrorLogger
+
+        checked = []
+
+        def fake_check(config, username, subreddit):
+            checked.append((username, subreddit))
+            return Success(CheckResult.STATE_CHANGED), None
+
+        output = io.StringIO()
+        with patch("bitbot.commands.check._check_account", side_effect=fake_check):
+            failures = check_all(
+                config,
+                Console(file=output),
+                MagicMock(spec=ErrorLogger),
+                username="bot",
+                max_workers=2,
+                watch=False,
+            )
+
+        assert failures == 0
+        assert checked == [("bot", "due")]
+        assert "r/due: comments checked" in output.getvalue()
+
+    def test_counts_failures(self, config, accounts):
+        """Failed checks are reported and counted."""
+        import io
+
+        from rich.console import Console
+
+        from bitbot.commands.check import check_all
+        from bitbot.core.error_logger import ErrorLogger
+        from bitbot.core.errors import RedditAPIError
+
+        with patch(
+            "bitbot.commands.check._check_account",
+            return_value=(Failure(RedditAPIError("rate limited")), None),
+        ):
+            failures = check_all(
+                config,
+                Console(file=io.StringIO()),
+                MagicMock(spec=ErrorLogger),
+                username="bot",
+                max_workers=1,
+                watch=False,
+            )
+
+        assert failures == 1
+
+    def test_repeated_runs_do_not_grow_connection_pool(self, config, accounts):
+        """Each pass releases the database connections of its worker threads."""
+        import io
+
+        from rich.console import Console
+
+        from bitbot.commands.check import CheckResult, check_all
+        from bitbot.core.error_logger import ErrorLogger
+
+        def fake_check(config, username, subreddit):
+            db.get_connection()
+            return Success(CheckResult.STATE_CHANGED), None
+
+        def run_pass():
+            with patch("bitbot.commands.check._check_account", side_effect=fake_check):
+                check_all(
+                    config,
+                    Console(file=io.StringIO()),
+                    MagicMock(spec=ErrorLogger),
+                    username="bot",
+                    max_workers=2,
+                    watch=False,
+                )
+            return dict(db._pool)  # noqa: SLF001 - pool internals
+
+        first = run_pass()
+        second = run_pass()
+
+        assert len(second) == len(first)
+        assert all(owner.is_alive() for owner in second.values())
+
+
+class TestRedditClientReuse:
+    """Tests for per-thread Reddit client caching."""
+
+    @pytest.fixture
+    def made(self):
+        """Clients created by a patched ``init_reddit``, starting from an empty pool."""
+        import praw
+
+        from bitbot.reddit import client
+
+        client.reset_reddit()
+        made = []
+
+        def fake_init(_config=None):
+            made.append(MagicMock(spec=praw.Reddit))
+            return Success(made[-1])
+
+        with patch.object(client, "init_reddit", side_effect=fake_init):
+            yield made
+        client.reset_reddit()
+
+    def test_threads_hand_clients_on(self, made):
+        """A thread reuses its client, and finished jobs' clients are reused."""
+        import threading
+
+        from bitbot.reddit import client
+
+        seen = []
+
+        def job():
+            with client.pooled_reddit():
+                seen.extend([client.get_reddit(), client.get_reddit()])
+
+        for _ in range(3):
+            thread = threading.Thread(target=job)
+            thread.start()
+            thread.join()
+
+        assert len(made) == 1
+        assert all(r.unwrap() is made[0] for r in seen)
+
+    def test_failed_job_returns_client(self, made):
+        """A job that raises still hands its client back to the pool."""
+        from bitbot.reddit import client
+
+        def job():
+            with client.pooled_reddit():
+                client.get_reddit()
+                raise ValueError
+
+        with pytest.raises(ValueError):
+            job()
+
+        assert client.get_reddit().unwrap() is made[0]
+        assert len(made) == 1
+
+
+class TestDaemon:
+    """Tests for the daemon's schedule and database triggers."""
+
+    @pytest.fixture
+    def temp_db(self, tmp_path, monkeypatch):
+        """Empty database."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "daemon.db")
+        db.init()
+
+    @staticmethod
+    def pipeline(invoke, logger=None, **intervals: int):  # noqa: ANN205
+        """Pipeline with every interval 0 unless given."""
+        from bitbot.commands.daemon import JOB_ARGS, DaemonSettings, Pipeline
+        from bitbot.core.error_logger import ErrorLogger
+
+        settings = DaemonSettings(
+            intervals={name: intervals.get(name, 0) for name in JOB_ARGS}, poll_seconds=0.01
+        )
+        return Pipeline(invoke, settings, MagicMock(), logger or MagicMock(spec=ErrorLogger))
+
+    @staticmethod
+    def set_catalog(version) -> None:
+        """Store a one-app catalog."""
+        db.replace_catalog(
+            {
+                "app1": {
+                    "display_name": "App 1",
+                    "latest_release": {"version": version, "download_url": f"u{version}"},
+                    "previous_releases": [],
+                }
+            }
+        )
+
+    def test_settings_validation(self):
+        """Unknown jobs and negative values are configuration errors."""
+        from bitbot.commands.daemon import daemon_settings
+
+        settings = daemon_settings({"intervals": {"check": 30}, "poll_seconds": 1})
+        assert settings.unwrap().intervals["check"] == 30
+        assert settings.unwrap().intervals["gather"] == 300
+        assert isinstance(daemon_settings({"intervals": {"nope": 1}}), Failure)
+        assert isinstance(daemon_settings({"intervals": {"check": -1}}), Failure)
+        assert isinstance(daemon_settings({"poll_seconds": 0}), Failure)
+
+    def test_due_release_triggers_release_then_gather(self, temp_db):
+        """Due queue entries start release; a release with work re-runs gather."""
+        invoked = []
+
+        def invoke(args):
+            invoked.append(args[0])
+            if args[0] == "release":
+                db.clear_pending_releases()
+            return 0
+
+        pipeline = self.pipeline(invoke)
+        assert pipeline.triggered() == []
+
+        db.add_pending_release(1, "app1", "App One", "1.0", "v1.0")
+        assert pipeline.triggered() == ["release"]
+        assert pipeline.run_job("release") is True
+        assert pipeline.triggered() == ["gather"]
+        pipeline.run_job("gather")
+        assert pipeline.triggered() == []
+        assert invoked == ["release", "gather"]
+
+    def test_catalog_change_triggers_page_and_post(self, temp_db):
+        """Page and post run once per catalog change; failures wait to retry."""
+        pipeline = self.pipeline(lambda args: 0 if args[0] == "page" else 1)
+
+        self.set_catalog("1.0")
+        assert pipeline.triggered() == ["page", "post"]
+        assert pipeline.run_job("page") is True
+        assert pipeline.run_job("post") is False
+        assert pipeline.triggered() == []
+
+        self.set_catalog("2.0")
+        assert pipeline.triggered() == ["page"]
+
+    def test_crashing_job_counts_as_failure(self, temp_db):
+        """An exception from a job is logged and does not escape."""
+        from bitbot.core.error_logger import ErrorLogger
+
+        def invoke(args):
+            msg = "boom"
+            raise RuntimeError(msg)
+
+        logger = MagicMock(spec=ErrorLogger)
+        assert self.pipeline(invoke, logger).run_job("gather") is False
+        logger.log_error.assert_called_once()
+
+    def test_run_daemon_runs_triggered_jobs(self, temp_db):
+        """The loop runs interval jobs and triggered jobs until stopped."""
+        from bitbot.commands.daemon import run_daemon
+        from bitbot.core.scheduler import DueScheduler
+
+        scheduler = DueScheduler()
+        invoked = []
+
+        def invoke(args):
+            invoked.append(args[0])
+            if args[0] == "gather":
+                self.set_catalog("1.0")
+            if {"page", "post"} <= set(invoked):
+                scheduler.stop()
+            return 0
+
+        run_daemon(self.pipeline(invoke, gather=3600), scheduler)
+
+        assert invoked == ["gather", "page", "post"]
@@ -186,3 +186,26 @@ class TestConfig:
                 ),
                 timing={"interval": -5},
             )
+
+    def test_regex_keyword_rejected(self):
+        """Test feedback keywords written as regular expressions are rejected."""
+        with pytest.raises(ValidationError, match="looks like a regex"):
+            Config(
+                github=GitHubConfig(
+                    sourceRepo="owner/source",
+                    botRepo="owner/bot",
+                    assetFileName="asset.zip",
+                    pages_url="https://example.com",
+                ),
+                reddit=RedditConfig(
+                    subreddit="test",
+                    botName="TestBot",
+                    creator="testuser",
+                    userAgent="TestAgent/1.0",
+                    templates=RedditTemplates(
+                        post="post.md", outdated_post="outdated.md", inject_banner="banner.md"
+                    ),
+                    formats=RedditFormats(titles={}, changelog={}, table={}),
+                ),
+                feedback={"workingKeywords": ["works?"], "notWorkingKeywords": ["broken"]},
+            )
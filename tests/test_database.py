@@ -1,14 +1,21 @@
 """Tests for SQLite database module."""
 
+import asyncio
+import os
 import sqlite3
+import subprocess
+import sys
 import tempfile
+import threading
 from pathlib import Path
+from typing import Any, ClassVar
 from unittest.mock import patch
 
 import pytest
-from returns.result import Success
+from returns.result import Failure, Success
 
 from bitbot.core import db
+from bitbot.core.errors import StateError
 
 
 @pytest.fixture
@@ -91,6 +98,14 @@ class TestProcessedReleases:
         result = db.get_processed_releases()
         assert result.unwrap() == {100}
 
+    def test_add_many(self, temp_db):
+        """add_processed_releases_many stores all IDs and ignores duplicates."""
+        db.add_processed_release(100)
+        result = db.add_processed_releases_many([100, 200, 300])
+
+        assert isinstance(result, Success)
+        assert db.get_processed_releases().unwrap() == {100, 200, 300}
+
 
 class TestPendingReleases:
     """Tests for pending_releases table operations."""
@@ -114,6 +129,31 @@ class TestPendingReleases:
         assert releases[0]["version"] == "1.0.0"
         assert releases[0]["tag"] == "v1.0.0"
 
+    def test_add_many(self, temp_db):
+        """add_pending_releases_many queues in order and skips queued IDs."""
+        db.add_pending_release(100, "app1", "App One", "1.0.0", "v1.0.0")
+        releases = [
+            {
+                "release_id": rid,
+                "app_id": "app1",
+                "display_name": "App One",
+                "version": f"1.0.{rid}",
+                "tag": f"v1.0.{rid}",
+                "asset_name": None,
+            }
+            for rid in (100, 200, 300)
+        ]
+
+        result = db.add_pending_releases_many(releases)
+
+        assert result.unwrap() == [200, 300]
+        ids = [r["release_id"] for r in db.get_pending_releases().unwrap()]
+        assert ids == [100, 200, 300]
+
+    def test_add_many_empty(self, temp_db):
+        """add_pending_releases_many with no releases is a no-op."""
+        assert db.add_pending_releases_many([]).unwrap() == []
+
     def test_remove(self, temp_db):
         """remove_pending_release removes by release_id."""
         db.add_pending_release(100, "app1", "App One", "1.0.0", "v1.0.0")
@@ -249,3 +289,1006 @@ class TestExport:
         assert data["activePostId"] == "abc123"
         assert data["currentIntervalSeconds"] == 300
         assert "abc123" in data["allPostIds"]
+
+
+class TestConnectionPool:
+    """Tests for the pooled connection manager."""
+
+    def test_connection_reused(self, temp_db):
+        """Consecutive operations share one connection."""
+        with db.conn() as c1, db.conn() as c2:
+            assert c1 is c2
+        assert db.get_connection() is c1
+
+    def test_pragmas_applied(self, temp_db):
+        """Tunable PRAGMAs are applied when the connection opens."""
+        c = db.get_connection()
+        assert c.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert c.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert c.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    def test_configure_applies_to_new_connection(self, temp_db):
+        """configure() reopens the connection with new settings."""
+        try:
+            assert isinstance(db.configure({"cache_size": -4000, "other": 1}), Success)
+            assert db.get_connection().execute("PRAGMA cache_size").fetchone()[0] == -4000
+        finally:
+            db.configure({"cache_size": db.ConnectionSettings.cache_size})
+
+    def test_configure_reaches_other_threads(self, temp_db):
+        """A thread's pooled connection is reopened after configure() elsewhere."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def cache_size():
+            return db.get_connection().execute("PRAGMA cache_size").fetchone()[0]
+
+        with ThreadPoolExecutor(max_workers=1) as worker:
+            before = worker.submit(cache_size).result()
+            try:
+                db.configure({"cache_size": -4000})
+                after = worker.submit(cache_size).result()
+            finally:
+                db.configure({"cache_size": db.ConnectionSettings.cache_size})
+
+        assert before == db.ConnectionSettings.cache_size
+        assert after == -4000
+
+    def test_pooled_db_closes_job_connection(self, temp_db):
+        """A connection opened inside pooled_db() is closed when the block ends."""
+
+        def job():
+            with db.pooled_db():
+                return db.get_connection()
+
+        thread_result = []
+        thread = threading.Thread(target=lambda: thread_result.append(job()))
+        thread.start()
+        thread.join()
+
+        assert thread_result[0] not in db._pool  # noqa: SLF001 - pool internals
+        with pytest.raises(sqlite3.ProgrammingError):
+            thread_result[0].execute("SELECT 1")
+
+    def test_ended_threads_connections_are_pruned(self, temp_db):
+        """Connections left behind by finished threads are closed, not kept."""
+        for _ in range(5):
+            thread = threading.Thread(target=db.get_connection)
+            thread.start()
+            thread.join()
+
+        assert sum(not owner.is_alive() for owner in db._pool.values()) <= 1  # noqa: SLF001 - pool internals
+
+    def test_configure_rejects_bad_synchronous(self, temp_db):
+        """Invalid synchronous modes are rejected."""
+        assert isinstance(db.configure({"synchronous": "sometimes"}), Failure)
+
+    def test_path_change_opens_new_connection(self, temp_db, tmp_path):
+        """Switching DB_PATH swaps the pooled connection."""
+        first = db.get_connection()
+        with patch.object(db, "DB_PATH", tmp_path / "other.db"):
+            assert db.get_connection() is not first
+
+    def test_rollback_on_error(self, temp_db):
+        """A failing block is rolled back on the shared connection."""
+
+        def failing_block():
+            with db.conn() as c:
+                c.execute("INSERT INTO offline_versions VALUES ('a', '1')")
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            failing_block()
+        assert db.get_offline_versions().unwrap() == {}
+
+
+class TestTransaction:
+    """Tests for the unit-of-work transaction API."""
+
+    def test_commits_all_writes_together(self, temp_db):
+        """Writes inside a transaction are committed at the end."""
+        account_id = db.get_or_create_account("testuser", "testsub").unwrap()
+
+        with db.transaction():
+            db.update_account(account_id, active_post_id="p1")
+            db.add_post_id(account_id, "p1")
+            db.set_posted_versions(account_id, {"app1": "1.0", "app2": "2.0"})
+            other = sqlite3.connect(temp_db)
+            assert other.execute("SELECT COUNT(*) FROM posted_versions").fetchone()[0] == 0
+            other.close()
+
+        assert db.get_posted_versions(account_id).unwrap() == {"app1": "1.0", "app2": "2.0"}
+        assert db.get_post_ids(account_id).unwrap() == ["p1"]
+
+    def test_rolls_back_on_error(self, temp_db):
+        """Raising inside the unit of work discards every write."""
+        account_id = db.get_or_create_account("testuser", "testsub").unwrap()
+
+        def unit_of_work():
+            with db.transaction():
+                db.update_account(account_id, active_post_id="p1")
+                db.set_posted_versions(account_id, {"app1": "1.0"})
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            unit_of_work()
+
+        assert db.get_account(account_id).unwrap()["active_post_id"] is None
+        assert db.get_posted_versions(account_id).unwrap() == {}
+
+    def test_nested_joins_outer(self, temp_db):
+        """Nested transactions commit only with the outermost block."""
+
+        def unit_of_work():
+            with db.transaction():
+                with db.transaction():
+                    db.set_offline_version("app1", "1.0")
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            unit_of_work()
+
+        assert db.get_offline_versions().unwrap() == {}
+
+
+class TestSetPostedVersions:
+    """Tests for bulk posted version updates."""
+
+    def test_replaces_existing(self, temp_db):
+        """set_posted_versions upserts every app."""
+        account_id = db.get_or_create_account("testuser", "testsub").unwrap()
+        db.set_posted_version(account_id, "app1", "1.0")
+
+        db.set_posted_versions(account_id, {"app1": "1.1", "app2": "2.0"})
+
+        assert db.get_posted_versions(account_id).unwrap() == {"app1": "1.1", "app2": "2.0"}
+
+
+class TestMigrations:
+    """Tests for versioned schema migrations."""
+
+    def test_records_schema_version(self, temp_db):
+        """init() stamps the current schema version."""
+        conn = sqlite3.connect(temp_db)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.close()
+        assert version == db.SCHEMA_VERSION
+
+    def test_up_to_date_init_is_single_read(self, temp_db):
+        """init() on a current database only reads user_version."""
+        statements: list[str] = []
+        db.get_connection().set_trace_callback(statements.append)
+        try:
+            assert isinstance(db.init(), Success)
+        finally:
+            db.get_connection().set_trace_callback(None)
+        assert statements == ["PRAGMA user_version"]
+
+    def test_upgrades_unversioned_database(self, tmp_path):
+        """A pre-versioning database without content_hash is upgraded in place."""
+        path = tmp_path / "legacy.db"
+        legacy = sqlite3.connect(path)
+        legacy.execute(
+            "CREATE TABLE accounts (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL,"
+            " subreddit TEXT NOT NULL, active_post_id TEXT, last_check_timestamp TEXT,"
+            " check_interval_seconds INTEGER, last_comment_count INTEGER DEFAULT 0,"
+            " UNIQUE(username, subreddit))"
+        )
+        legacy.execute("INSERT INTO accounts (username, subreddit) VALUES ('u', 's')")
+        legacy.commit()
+        legacy.close()
+
+        with patch.object(db, "DB_PATH", path):
+            assert isinstance(db.init(), Success)
+            assert db.update_account(1, content_hash="abc") == Success(None)
+            assert db.get_account(1).unwrap()["content_hash"] == "abc"
+            version = db.get_connection().execute("PRAGMA user_version").fetchone()[0]
+        assert version == db.SCHEMA_VERSION
+
+    def test_adds_active_post_created(self, temp_db):
+        """v11 adds an empty creation time, recorded later by the first post run."""
+        account_id = db.get_or_create_account("bot", "sub").unwrap()
+        db.update_account(account_id, active_post_id="p1")
+        c = db.get_connection()
+        c.execute("ALTER TABLE accounts DROP COLUMN active_post_created_utc")
+        c.execute("PRAGMA user_version = 10")
+
+        assert isinstance(db.init(), Success)
+        meta = db.get_account(account_id).unwrap()
+        assert meta["active_post_id"] == "p1"
+        assert meta["active_post_created_utc"] is None
+
+    def test_drops_cached_oauth_tokens(self, temp_db):
+        """v12 removes the token cache, leaving no token bytes in the file."""
+        c = db.get_connection()
+        c.execute(
+            "CREATE TABLE oauth_tokens"
+            " (name TEXT PRIMARY KEY, sealed BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        c.execute("INSERT INTO oauth_tokens VALUES ('reddit:bot', ?, 0)", (b"sealed-token" * 8,))
+        c.commit()
+        c.execute(f"PRAGMA user_version = {db.SCHEMA_VERSION - 1}")
+
+        assert isinstance(db.init(), Success)
+        tables = {row[0] for row in c.execute("SELECT name FROM sqlite_master")}
+        db.close()
+
+        assert "oauth_tokens" not in tables
+        assert b"sealed-token" not in temp_db.read_bytes()
+
+    def test_rejects_newer_schema(self, temp_db):
+        """init() refuses a database written by a newer schema."""
+        db.get_connection().execute(f"PRAGMA user_version = {db.SCHEMA_VERSION + 1}")
+        result = db.init()
+        assert isinstance(result, Failure)
+        assert "newer" in result.failure().message
+
+
+class TestReleaseQueue:
+    """Tests for leased job-queue operations."""
+
+    @pytest.fixture
+    def queued(self, temp_db):
+        """Queue three releases."""
+        for release_id in (100, 200, 300):
+            db.add_pending_release(release_id, "app1", "App One", "1.0.0", "v1.0.0")
+        return temp_db
+
+    def test_claim_leases_oldest_first(self, queued):
+        """claim_next leases due releases so other workers skip them."""
+        first = db.claim_next(2, "w1", now=1000.0).unwrap()
+        second = db.claim_next(2, "w2", now=1000.0).unwrap()
+
+        assert [r["release_id"] for r in first] == [100, 200]
+        assert [r["release_id"] for r in second] == [300]
+        assert first[0]["attempts"] == 1
+        assert db.claim_next(1, "w3", now=1000.0).unwrap() == []
+
+    def test_concurrent_claims_never_overlap(self, queued):
+        """Workers on separate connections never claim the same release."""
+        for release_id in range(400, 450):
+            db.add_pending_release(release_id, "app1", "App One", "1.0.0", "v1.0.0")
+        claims: dict[str, list[int]] = {}
+
+        def worker(name: str) -> None:
+            ids: list[int] = []
+            while batch := db.claim_next(3, name).unwrap():
+                ids.extend(r["release_id"] for r in batch)
+            claims[name] = ids
+
+        threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        all_ids = [i for ids in claims.values() for i in ids]
+        assert len(all_ids) == len(set(all_ids)) == 53
+
+    def test_expired_lease_is_reclaimed(self, queued):
+        """A crashed worker's lease becomes claimable once it expires."""
+        settings = db.QueueSettings(lease_seconds=10)
+        db.claim_next(1, "w1", settings, now=1000.0)
+
+        assert db.claim_next(1, "w2", settings, now=1005.0).unwrap()[0]["release_id"] == 200
+        reclaimed = db.claim_next(1, "w2", settings, now=1011.0).unwrap()
+        assert reclaimed[0]["release_id"] == 100
+        assert reclaimed[0]["attempts"] == 2
+        assert db.complete_release(100, "w1").unwrap() is False
+
+    def test_count_due(self, queued):
+        """count_due counts what claim_next would hand out now."""
+        settings = db.QueueSettings(lease_seconds=10)
+        db.claim_next(1, "w1", settings, now=1000.0)
+
+        assert db.count_due(now=1005.0).unwrap() == 2
+        assert db.count_due(now=1010.0).unwrap() == 3
+        db.claim_next(3, "w2", settings, now=1010.0)
+        assert db.count_due(now=1015.0).unwrap() == 0
+
+    def test_heartbeat_extends_lease(self, queued):
+        """A heartbeat keeps a lease alive past its original expiry."""
+        settings = db.QueueSettings(lease_seconds=10)
+        db.claim_next(1, "w1", settings, now=1000.0)
+
+        assert db.heartbeat(100, "w1", settings, now=1008.0).unwrap() is True
+        assert db.heartbeat(100, "w2", settings, now=1008.0).unwrap() is False
+        claimed = db.claim_next(3, "w2", settings, now=1015.0).unwrap()
+        assert 100 not in [r["release_id"] for r in claimed]
+
+    def test_complete_removes_release(self, queued):
+        """complete_release deletes the leased row."""
+        db.claim_next(1, "w1")
+
+        assert db.complete_release(100, "w1").unwrap() is True
+        assert [r["release_id"] for r in db.get_pending_releases().unwrap()] == [200, 300]
+
+    def test_fail_backs_off_exponentially(self, queued):
+        """Failed releases wait retry_base * 2^(attempts-1) before the next claim."""
+        settings = db.QueueSettings(retry_base_seconds=10, max_attempts=5)
+        db.claim_next(1, "w1", settings, now=1000.0)
+        assert db.fail_release(100, "w1", "boom", settings, now=1000.0).unwrap() == "pending"
+
+        early = db.claim_next(3, "w1", settings, now=1009.0).unwrap()
+        assert 100 not in [r["release_id"] for r in early]
+        for release_id in (200, 300):
+            db.complete_release(release_id, "w1")
+        assert db.claim_next(1, "w1", settings, now=1010.0).unwrap()[0]["release_id"] == 100
+        db.fail_release(100, "w1", "boom", settings, now=1010.0)
+        assert db.claim_next(1, "w1", settings, now=1029.0).unwrap() == []
+        assert db.claim_next(1, "w1", settings, now=1030.0).unwrap()[0]["attempts"] == 3
+
+    def test_dead_letters_after_max_attempts(self, queued):
+        """A release that fails max_attempts times is parked as dead."""
+        settings = db.QueueSettings(max_attempts=2, retry_base_seconds=1)
+        db.claim_next(1, "w1", settings, now=0.0)
+        db.fail_release(100, "w1", "first", settings, now=0.0)
+        db.claim_next(1, "w1", settings, now=5.0)
+        assert db.fail_release(100, "w1", "second", settings, now=5.0).unwrap() == "dead"
+
+        dead = db.get_dead_releases().unwrap()
+        assert [(r["release_id"], r["attempts"], r["last_error"]) for r in dead] == [
+            (100, 2, "second")
+        ]
+        assert 100 not in [r["release_id"] for r in db.get_pending_releases().unwrap()]
+
+        assert db.requeue_dead_releases().unwrap() == 1
+        assert db.claim_next(1, "w1", settings, now=10.0).unwrap()[0]["release_id"] == 100
+
+    def test_queue_settings_validation(self):
+        """queue_settings ignores unknown keys and rejects bad values."""
+        assert db.queue_settings({"max_attempts": 3, "other": 1}).unwrap().max_attempts == 3
+        assert isinstance(db.queue_settings({"lease_seconds": 0}), Failure)
+
+
+class TestProfiler:
+    """Tests for opt-in SQL profiling."""
+
+    @pytest.fixture
+    def profiler(self, temp_db):
+        """Profile statements on a fresh connection."""
+        profiler = db.enable_profiling()
+        profiler.reset()
+        yield profiler
+        db.disable_profiling()
+
+    def test_normalize_sql(self):
+        """Literals, parameters and whitespace are normalized."""
+        from bitbot.core.db.profiler import normalize_sql
+
+        assert normalize_sql("SELECT *\n  FROM t WHERE a = 'x''y' AND b = -1.5") == (
+            "SELECT * FROM t WHERE a = ? AND b = ?"
+        )
+        assert normalize_sql("INSERT INTO t2 VALUES (:id, NULL, 3);") == (
+            "INSERT INTO t2 VALUES (?, ...)"
+        )
+
+    def test_records_calls_latency_and_rows(self, profiler):
+        """Each statement is counted, timed and its fetched rows summed."""
+        db.add_processed_releases_many([1, 2, 3])
+        db.get_processed_releases()
+        db.get_processed_releases()
+
+        stats = {s.sql: s for s in profiler.stats()}
+        insert = stats["INSERT OR IGNORE INTO processed_releases (release_id) VALUES (?)"]
+        select = stats["SELECT release_id FROM processed_releases"]
+        assert insert.calls == 3
+        assert select.calls == 2
+        assert select.rows == 6
+        assert select.total_ms >= select.p95_ms > 0
+
+    def test_iteration_streams_rows(self, profiler):
+        """Iterating a cursor counts rows as they are read, without buffering."""
+        db.add_processed_releases_many([1, 2, 3])
+        cursor = db.get_connection().execute("SELECT release_id FROM processed_releases")
+
+        assert next(iter(cursor))["release_id"] == 1
+        stats = {s.sql: s for s in profiler.stats()}
+        assert stats["SELECT release_id FROM processed_releases"].rows == 1
+        assert [r["release_id"] for r in cursor] == [2, 3]
+
+    def test_disabled_by_default(self, temp_db):
+        """Connections are plain sqlite3 connections unless profiling is on."""
+        assert db.get_profiler() is None
+        assert type(db.get_connection()) is sqlite3.Connection
+
+
+class TestProcessedCompaction:
+    """Tests for batch membership checks and processed ID compaction."""
+
+    def test_processed_among_checks_only_batch(self, temp_db):
+        """get_processed_among returns the processed subset of the given IDs."""
+        db.add_processed_releases_many([10, 20, 30])
+
+        assert db.get_processed_among([20, 25, 30, 20]).unwrap() == {20, 30}
+        assert db.get_processed_among([]).unwrap() == set()
+
+    def test_compact_keeps_newest(self, temp_db):
+        """Older IDs fold into a range that still counts as processed."""
+        db.add_processed_releases_many([5, 10, 20, 30, 40])
+
+        assert db.compact_processed_releases(2).unwrap() == 3
+        assert db.get_processed_releases().unwrap() == {30, 40}
+        assert db.get_processed_among([5, 7, 20, 25, 30, 35]).unwrap() == {5, 7, 20, 30}
+
+    def test_compact_extends_existing_range(self, temp_db):
+        """A second compaction merges into the earlier range."""
+        db.add_processed_releases_many([5, 10, 20])
+        db.compact_processed_releases(1)
+        db.add_processed_releases_many([30, 40])
+
+        assert db.compact_processed_releases(1).unwrap() == 2
+        conn = sqlite3.connect(temp_db)
+        ranges = conn.execute("SELECT lo, hi FROM processed_ranges").fetchall()
+        conn.close()
+        assert ranges == [(5, 30)]
+        assert db.get_processed_releases().unwrap() == {40}
+
+    def test_compact_noop_under_limit(self, temp_db):
+        """Nothing is folded while the table is within the retention limit."""
+        db.add_processed_releases_many([1, 2])
+
+        assert db.compact_processed_releases(5).unwrap() == 0
+        assert db.get_processed_releases().unwrap() == {1, 2}
+
+
+class TestAccountState:
+    """Tests for the write-behind account state aggregate."""
+
+    def test_load_creates_and_reads_everything(self, temp_db):
+        """load() returns meta, versions and post IDs together."""
+        account_id = db.get_or_create_account("testuser", "testsub").unwrap()
+        db.set_posted_versions(account_id, {"app1": "1.0", "app2": "2.0"})
+        db.update_account(account_id, active_post_id="p2", content_hash="h")
+        db.add_post_id(account_id, "p1")
+        db.add_post_id(account_id, "p2")
+
+        state = db.AccountState.load("testuser", "testsub").unwrap()
+
+        assert state.account_id == account_id
+        assert state.meta["active_post_id"] == "p2"
+        assert state.posted_versions == {"app1": "1.0", "app2": "2.0"}
+        assert state.post_ids == ["p1", "p2"]
+        assert db.AccountState.load("new", "testsub").unwrap().posted_versions == {}
+
+    def test_load_existing_is_one_statement(self, temp_db):
+        """An existing account loads with a single query."""
+        db.get_or_create_account("testuser", "testsub")
+        statements: list[str] = []
+        db.get_connection().set_trace_callback(statements.append)
+        try:
+            db.AccountState.load("testuser", "testsub")
+        finally:
+            db.get_connection().set_trace_callback(None)
+        assert len(statements) == 1
+
+    def test_changes_are_written_on_flush(self, temp_db):
+        """Changes stay in memory until flush() writes them together."""
+        state = db.AccountState.load("testuser", "testsub").unwrap()
+        state.update(active_post_id="p1", content_hash="h1")
+        state.add_post_id("p1")
+        state.set_posted_versions({"app1": "1.0"})
+
+        assert db.get_account(state.account_id).unwrap()["active_post_id"] is None
+        assert state.dirty
+        assert isinstance(state.flush(), Success)
+        assert not state.dirty
+
+        assert db.export_account_json("testuser", "testsub").unwrap() == state.to_json()
+        assert db.get_post_ids(state.account_id).unwrap() == ["p1"]
+
+    def test_reset_clears_versions_and_post(self, temp_db):
+        """reset() drops announced versions, active post and content hash."""
+        account_id = db.get_or_create_account("testuser", "testsub").unwrap()
+        db.set_posted_versions(account_id, {"app1": "1.0"})
+        db.update_account(account_id, active_post_id="p1", content_hash="h1")
+
+        state = db.AccountState.load("testuser", "testsub").unwrap()
+        state.reset()
+        state.set_posted_versions({"app2": "2.0"})
+        state.flush()
+
+        meta = db.get_account(account_id).unwrap()
+        assert meta["active_post_id"] is None
+        assert meta["content_hash"] is None
+        assert db.get_posted_versions(account_id).unwrap() == {"app2": "2.0"}
+
+    def test_context_manager_flushes_on_error(self, temp_db):
+        """Leaving the block flushes recorded changes even when it raises."""
+        state = db.AccountState.load("testuser", "testsub").unwrap()
+
+        def failing_block():
+            with state:
+                state.update(last_comment_count=3)
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            failing_block()
+
+        assert db.get_account(state.account_id).unwrap()["last_comment_count"] == 3
+
+    def test_update_rejects_unknown_fields(self, temp_db):
+        """Only account meta columns can be updated."""
+        state = db.AccountState.load("testuser", "testsub").unwrap()
+        with pytest.raises(StateError, match="Unknown account fields"):
+            state.update(username="other")
+
+
+class TestAsyncDB:
+    """Tests for the asyncio facade and batching writer."""
+
+    def test_reads_and_writes(self, temp_db):
+        """Operations are awaitable and return the usual Results."""
+        from bitbot.core.db.aio import AsyncDB
+
+        async def scenario():
+            async with AsyncDB() as adb:
+                assert await adb.set_offline_version("app1", "1.0") == Success(None)
+                return await adb.get_offline_versions()
+
+        assert asyncio.run(scenario()).unwrap() == {"app1": "1.0"}
+
+    def test_concurrent_writes_share_a_transaction(self, temp_db):
+        """Writes queued together are committed in one batch."""
+        from bitbot.core.db.aio import AsyncDB
+
+        async def scenario():
+            async with AsyncDB() as adb:
+                # Block the writer so every write below queues up behind it
+                gate = threading.Event()
+                blocker = asyncio.ensure_future(adb.write(gate.wait))
+                await asyncio.sleep(0.05)
+                writes = [adb.add_processed_release(i) for i in range(1, 51)]
+                tasks = [asyncio.ensure_future(w) for w in writes]
+                await asyncio.sleep(0.05)
+                gate.set()
+                await blocker
+                return await asyncio.gather(*tasks)
+
+        with patch.object(db, "transaction", wraps=db.transaction) as tx:
+            results = asyncio.run(scenario())
+        assert all(isinstance(r, Success) for r in results)
+        assert db.get_processed_releases().unwrap() == set(range(1, 51))
+        assert tx.call_count == 2
+
+    def test_failed_write_does_not_undo_batch(self, temp_db):
+        """A failing write is rolled back alone; its neighbours commit."""
+        from bitbot.core.db.aio import AsyncDB
+
+        def boom():
+            db.set_offline_version("bad", "1.0")
+            raise ValueError
+
+        async def scenario():
+            async with AsyncDB() as adb:
+                return await asyncio.gather(
+                    adb.set_offline_version("app1", "1.0"),
+                    adb.write(boom),
+                    adb.add_pending_release(1, "app1", "App", "1.0", "v1"),
+                    adb.add_pending_release(1, "app1", "App", "1.0", "v1"),
+                    return_exceptions=True,
+                )
+
+        results = asyncio.run(scenario())
+        assert isinstance(results[1], ValueError)
+        assert isinstance(results[3], Failure)
+        assert db.get_offline_versions().unwrap() == {"app1": "1.0"}
+        assert len(db.get_pending_releases().unwrap()) == 1
+
+    def test_write_requires_running_writer(self, temp_db):
+        """Writes outside the context manager are rejected."""
+        from bitbot.core.db.aio import AsyncDB
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(AsyncDB().set_offline_version("app1", "1.0"))
+
+    def test_every_operation_is_classified(self):
+        """Each public db function is a read, a write, or deliberately local."""
+        from bitbot.core.db import aio
+
+        functions = {
+            name
+            for name in db.__all__
+            if callable(getattr(db, name)) and not isinstance(getattr(db, name), type)
+        }
+        classes = (aio.READ_OPERATIONS, aio.WRITE_OPERATIONS, aio.LOCAL_OPERATIONS)
+        assert set().union(*classes) == functions
+        assert sum(len(c) for c in classes) == len(functions)
+
+
+class TestCatalog:
+    """Tests for the release catalog table."""
+
+    DATA: ClassVar[dict[str, Any]] = {
+        "app1": {
+            "display_name": "App 1",
+            "latest_release": {"version": "2.0", "download_url": "u2", "published_at": "d2"},
+            "previous_releases": [
+                {"version": "1.0", "download_url": "u1", "published_at": "d1"},
+            ],
+        },
+        "app2": {
+            "display_name": "App 2",
+            "latest_release": {"version": "5.0", "download_url": "u5", "published_at": "d5"},
+            "previous_releases": [],
+        },
+    }
+
+    def test_round_trip_keeps_order(self, temp_db):
+        """get_catalog() returns what replace_catalog() stored, in order."""
+        assert db.replace_catalog(self.DATA) == Success(3)
+        catalog = db.get_catalog().unwrap()
+        assert catalog == self.DATA
+        assert list(catalog) == ["app1", "app2"]
+
+    def test_replace_moves_latest_and_drops_stale_rows(self, temp_db):
+        """A new latest version demotes the old one; vanished apps are deleted."""
+        db.replace_catalog(self.DATA)
+        db.replace_catalog(
+            {
+                "app1": {
+                    "display_name": "App 1",
+                    "latest_release": {"version": "3.0", "download_url": "u3"},
+                    "previous_releases": [{"version": "2.0", "download_url": "u2"}],
+                }
+            }
+        )
+        rows = (
+            db.get_connection()
+            .execute("SELECT app_id, version, is_latest FROM catalog ORDER BY position")
+            .fetchall()
+        )
+        assert [tuple(r) for r in rows] == [("app1", "3.0", 1), ("app1", "2.0", 0)]
+
+    def test_fingerprint_tracks_latest_versions(self, temp_db):
+        """The fingerprint changes with a latest version, not with older ones."""
+        assert db.catalog_fingerprint().unwrap() == ""
+        db.replace_catalog(self.DATA)
+        first = db.catalog_fingerprint().unwrap()
+        assert first == "app1=2.0@u2\napp2=5.0@u5"
+
+        data = {**self.DATA, "app2": {**self.DATA["app2"], "display_name": "Renamed"}}
+        db.replace_catalog(data)
+        assert db.catalog_fingerprint().unwrap() == first
+
+        data["app2"] = {**data["app2"], "latest_release": {"version": "6.0", "download_url": "u6"}}
+        db.replace_catalog(data)
+        assert db.catalog_fingerprint().unwrap() != first
+
+    def test_changelog(self, temp_db):
+        """Added, updated and removed apps are computed against posted_versions."""
+        account_id = db.get_or_create_account("bot", "sub").unwrap()
+        db.replace_catalog(self.DATA)
+        db.set_posted_versions(account_id, {"app1": "1.0", "gone": "0.9"})
+
+        changelog = db.catalog_changelog(account_id).unwrap()
+
+        assert changelog["added"] == {
+            "app2": {"display_name": "App 2", "version": "5.0", "url": "u5"}
+        }
+        assert changelog["updated"] == {
+            "app1": {"new": {"display_name": "App 1", "version": "2.0", "url": "u2"}, "old": "1.0"}
+        }
+        assert changelog["removed"] == {"gone": {"display_name": "gone", "version": "0.9"}}
+
+
+class TestSearch:
+    """Tests for the FTS5 search index."""
+
+    @staticmethod
+    def _doc(kind, ref, title, body) -> db.SearchDocument:
+        return {"kind": kind, "ref": ref, "title": title, "body": body, "url": None}
+
+    def test_ranked_search_with_kind_filter(self, temp_db):
+        """Matches are ranked, title hits first, and can be limited to one kind."""
+        db.index_documents(
+            [
+                self._doc("release", "1", "BitLife 3.21", "asset: BitLife_Mod.ipa"),
+                self._doc("release", "2", "BitLife 3.20", "mentions 3.21 in passing"),
+                self._doc("post", "abc", "Weekly update", "BitLife updated to 3.21"),
+            ]
+        )
+
+        hits = db.search("3.21").unwrap()
+        assert hits[0]["ref"] == "1"
+        assert {h["ref"] for h in hits} == {"1", "2", "abc"}
+        assert [h["ref"] for h in db.search("3.21", kind="post").unwrap()] == ["abc"]
+        assert [h["ref"] for h in db.search("BitLife_Mod.ipa").unwrap()] == ["1"]
+
+    def test_reindexing_updates_only_changed_documents(self, temp_db):
+        """Unchanged documents are skipped; edited ones replace their old text."""
+        doc = self._doc("post", "abc", "Update", "old words")
+        assert db.index_documents([doc]) == Success(1)
+        assert db.index_documents([doc]) == Success(0)
+        assert db.index_documents([{**doc, "body": "new words"}]) == Success(1)
+
+        assert db.search("old").unwrap() == []
+        assert len(db.search("new").unwrap()) == 1
+
+    def test_snippet_marks_matches(self, temp_db):
+        """Snippets wrap matched terms in highlight markers."""
+        from bitbot.core.db.search import HIGHLIGHT_END, HIGHLIGHT_START
+
+        db.index_documents([self._doc("post", "abc", "", "the quick brown fox")])
+        snippet = db.search("quick").unwrap()[0]["snippet"]
+        assert f"{HIGHLIGHT_START}quick{HIGHLIGHT_END}" in snippet
+
+    def test_raw_syntax_errors_are_failures(self, temp_db):
+        """Malformed FTS5 syntax fails cleanly; plain queries are always quoted."""
+        assert isinstance(db.search('"unterminated', raw=True), Failure)
+        assert db.search('"unterminated').unwrap() == []
+
+
+class TestCommentLedger:
+    """Tests for the comment ledger and its running tallies."""
+
+    def test_tallies_follow_inserts_and_edits(self, temp_db):
+        """Triggers keep score and count in step with the ledger."""
+        db.record_comment_verdicts(
+            "p1",
+            [
+                {"comment_id": "c1", "edited": 0.0, "verdict": 1},
+                {"comment_id": "c2", "edited": 0.0, "verdict": -1},
+                {"comment_id": "c3", "edited": 0.0, "verdict": 1},
+            ],
+            "t1_c3",
+        )
+        thread = db.record_comment_verdicts(
+            "p1", [{"comment_id": "c2", "edited": 5.0, "verdict": 1}]
+        ).unwrap()
+
+        assert thread == {"score": 3, "comments": 3, "last_seen": "t1_c3"}
+        assert db.get_comment_verdicts(["c2", "missing"]).unwrap() == {
+            "c2": {"comment_id": "c2", "edited": 5.0, "verdict": 1}
+        }
+
+    def test_replayed_verdict_is_ignored(self, temp_db):
+        """Recording an unchanged comment again does not double count."""
+        verdict = {"comment_id": "c1", "edited": 0.0, "verdict": 1}
+        db.record_comment_verdicts("p1", [verdict])
+        thread = db.record_comment_verdicts("p1", [{**verdict, "verdict": -1}]).unwrap()
+
+        assert thread["score"] == 1
+        assert thread["comments"] == 1
+
+    def test_unknown_thread_is_empty(self, temp_db):
+        """A post never scanned has no cursor."""
+        assert db.get_comment_thread("nope").unwrap() == {
+            "score": 0,
+            "comments": 0,
+            "last_seen": None,
+        }
+
+    def test_retention_keeps_active_threads(self, temp_db):
+        """Old ledgers are dropped with their rows; an active post's is kept."""
+        from bitbot.core.db.maintenance import maintain
+
+        account_id = db.get_or_create_account("bot", "sub").unwrap()
+        for post in ("p1", "p2", "p3"):
+            db.record_comment_verdicts(post, [{"comment_id": post, "edited": 0.0, "verdict": 1}])
+        db.update_account(account_id, active_post_id="p1")
+
+        report = maintain({"comment_threads": 1}, vacuum=False).unwrap()
+
+        assert report.pruned == {"comment_threads": 1}
+        assert db.get_comment_thread("p2").unwrap()["last_seen"] is None
+        assert db.get_comment_verdicts(["p1", "p2", "p3"]).unwrap().keys() == {"p1", "p3"}
+
+
+class TestBotPosts:
+    """Tests for the cached bot submission metadata."""
+
+    @staticmethod
+    def post(post_id, created, title="[BitBot] Post", subreddit="Sub", removed=None) -> db.BotPost:
+        """A bot_posts row."""
+        return {
+            "post_id": post_id,
+            "subreddit": subreddit,
+            "title": title,
+            "url": f"https://redd.it/{post_id}",
+            "created_utc": created,
+            "removed": removed,
+            "body_hash": "h",
+            "banner_hash": None,
+        }
+
+    def test_find_filters_and_orders(self, temp_db):
+        """Posts match by subreddit and prefix or known ID, newest first."""
+        db.record_bot_posts(
+            "Bot",
+            [
+                self.post("a", 1.0),
+                self.post("b", 3.0),
+                self.post("c", 2.0, title="Manual post"),
+                self.post("d", 4.0, subreddit="elsewhere"),
+                self.post("e", 5.0, title="[bitbot] lower case"),
+            ],
+        )
+
+        found = db.find_bot_posts("bot", "sub", "[BitBot]").unwrap()
+        assert [p["post_id"] for p in found] == ["b", "a"]
+        with_known = db.find_bot_posts("bot", "SUB", "[BitBot]", ["c"]).unwrap()
+        assert [p["post_id"] for p in with_known] == ["b", "c", "a"]
+
+    def test_cursor_skips_deleted_posts(self, temp_db):
+        """The cursor is the newest post that listings still return."""
+        assert db.get_bot_post_cursor("bot").unwrap() is None
+        db.record_bot_posts("bot", [self.post("a", 1.0), self.post("b", 2.0)])
+        assert db.get_bot_post_cursor("bot").unwrap() == "b"
+
+        assert db.set_bot_post_state("b", db.REMOVED_DELETED, None).unwrap() is True
+        assert db.get_bot_post_cursor("bot").unwrap() == "a"
+        assert db.set_bot_post_state("zz", None, None).unwrap() is False
+
+    def test_record_only_counts_changes(self, temp_db):
+        """Re-recording an unchanged post is a no-op."""
+        assert db.record_bot_posts("bot", [self.post("a", 1.0)]).unwrap() == 1
+        assert db.record_bot_posts("bot", [self.post("a", 1.0)]).unwrap() == 0
+        removed = self.post("a", 1.0, removed="moderator")
+        assert db.record_bot_posts("bot", [removed]).unwrap() == 1
+
+    def test_banner_cleared_when_body_changes(self, temp_db):
+        """A recorded banner holds only while the body hash is unchanged."""
+        db.record_bot_posts("bot", [self.post("a", 1.0), self.post("b", 2.0)])
+        assert db.set_bot_post_banners({"a": ("h2", "x"), "b": ("h2", "x")}).unwrap() == 2
+
+        db.set_bot_post_state("a", None, "h2")
+        db.set_bot_post_state("b", None, "h3")
+
+        found = db.find_bot_posts("bot", "sub", "[BitBot]").unwrap()
+        assert {p["post_id"]: p["banner_hash"] for p in found} == {"a": "x", "b": None}
+
+
+class TestMaintenance:
+    """Tests for retention, vacuum and checkpointing."""
+
+    def test_retention_rules(self, temp_db):
+        """Each rule keeps the newest rows (and an account's active post)."""
+        from bitbot.core.db.maintenance import maintain
+
+        account_id = db.get_or_create_account("bot", "sub").unwrap()
+        for i in range(5):
+            db.add_post_id(account_id, f"p{i}")
+        db.update_account(account_id, active_post_id="p0")
+        db.add_processed_releases_many([1, 2, 3, 4])
+        db.get_connection().executemany(
+            "INSERT INTO pending_releases (release_id, app_id, display_name, version, tag, status)"
+            " VALUES (?, 'a', 'A', '1', 'v1', 'dead')",
+            [(i,) for i in range(10, 14)],
+        )
+        db.get_connection().commit()
+
+        report = maintain({"post_ids": 2, "processed_releases": 1, "dead_releases": 1}).unwrap()
+
+        assert report.pruned == {"post_ids": 2, "processed_releases": 3, "dead_releases": 3}
+        assert db.get_post_ids(account_id).unwrap() == ["p0", "p3", "p4"]
+        assert db.get_processed_releases().unwrap() == {4}
+        assert [r["release_id"] for r in db.get_dead_releases().unwrap()] == [13]
+
+    def test_vacuum_shrinks_database(self, temp_db):
+        """Freed pages are returned; the first run switches to incremental vacuum."""
+        from bitbot.core.db.maintenance import maintain
+
+        db.add_processed_releases_many(list(range(1, 20001)))
+        first = maintain({"processed_releases": 0}).unwrap()
+        assert first.converted_to_incremental
+        assert first.size_after < first.size_before
+        assert first.wal_checkpointed
+        assert db.get_connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+        db.index_documents(
+            [
+                {"kind": "post", "ref": str(i), "title": "", "body": "x " * 500, "url": None}
+                for i in range(200)
+            ]
+        )
+        with db.conn() as c:
+            c.execute("DELETE FROM search_documents")
+        second = maintain({}).unwrap()
+        assert not second.converted_to_incremental
+        assert second.pages_freed > 0
+
+    def test_retention_limits_validation(self):
+        """Unknown tables and bad limits are rejected; the rest use defaults."""
+        from bitbot.core.db.maintenance import DEFAULT_RETENTION, retention_limits
+
+        assert retention_limits({"post_ids": 5}).unwrap() == {**DEFAULT_RETENTION, "post_ids": 5}
+        assert isinstance(retention_limits({"nope": 5}), Failure)
+        assert isinstance(retention_limits({"post_ids": -1}), Failure)
+
+
+class TestMemoryMode:
+    """Tests for the in-memory database with write-back and journal replay."""
+
+    @pytest.fixture
+    def memory_db(self, tmp_path):
+        """Run against an in-memory copy of a fresh database file."""
+        path = tmp_path / "bitbot.db"
+        with patch.object(db, "DB_PATH", path):
+            assert isinstance(db.init({"memory": True}), Success)
+            db.checkpoint()  # Put the schema on disk
+            yield path
+            db.configure({"memory": False})
+
+    def test_profiled_writes_are_journaled(self, memory_db):
+        """With profiling on, statements are both profiled and journaled."""
+        profiler = db.enable_profiling()
+        try:
+            profiler.reset()
+            db.set_offline_version("app1", "1.0")
+            assert db.checkpoint().unwrap() is True
+        finally:
+            db.disable_profiling()
+
+        assert type(db.get_connection()).__name__ == "JournalingConnection"
+        assert self._disk_versions(memory_db) == {"app1": "1.0"}
+        assert any("offline_versions" in s.sql for s in profiler.stats())
+
+    @staticmethod
+    def _disk_versions(path) -> dict[str, str]:
+        c = sqlite3.connect(path)
+        try:
+            return dict(c.execute("SELECT app_id, version FROM offline_versions").fetchall())
+        finally:
+            c.close()
+
+    def test_writes_stay_in_memory_until_checkpoint(self, memory_db):
+        """The file is only touched by checkpoint()."""
+        db.set_offline_version("app1", "1.0")
+        assert db.get_offline_versions().unwrap() == {"app1": "1.0"}
+        assert self._disk_versions(memory_db) == {}
+
+        assert db.checkpoint().unwrap() is True
+        assert self._disk_versions(memory_db) == {"app1": "1.0"}
+        assert memory_db.with_name("bitbot.db-memjournal").read_text() == ""
+
+    def test_close_writes_back(self, memory_db):
+        """Leaving memory mode (or exiting) writes the database back."""
+        db.set_offline_version("app1", "1.0")
+        db.close()
+        assert self._disk_versions(memory_db) == {"app1": "1.0"}
+
+    def test_checkpoint_without_memory_mode(self, temp_db):
+        """checkpoint() is a no-op on a disk database."""
+        assert db.checkpoint().unwrap() is False
+
+    def test_checkpoint_rejected_inside_transaction(self, memory_db):
+        """A checkpoint would wait forever on this thread's own write lock."""
+        with db.transaction():
+            db.set_offline_version("app1", "1.0")
+            assert isinstance(db.checkpoint(), Failure)
+
+    def test_crash_is_replayed_from_journal(self, tmp_path):
+        """Commits from a killed process are recovered on the next load."""
+        path = tmp_path / "bitbot.db"
+        script = f"""
+import os
+from pathlib import Path
+from bitbot.core import db
+db.DB_PATH = Path({str(path)!r})
+db.init({{"memory": True}})
+db.set_offline_version("app1", "1.0")
+db.checkpoint()
+with db.transaction() as c:
+    db.set_offline_version("app2", "2.0")
+    c.execute("SAVEPOINT undo")
+    db.set_offline_version("app3", "3.0")
+    c.execute("ROLLBACK TO undo")
+    c.execute("RELEASE undo")
+db.add_processed_releases_many([7, 8])
+with db.transaction():
+    db.set_offline_version("lost", "0")
+    os._exit(1)
+"""
+        env = {**os.environ, "PYTHONPATH": str(Path(db.__file__).parents[3])}
+        proc = subprocess.run([sys.executable, "-c", script], env=env, check=False)  # noqa: S603
+        assert proc.returncode == 1
+        assert self._disk_versions(path) == {"app1": "1.0"}
+
+        with patch.object(db, "DB_PATH", path):
+            try:
+                assert isinstance(db.init({"memory": True}), Success)
+                assert db.get_offline_versions().unwrap() == {"app1": "1.0", "app2": "2.0"}
+                assert db.get_processed_releases().unwrap() == {7, 8}
+            finally:
+                db.configure({"memory": False})
+        assert self._disk_versions(path) == {"app1": "1.0", "app2": "2.0"}
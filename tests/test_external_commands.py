@@ -155,23 +155,31 @@ class TestMaintainCommand:
 class TestPostCommand:
     """Tests for post command helpers."""
 
-    def test_build_changelog_data(self):
-        """Build changelog from releases vs online versions."""
+    def test_build_changelog_data(self, tmp_path, monkeypatch):
+        """Build changelog from the gathered catalog vs announced versions."""
         from bitbot.commands.post import _build_changelog
+        from bitbot.core import db
 
-        releases = {
-            "bitlife": {
-                "display_name": "BitLife",
-                "latest_release": {"version": "3.21", "url": "https://ex.com"},
-            },
-            "new_app": {
-                "display_name": "New App",
-                "latest_release": {"version": "1.0", "url": "https://ex.com"},
-            },
-        }
-        online_versions = {"bitlife": "3.20"}
-
-        changelog = _build_changelog(releases, online_versions)
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "post.db")
+        db.init()
+        account_id = db.get_or_create_account("bot", "sub").unwrap()
+        db.replace_catalog(
+            {
+                "bitlife": {
+                    "display_name": "BitLife",
+                    "latest_release": {"version": "3.21", "download_url": "https://ex.com"},
+                    "previous_releases": [{"version": "3.20", "download_url": "https://ex.com"}],
+                },
+                "new_app": {
+                    "display_name": "New App",
+                    "latest_release": {"version": "1.0", "download_url": "https://ex.com"},
+                    "previous_releases": [],
+                },
+            }
+        )
+        db.set_posted_versions(account_id, {"bitlife": "3.20"})
+
+        changelog = _build_changelog(account_id)
 
         assert "new_app" in changelog["added"]
         assert "bitlife" in changelog["updated"]
@@ -1,7 +1,20 @@
 """Tests for gather command and release parser."""
 
+import io
+
 import pytest
+from rich.console import Console
 
+from bitbot.commands.gather import (
+    _attach_history,
+    _collect_latest,
+    _index_bot_releases,
+    _index_release_notes,
+    _match_releases,
+    _queue_new_releases,
+    _unprocessed,
+)
+from bitbot.core import db
 from bitbot.core.app_registry import AppRegistry
 from bitbot.core.release_parser import parse_release_body
 from bitbot.models import App
@@ -171,3 +184,123 @@ class TestGatherIntegration:
             matched = registry.get(app_id)
             result = matched.id if matched else None
             assert result == expected, f"{app_id} -> {result}, expected {expected}"
+
+
+class TestGatherPipeline:
+    """Tests for the streaming gather stages."""
+
+    @pytest.fixture
+    def registry(self):
+        return AppRegistry([App(id="BitLife", displayName="BitLife")])
+
+    def test_match_releases_is_lazy(self, registry):
+        """Matching pulls releases one at a time from the source stream."""
+        pulled = []
+
+        def source():
+            for i, rel in enumerate([make_release("BitLife", "3.21"), make_release("x", "1")]):
+                pulled.append(i)
+                yield {**rel, "id": i + 1}
+
+        matched = _match_releases(source(), registry)
+        first = next(matched)
+
+        assert first.app.id == "BitLife"
+        assert pulled == [0]
+        assert list(matched) == []
+
+    def test_match_releases_handles_null_body(self, registry):
+        """Releases with a null body are skipped."""
+        assert list(_match_releases([{"id": 1, "body": None}], registry)) == []
+
+    def test_unprocessed_dedupes_within_run(self, registry):
+        """Already processed and repeated IDs are dropped."""
+        releases = list(
+            _match_releases(
+                [
+                    {**make_release("BitLife", "3.21"), "id": 1},
+                    {**make_release("BitLife", "3.20"), "id": 2},
+                    {**make_release("BitLife", "3.20"), "id": 2},
+                ],
+                registry,
+            )
+        )
+        assert [r.release_id for r in _unprocessed(releases, {1})] == [2]
+
+    def test_queue_new_releases_checks_batch_in_db(self, registry, tmp_path, monkeypatch):
+        """Only releases not yet processed (individually or compacted) are queued."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "gather.db")
+        db.init()
+        db.add_processed_releases_many([1, 2, 3])
+        db.compact_processed_releases(1)
+
+        batch = tuple(
+            _match_releases(
+                [{**make_release("BitLife", f"3.{i}"), "id": i} for i in (2, 3, 4)], registry
+            )
+        )
+        console = Console(file=io.StringIO())
+
+        assert _queue_new_releases(batch, console) == 1
+        assert [r["release_id"] for r in db.get_pending_releases().unwrap()] == [4]
+        assert _queue_new_releases(batch, console) == 0
+
+    def test_already_pending_release_is_not_reported(self, registry, tmp_path, monkeypatch):
+        """A release skipped as already queued is neither printed nor counted."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "gather.db")
+        db.init()
+        db.add_pending_release(4, "bitlife", "BitLife", "3.4", "v3.4")
+        batch = tuple(
+            _match_releases(
+                [{**make_release("BitLife", f"3.{i}"), "id": i} for i in (4, 5)], registry
+            )
+        )
+        output = io.StringIO()
+
+        assert _queue_new_releases(batch, Console(file=output)) == 1
+        assert "v3.4" not in output.getvalue()
+        assert "v3.5" in output.getvalue()
+        assert db.get_processed_among([4, 5]).unwrap() == {4, 5}
+
+    def test_release_notes_are_indexed_in_passing(self, tmp_path, monkeypatch):
+        """Streamed releases are passed through unchanged and become searchable."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "gather.db")
+        db.init()
+        releases = [
+            {**make_release("BitLife", "3.21"), "id": 1, "tag_name": "v3.21"},
+            {**make_release("BitLife", "3.20"), "id": None},
+        ]
+
+        passed = list(_index_release_notes(iter(releases), Console(file=io.StringIO())))
+
+        assert passed == releases
+        hits = db.search("3.21").unwrap()
+        assert [(h["kind"], h["ref"], h["title"]) for h in hits] == [("release", "1", "v3.21")]
+
+    def test_build_latest_and_history(self, registry):
+        """Latest comes from source, history from the bot repo."""
+        output = io.StringIO()
+        console = Console(file=output)
+        bot_index = _index_bot_releases(
+            [
+                make_release("BitLife", "3.21", "https://ex.com/321"),
+                make_release("bitlife", "3.20", "https://ex.com/320"),
+                make_release("BitLife", "3.19", "htttps://bad"),
+            ],
+            registry,
+            console,
+        )
+        apps_data = {}
+        _collect_latest(
+            _match_releases(
+                [make_release("BitLife", "3.21"), make_release("BitLife", "3.20")], registry
+            ),
+            bot_index,
+            apps_data,
+        )
+        _attach_history(apps_data, bot_index)
+
+        app_data = apps_data["BitLife"]
+        assert app_data["latest_release"]["download_url"] == "https://ex.com/321"
+        assert [r["version"] for r in app_data["previous_releases"]] == ["3.20"]
+        assert "Skipping invalid URL" in output.getvalue()
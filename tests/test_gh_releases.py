@@ -1,11 +1,19 @@
 """Tests for GitHub release operations."""
 
+import io
+import json
 from unittest.mock import MagicMock
 
+import pytest
 from returns.result import Failure, Success
 
 from bitbot.core.errors import GitHubAPIError
-from bitbot.gh.releases.fetcher import get_github_data, get_source_releases
+from bitbot.gh.releases.fetcher import (
+    get_github_data,
+    get_source_releases,
+    iter_json_array_items,
+    stream_github_list,
+)
 
 
 def test_get_github_data_success(mocker):
@@ -112,3 +120,67 @@ def test_get_source_releases_propagates_error(mocker):
 
     assert isinstance(result, Failure)
     assert "API failed" in str(result.failure())
+
+
+class TestIterJsonArrayItems:
+    """Tests for the incremental JSON array decoder."""
+
+    def test_single_array(self):
+        """Items of one array are yielded in order."""
+        items = list(iter_json_array_items(['[{"id": 1}, {"id": 2}]']))
+        assert items == [{"id": 1}, {"id": 2}]
+
+    def test_items_split_across_chunks(self):
+        """Items split at arbitrary chunk boundaries are reassembled."""
+        text = '[{"id": 1, "body": "a, ] b"}, {"id": 2}]'
+        chunks = [text[i : i + 3] for i in range(0, len(text), 3)]
+        assert [i["id"] for i in iter_json_array_items(chunks)] == [1, 2]
+
+    def test_concatenated_pages(self):
+        """Concatenated page arrays from --paginate are flattened."""
+        items = list(iter_json_array_items(['[{"id": 1}]\n[{"id": 2}]', "[]"]))
+        assert items == [{"id": 1}, {"id": 2}]
+
+    def test_truncated_stream_raises(self):
+        """A stream that ends mid-array raises."""
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_array_items(['[{"id": 1}, {"id"']))
+
+    def test_non_array_raises(self):
+        """A top-level object is rejected."""
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_array_items(['{"id": 1}']))
+
+
+class TestStreamGithubList:
+    """Tests for stream_github_list."""
+
+    def _fake_process(self, mocker, stdout: str, returncode: int = 0):
+        process = MagicMock()
+        process.stdout = io.StringIO(stdout)
+        process.poll.return_value = returncode
+        process.returncode = returncode
+        return mocker.patch("bitbot.gh.releases.fetcher.subprocess.Popen", return_value=process)
+
+    def test_streams_items(self, mocker):
+        """Items from every page are yielded."""
+        popen = self._fake_process(mocker, '[{"id": 1}][{"id": 2}]')
+
+        items = list(stream_github_list("/repos/o/r/releases"))
+
+        assert [i["id"] for i in items] == [1, 2]
+        assert "--paginate" in popen.call_args.args[0]
+
+    def test_command_failure_raises(self, mocker):
+        """A non-zero gh exit raises GitHubAPIError."""
+        self._fake_process(mocker, "", returncode=1)
+
+        with pytest.raises(GitHubAPIError):
+            list(stream_github_list("/repos/o/r/releases"))
+
+    def test_invalid_json_raises(self, mocker):
+        """Malformed output raises GitHubAPIError."""
+        self._fake_process(mocker, "not json")
+
+        with pytest.raises(GitHubAPIError):
+            list(stream_github_list("/repos/o/r/releases"))
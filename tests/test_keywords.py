@@ -0,0 +1,63 @@
+"""Tests for the multi-pattern keyword matcher."""
+
+import re
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from bitbot.core.keywords import KeywordMatcher
+
+
+class TestKeywordMatcher:
+    """Tests for KeywordMatcher."""
+
+    def test_reports_every_class_hit(self):
+        """One scan finds keywords from all classes, case-insensitively."""
+        matcher = KeywordMatcher({"working": ["working"], "broken": ["not working", "broken"]})
+
+        assert matcher.scan("It is NOT Working") == {"working", "broken"}
+        assert matcher.scan("Works great") == frozenset()
+
+    def test_overlapping_keywords(self):
+        """Keywords that are suffixes of others are found through failure links."""
+        matcher = KeywordMatcher({"a": ["she"], "b": ["he"], "c": ["hers"]})
+
+        assert matcher.scan("ushers") == {"a", "b", "c"}
+
+    def test_whole_words(self):
+        """Word boundaries reject keywords inside longer words."""
+        matcher = KeywordMatcher({"working": ["working", "works!"]}, whole_words=True)
+
+        assert matcher.scan("networking is down") == frozenset()
+        assert matcher.scan("working_fine") == frozenset()
+        assert matcher.scan("Still working.") == {"working"}
+        assert matcher.scan("it works!!") == {"working"}  # Edge is not a word character
+
+    def test_case_folding(self):
+        """Case folding matches beyond ASCII."""
+        matcher = KeywordMatcher({"thanks": ["danke schön", "STRASSE"]})
+
+        assert matcher.scan("DANKE SCHÖN") == {"thanks"}
+        assert matcher.scan("straße") == {"thanks"}
+
+    def test_empty_keywords_never_match(self):
+        """Empty keywords and empty classes match nothing."""
+        matcher = KeywordMatcher({"a": [""], "b": []})
+
+        assert matcher.scan("anything") == frozenset()
+
+    @given(
+        st.lists(st.text(alphabet="abc ", min_size=1, max_size=4), max_size=6),
+        st.lists(st.text(alphabet="abc ", min_size=1, max_size=4), max_size=6),
+        st.text(alphabet="abcABC ", max_size=40),
+    )
+    def test_agrees_with_regex(self, first, second, text):
+        """Matches are the same as an escaped, case-insensitive alternation."""
+        matcher = KeywordMatcher({"first": first, "second": second})
+        expected = {
+            name
+            for name, words in (("first", first), ("second", second))
+            if words and re.search("|".join(map(re.escape, words)), text, re.IGNORECASE)
+        }
+
+        assert matcher.scan(text) == expected
@@ -1,8 +1,26 @@
 """Tests for Reddit posting modules."""
 
+from unittest.mock import MagicMock, patch
+
+import praw
+import pytest
+from praw.exceptions import RedditAPIException
+from returns.result import Success
+
+from bitbot import paths
+from bitbot.core import db
 from bitbot.reddit.posting.changelog import generate_changelog
-from bitbot.reddit.posting.poster import count_outbound_links
+from bitbot.reddit.posting.poster import count_outbound_links, update_post
 from bitbot.reddit.posting.title_generator import create_app_list, generate_dynamic_title
+from bitbot.reddit.posts import (
+    bot_post_row,
+    compute_content_hash,
+    get_bot_posts,
+    update_older_posts,
+)
+from bitbot.reddit.state import check_post_exists, get_current_post, verify_posts, verify_state
+from bitbot.reddit.submissions import SubmissionCache
+from bitbot.reddit.throttle import SharedRateLimit, ratelimit_delay
 
 
 # count_outbound_links tests
@@ -249,3 +267,325 @@ class TestGenerateChangelog:
         removed_pos = result.find("### Removed")
 
         assert added_pos < updated_pos < removed_pos
+
+
+class TestBotPostDiscovery:
+    """Tests for incremental bot post discovery."""
+
+    @pytest.fixture
+    def temp_db(self, tmp_path, monkeypatch):
+        """Empty database."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "posts.db")
+        db.init()
+
+    @staticmethod
+    def submission(post_id, created, title="[BitBot] Release") -> praw.models.Submission:
+        """A listed submission."""
+        submission = MagicMock(spec=praw.models.Submission)
+        submission.id = post_id
+        submission.fullname = f"t3_{post_id}"
+        submission.subreddit = MagicMock(display_name="TestSubreddit")
+        submission.title = title
+        submission.url = f"https://redd.it/{post_id}"
+        submission.created_utc = created
+        submission.removed_by_category = None
+        submission.selftext = f"body of {post_id}"
+        return submission
+
+    @pytest.fixture
+    def reddit(self):
+        """Reddit client logged in as ``bot``."""
+        reddit = MagicMock(spec=praw.Reddit)
+        reddit.config = MagicMock(username="bot")
+        reddit.redditor = MagicMock()
+        return reddit
+
+    def test_refresh_lists_only_newer_posts(self, temp_db, reddit, config):
+        """After the first listing, only posts before the cursor are requested."""
+        new = reddit.redditor.return_value.submissions.new
+        new.side_effect = [
+            [self.submission("b", 2.0), self.submission("a", 1.0, title="Other")],
+            [self.submission("c", 3.0)],
+        ]
+
+        first = get_bot_posts(reddit, config).unwrap()
+        second = get_bot_posts(reddit, config, {"a"}).unwrap()
+
+        assert [p["post_id"] for p in first] == ["b"]
+        assert [p["post_id"] for p in second] == ["c", "b", "a"]
+        assert new.call_args_list[0].kwargs["params"] == {}
+        assert new.call_args_list[1].kwargs["params"] == {"before": "t3_b"}
+        assert db.search("body of c").unwrap()[0]["ref"] == "c"
+
+    def test_deleted_cursor_post_is_replaced(self, temp_db, reddit, config):
+        """An empty page after the cursor is checked against the first page."""
+        new = reddit.redditor.return_value.submissions.new
+        new.side_effect = [
+            [self.submission("b", 2.0), self.submission("a", 1.0)],
+            [],
+            [self.submission("c", 3.0), self.submission("a", 1.0)],
+            [],
+            [self.submission("c", 3.0), self.submission("a", 1.0)],
+        ]
+
+        get_bot_posts(reddit, config).unwrap()
+        found = get_bot_posts(reddit, config).unwrap()
+
+        assert {p["post_id"]: p["removed"] for p in found} == {
+            "c": None,
+            "b": db.REMOVED_DELETED,
+            "a": None,
+        }
+        assert db.get_bot_post_cursor("bot").unwrap() == "c"
+        assert new.call_args_list[2].kwargs == {"limit": 100}
+
+        assert len(get_bot_posts(reddit, config).unwrap()) == 3
+        assert new.call_count == 5
+
+    def test_current_post_comes_from_cache(self, temp_db, reddit, config):
+        """get_current_post reports the newest cached post without fetching it."""
+        new = reddit.redditor.return_value.submissions.new
+        new.side_effect = [[self.submission("b", 2.0), self.submission("a", 1.0)]]
+
+        status = get_current_post(reddit, config).unwrap()
+
+        assert status.post_id == "b"
+        assert status.current_hash == compute_content_hash("body of b")
+        reddit.submission.assert_not_called()
+
+    def test_verify_posts_batches_info_requests(self, temp_db, reddit):
+        """150 posts take two /api/info requests; states land in bot_posts."""
+        post_ids = [f"p{i}" for i in range(150)]
+        listed = {post_id: self.submission(post_id, float(i)) for i, post_id in enumerate(post_ids)}
+        listed["p1"].removed_by_category = "moderator"
+        del listed["p2"]
+
+        def info(fullnames):
+            return [listed[f[3:]] for f in fullnames if f[3:] in listed]
+
+        reddit.info = MagicMock(side_effect=info)
+
+        statuses = verify_posts(reddit, "bot", [*post_ids, "p0"]).unwrap()
+
+        assert [len(c.kwargs["fullnames"]) for c in reddit.info.call_args_list] == [100, 50]
+        assert list(statuses) == post_ids
+        assert statuses["p1"].removal_reason == "moderator"
+        assert not statuses["p1"].accessible
+        assert not statuses["p2"].exists
+        assert statuses["p3"].accessible
+        cached = db.find_bot_posts("bot", "TestSubreddit", "[BitBot]").unwrap()
+        assert len(cached) == 149
+        assert {p["post_id"]: p["removed"] for p in cached}["p1"] == "moderator"
+
+    def test_verify_posts_marks_vanished_posts_deleted(self, temp_db, reddit):
+        """A cached post /api/info no longer returns is recorded as deleted."""
+        db.record_bot_posts("bot", [bot_post_row(self.submission("a", 1.0))])
+        reddit.info = MagicMock(return_value=[])
+
+        statuses = verify_posts(reddit, "bot", ["a"]).unwrap()
+
+        assert not statuses["a"].exists
+        cached = db.find_bot_posts("bot", "TestSubreddit", "[BitBot]").unwrap()
+        assert cached[0]["removed"] == db.REMOVED_DELETED
+
+    def test_verify_state_reuses_known_status(self, temp_db, reddit):
+        """A status from verify_posts is used instead of fetching the post again."""
+        reddit.info = MagicMock(return_value=[self.submission("a", 1.0)])
+        status = verify_posts(reddit, "bot", ["a"]).unwrap()["a"]
+        meta = {"active_post_id": "a", "content_hash": compute_content_hash("body of a")}
+
+        check = verify_state(reddit, meta, active_status=status)
+
+        assert check.post_ok
+        assert check.content_matches
+        reddit.submission.assert_not_called()
+
+
+class TestBannerRollout:
+    """Tests for rolling the outdated banner out to older posts."""
+
+    BANNER = "## ⚠️ Outdated Post\nSee {{latest_post_url}}"
+
+    @pytest.fixture
+    def inject_config(self, config, tmp_path, monkeypatch):
+        """Config injecting a one-line banner template."""
+        template = tmp_path / "banner.md"
+        template.write_text(self.BANNER)
+        monkeypatch.setattr(paths, "get_template_path", lambda _: template)
+        return config.model_copy(update={"outdated_post_handling": {"mode": "inject"}})
+
+    @pytest.fixture
+    def posts(self, tmp_path, monkeypatch):
+        """Four cached posts: removed, already bannered, and two to check."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "banner.db")
+        db.init()
+        rows = [
+            {
+                "post_id": post_id,
+                "subreddit": "TestSubreddit",
+                "title": "[BitBot] Old",
+                "url": "",
+                "created_utc": float(i),
+                "removed": "moderator" if post_id == "a" else None,
+                "body_hash": "h",
+                "banner_hash": None,
+            }
+            for i, post_id in enumerate("abcd")
+        ]
+        db.record_bot_posts("bot", rows)
+        banner = self.BANNER.replace("{{latest_post_url}}", "u2")
+        db.set_bot_post_banners({"b": ("h", compute_content_hash(banner))})
+        return db.find_bot_posts("bot", "TestSubreddit", "[BitBot]").unwrap()
+
+    @staticmethod
+    def listed(post_id, body) -> MagicMock:
+        """A submission from /api/info."""
+        submission = MagicMock(spec=praw.models.Submission)
+        submission.id = post_id
+        submission.selftext = body
+        return submission
+
+    @staticmethod
+    def worker_client() -> MagicMock:
+        """Client handed to edit workers, with a quiet rate limiter."""
+        core = MagicMock()
+        core.rate_limiter.next_request_timestamp_ns = None
+        client = MagicMock(spec=praw.Reddit, _core=core)
+        client.submission = MagicMock()
+        return client
+
+    def test_edits_only_posts_that_differ(self, inject_config, posts):
+        """One info request covers unknown posts; only changed bodies are edited."""
+        details = {"title": "New", "url": "u2", "version": "2.0"}
+        current = f"{self.BANNER.replace('{{latest_post_url}}', 'u2')}\n\n---\n\nbody c"
+        reddit = MagicMock(spec=praw.Reddit)
+        reddit.info = MagicMock(
+            return_value=[
+                self.listed(
+                    "d", f"{self.BANNER.replace('{{latest_post_url}}', 'u1')}\n\n---\n\nbody d"
+                ),
+                self.listed("c", current),
+            ]
+        )
+        client = self.worker_client()
+
+        with patch("bitbot.reddit.posts.get_reddit", return_value=Success(client)):
+            rollout = update_older_posts(reddit, posts, details, inject_config).unwrap()
+
+        reddit.info.assert_called_once_with(fullnames=["t3_d", "t3_c"])
+        assert rollout.edited == ["d"]
+        assert sorted(rollout.current) == ["b", "c"]
+        client.submission.assert_called_once_with(id="d")
+        edited = client.submission.return_value.edit.call_args.kwargs["body"]
+        assert edited.startswith("## ⚠️ Outdated Post\nSee u2\n\n---\n\nbody d")
+
+        # Every live post now records the banner, so a rerun makes no requests
+        refreshed = db.find_bot_posts("bot", "TestSubreddit", "[BitBot]").unwrap()
+        reddit.info.reset_mock()
+        again = update_older_posts(reddit, refreshed, details, inject_config).unwrap()
+        reddit.info.assert_not_called()
+        assert again.edited == []
+
+    def test_rate_limited_edit_is_retried(self, inject_config, posts):
+        """A RATELIMIT error backs every worker off, then the edit is retried."""
+        details = {"title": "New", "url": "u2", "version": "2.0"}
+        reddit = MagicMock(spec=praw.Reddit)
+        reddit.info = MagicMock(return_value=[self.listed("d", "body d")])
+        client = self.worker_client()
+        client.submission.return_value.edit.side_effect = [
+            RedditAPIException([["RATELIMIT", "Take a break for 2 seconds.", "ratelimit"]]),
+            None,
+        ]
+
+        with (
+            patch("bitbot.reddit.posts.get_reddit", return_value=Success(client)),
+            patch.object(SharedRateLimit, "back_off") as back_off,
+        ):
+            rollout = update_older_posts(reddit, posts[:1], details, inject_config).unwrap()
+
+        assert rollout.edited == ["d"]
+        back_off.assert_called_once_with(2.0)
+
+
+class TestSharedRateLimit:
+    """Tests for pacing workers on one rate limit."""
+
+    def test_waits_for_slowest_client_and_back_off(self):
+        """The gate opens at the latest time any client or back-off asked for."""
+        now = [0]
+        slept = []
+        gate = SharedRateLimit(clock=lambda: now[0], sleep=slept.append)
+        core = MagicMock()
+        client = MagicMock(spec=praw.Reddit, _core=core)
+
+        gate.wait()
+        core.rate_limiter.next_request_timestamp_ns = 2 * 10**9
+        gate.observe(client)
+        core.rate_limiter.next_request_timestamp_ns = 10**9
+        gate.observe(client)
+        gate.wait()
+        gate.back_off(5.0)
+        gate.wait()
+
+        assert slept == [2.0, 5.0]
+
+    def test_concurrent_waits_reserve_slots(self):
+        """Workers arriving together are let through one spacing apart."""
+        slept = []
+        gate = SharedRateLimit(clock=lambda: 0, sleep=slept.append, min_spacing=0.5)
+
+        for _ in range(3):
+            gate.wait()
+
+        assert slept == [0.5, 1.0]
+
+    def test_ratelimit_delay(self):
+        """Waits are parsed from RATELIMIT messages; other errors have none."""
+        minutes = RedditAPIException([["RATELIMIT", "Take a break for 9 minutes.", "x"]])
+        other = RedditAPIException([["NO_TEXT", "we need something here", "text"]])
+
+        assert ratelimit_delay(minutes) == 540.0
+        assert ratelimit_delay(other) is None
+
+
+class TestSubmissionCache:
+    """Tests for sharing one submission read across a run."""
+
+    @pytest.fixture
+    def temp_db(self, tmp_path, monkeypatch):
+        """Empty database."""
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "submissions.db")
+        db.init()
+
+    def test_post_run_reads_submission_once(self, temp_db, config):
+        """Verify, refresh check, edit and re-verify all use the same submission."""
+        submission = MagicMock(spec=praw.models.Submission)
+        submission.id = "p1"
+        submission.selftext = "body"
+        submission.removed_by_category = None
+        submission.url = "https://redd.it/p1"
+        submission.title = "[BitBot] Post"
+        reddit = MagicMock(spec=praw.Reddit)
+        reddit.submission = MagicMock(return_value=submission)
+        submissions = SubmissionCache(reddit)
+        meta = {"active_post_id": "p1", "content_hash": compute_content_hash("body")}
+
+        assert verify_state(reddit, meta, submissions=submissions).content_matches
+        assert check_post_exists(reddit, "p1", submissions).exists
+        assert update_post(reddit, "p1", "new body", config, submissions).unwrap() is submission
+        assert check_post_exists(reddit, "p1", submissions).exists
+
+        reddit.submission.assert_called_once_with(id="p1")
+        assert "p1" in submissions
+
+    def test_added_submission_is_not_looked_up(self):
+        """A just-posted submission is served from the cache."""
+        reddit = MagicMock(spec=praw.Reddit)
+        submission = MagicMock(spec=praw.models.Submission)
+        submission.id = "new"
+        submissions = SubmissionCache(reddit)
+
+        submissions.add(submission)
+
+        assert submissions.get("new") is submission
+        reddit.submission.assert_not_called()
@@ -0,0 +1,129 @@
+"""Tests for the persisted Reddit OAuth token cache."""
+
+import time
+from unittest.mock import patch
+
+import prawcore
+import pytest
+
+from bitbot.reddit import tokens
+from bitbot.reddit.client import init_reddit
+from bitbot.reddit.tokens import CachedScriptAuthorizer, seal, unseal
+
+FRESH_TOKEN = "fresh-token"  # noqa: S105 - not a credential
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    """Token cache file that does not exist yet."""
+    path = tmp_path / ".cache" / "reddit-tokens.json"
+    monkeypatch.setattr(tokens, "CACHE_FILE", path)
+    return path
+
+
+@pytest.fixture
+def credentials(monkeypatch):
+    """Reddit credentials in the environment."""
+    for name, value in {
+        "REDDIT_CLIENT_ID": "client",
+        "REDDIT_CLIENT_SECRET": "secret",
+        "REDDIT_USERNAME": "bot",
+        "REDDIT_PASSWORD": "hunter2",
+        "REDDIT_USER_AGENT": "BitBot/test",
+    }.items():
+        monkeypatch.setenv(name, value)
+
+
+def session_authorizer():
+    """The authorizer behind a new client's session (PRAW keeps it private)."""
+    return init_reddit().unwrap()._core._authorizer  # noqa: SLF001
+
+
+def fake_refresh(authorizer):
+    """Stand-in for the password grant: hand out a one-hour token."""
+    authorizer.access_token = FRESH_TOKEN
+    authorizer.scopes = {"*"}
+    authorizer._expiration_timestamp_ns = time.monotonic_ns() + 3600 * 10**9  # noqa: SLF001
+
+
+class TestSeal:
+    """Tests for token sealing."""
+
+    def test_round_trip(self):
+        """A sealed blob opens with the same secret and hides the plaintext."""
+        sealed = seal(b"access-token", b"k")
+        assert b"access-token" not in sealed
+        assert unseal(sealed, b"k") == b"access-token"
+        assert seal(b"access-token", b"k") != sealed
+
+    def test_rejects_other_secret_and_tampering(self):
+        """A wrong secret, a flipped bit or a truncated blob yield None."""
+        sealed = seal(b"access-token", b"k")
+        flipped = sealed[:20] + bytes([sealed[20] ^ 1]) + sealed[21:]
+
+        assert unseal(sealed, b"other") is None
+        assert unseal(flipped, b"k") is None
+        assert unseal(sealed[:10], b"k") is None
+
+
+class TestCachedScriptAuthorizer:
+    """Tests for reusing tokens across clients."""
+
+    def test_init_makes_no_requests(self, cache_file, credentials):
+        """Creating a client neither fetches a token nor calls user.me()."""
+        with patch("prawcore.sessions.Session.request") as request:
+            authorizer = session_authorizer()
+
+        request.assert_not_called()
+        assert isinstance(authorizer, CachedScriptAuthorizer)
+
+    def test_refreshed_token_is_reused(self, cache_file, credentials):
+        """A token from the password grant is loaded by the next client."""
+        with patch.object(prawcore.auth.ScriptAuthorizer, "refresh", fake_refresh):
+            first = session_authorizer()
+            assert first.is_valid() is False
+            first.refresh()
+
+            second = session_authorizer()
+
+        assert second.is_valid() is True
+        assert second.access_token == FRESH_TOKEN
+        assert second.scopes == {"*"}
+
+    def test_cache_file_is_private(self, cache_file, credentials):
+        """The token is only readable by its owner and never stored in plain text."""
+        with patch.object(prawcore.auth.ScriptAuthorizer, "refresh", fake_refresh):
+            session_authorizer().refresh()
+
+        assert cache_file.stat().st_mode & 0o077 == 0
+        assert FRESH_TOKEN not in cache_file.read_text()
+
+    def test_unreadable_cache_is_replaced(self, cache_file, credentials):
+        """A corrupt cache file is ignored on load and overwritten on refresh."""
+        cache_file.parent.mkdir()
+        cache_file.write_text("{not json")
+
+        with patch.object(prawcore.auth.ScriptAuthorizer, "refresh", fake_refresh):
+            authorizer = session_authorizer()
+            assert authorizer.is_valid() is False
+            authorizer.refresh()
+
+        assert session_authorizer().access_token == FRESH_TOKEN
+
+    def test_token_needs_same_credentials(self, cache_file, credentials, monkeypatch):
+        """A cached token is ignored after the password changes."""
+        with patch.object(prawcore.auth.ScriptAuthorizer, "refresh", fake_refresh):
+            session_authorizer().refresh()
+
+        monkeypatch.setenv("REDDIT_PASSWORD", "changed")
+        assert session_authorizer().is_valid() is False
+
+    def test_expired_token_is_not_loaded(self, cache_file, credentials):
+        """A token about to expire is left for the password grant to replace."""
+        with patch.object(prawcore.auth.ScriptAuthorizer, "refresh", fake_refresh):
+            authorizer = session_authorizer()
+            authorizer.refresh()
+
+        assert authorizer.load() is True
+        with patch("bitbot.reddit.tokens.time.time", return_value=time.time() + 3590):
+            assert authorizer.load() is False
@@ -0,0 +1,122 @@
+"""Tests for the sharded release store."""
+
+import json
+
+from returns.result import Failure, Success
+
+from bitbot.core import release_store
+
+
+def make_app(display_name: str, version: str, previous: list[str] | None = None):
+    """Helper to create app release data."""
+    return {
+        "display_name": display_name,
+        "latest_release": {
+            "version": version,
+            "download_url": f"https://ex.com/{version}",
+            "published_at": "2025-01-01T00:00:00Z",
+        },
+        "previous_releases": [
+            {"version": v, "download_url": f"https://ex.com/{v}"} for v in previous or []
+        ],
+    }
+
+
+class TestWriteReleases:
+    """Tests for write_releases."""
+
+    def test_writes_shards_and_index(self, tmp_path):
+        """Each app gets its own shard plus an index entry."""
+        data = {"BitLife": make_app("BitLife", "3.21"), "BitLife Go": make_app("Go", "1.0")}
+
+        result = release_store.write_releases(data, tmp_path)
+
+        assert isinstance(result, Success)
+        assert sorted(result.unwrap().written) == ["BitLife", "BitLife Go"]
+        index = json.loads((tmp_path / "index.json").read_text())
+        assert index["apps"]["BitLife Go"]["file"] == "BitLife_Go.json"
+        assert index["apps"]["BitLife"]["latest_version"] == "3.21"
+        assert (tmp_path / "BitLife_Go.json").exists()
+
+    def test_output_is_compact_by_default(self, tmp_path):
+        """Default output has no indentation."""
+        release_store.write_releases({"a": make_app("A", "1.0")}, tmp_path)
+        assert "\n" not in (tmp_path / "a.json").read_text()
+
+    def test_unchanged_apps_not_rewritten(self, tmp_path):
+        """Only apps whose content changed are rewritten."""
+        release_store.write_releases(
+            {"a": make_app("A", "1.0"), "b": make_app("B", "1.0")}, tmp_path
+        )
+        mtime = (tmp_path / "a.json").stat().st_mtime_ns
+
+        result = release_store.write_releases(
+            {"a": make_app("A", "1.0"), "b": make_app("B", "2.0", ["1.0"])}, tmp_path
+        )
+
+        stats = result.unwrap()
+        assert stats.written == ["b"]
+        assert stats.unchanged == ["a"]
+        assert (tmp_path / "a.json").stat().st_mtime_ns == mtime
+
+    def test_removed_apps_deleted(self, tmp_path):
+        """Shards for apps that disappeared are removed."""
+        release_store.write_releases(
+            {"a": make_app("A", "1.0"), "b": make_app("B", "1.0")}, tmp_path
+        )
+
+        result = release_store.write_releases({"a": make_app("A", "1.0")}, tmp_path)
+
+        assert result.unwrap().removed == ["b"]
+        assert not (tmp_path / "b.json").exists()
+
+    def test_colliding_shard_names_rejected(self, tmp_path):
+        """IDs that sanitize to the same file name fail instead of overwriting."""
+        data = {"Bit Life": make_app("A", "1.0"), "Bit/Life": make_app("B", "1.0")}
+
+        result = release_store.write_releases(data, tmp_path)
+
+        assert isinstance(result, Failure)
+        assert "same release shard" in result.failure().message
+        assert not list(tmp_path.iterdir())
+
+    def test_no_temp_files_left(self, tmp_path):
+        """Atomic writes leave no temp files behind."""
+        release_store.write_releases({"a": make_app("A", "1.0")}, tmp_path)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json", "index.json"]
+
+
+class TestLoad:
+    """Tests for loading shards."""
+
+    def test_load_all_round_trip(self, tmp_path):
+        """load_all returns what was written."""
+        data = {"a": make_app("A", "1.0", ["0.9"]), "b": make_app("B", "2.0")}
+        release_store.write_releases(data, tmp_path)
+
+        assert release_store.load_all(tmp_path).unwrap() == data
+
+    def test_load_single_app(self, tmp_path):
+        """load_app reads only the requested shard."""
+        release_store.write_releases(
+            {"a": make_app("A", "1.0"), "b": make_app("B", "2.0")}, tmp_path
+        )
+        (tmp_path / "b.json").write_text("not json")
+
+        result = release_store.load_app("a", tmp_path)
+
+        assert result.unwrap()["latest_release"]["version"] == "1.0"
+
+    def test_load_missing_app(self, tmp_path):
+        """load_app returns None for unknown apps."""
+        release_store.write_releases({"a": make_app("A", "1.0")}, tmp_path)
+        assert release_store.load_app("zzz", tmp_path).unwrap() is None
+
+    def test_load_without_index(self, tmp_path):
+        """An absent index means an empty catalog."""
+        assert release_store.load_all(tmp_path).unwrap() == {}
+
+    def test_load_corrupt_index(self, tmp_path):
+        """A corrupt index is reported as a failure."""
+        (tmp_path / "index.json").write_text("[]")
+        assert isinstance(release_store.load_all(tmp_path), Failure)
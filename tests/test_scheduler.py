@@ -0,0 +1,105 @@
+"""Tests for the due-time scheduler."""
+
+import threading
+import time
+
+import pytest
+
+from bitbot.core.scheduler import DueScheduler
+
+
+class TestDueScheduler:
+    """Tests for DueScheduler."""
+
+    def test_runs_in_due_order(self):
+        """Keys run earliest first, each once when its job drops it."""
+        scheduler: DueScheduler[str] = DueScheduler()
+        now = time.time()
+        for key, delay in (("late", 0.06), ("now", 0.0), ("soon", 0.03)):
+            scheduler.schedule(key, now + delay)
+        ran: list[str] = []
+
+        scheduler.run(ran.append, max_workers=1)
+
+        assert ran == ["now", "soon", "late"]
+        assert len(scheduler) == 0
+
+    def test_reschedules_until_horizon(self):
+        """Returned due times reschedule a key; keys beyond ``until`` are kept."""
+        scheduler: DueScheduler[str] = DueScheduler()
+        start = time.time()
+        scheduler.schedule("tick", start)
+        scheduler.schedule("later", start + 60)
+        runs: list[float] = []
+
+        def job(key: str) -> float:
+            runs.append(time.time())
+            return time.time() + 0.01
+
+        scheduler.run(job, until=start + 0.05)
+
+        assert 3 <= len(runs) <= 7
+        assert "later" in scheduler
+        assert "tick" in scheduler
+
+    def test_concurrency_limit(self):
+        """No more than ``max_workers`` jobs run at once."""
+        scheduler: DueScheduler[int] = DueScheduler()
+        for key in range(8):
+            scheduler.schedule(key, 0.0)
+        lock = threading.Lock()
+        active = peak = 0
+
+        def job(key: int) -> None:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+        scheduler.run(job, max_workers=3)
+
+        assert peak == 3
+
+    def test_schedule_moves_and_cancel_removes(self):
+        """A key is scheduled once; cancelled keys never run."""
+        scheduler: DueScheduler[str] = DueScheduler()
+        scheduler.schedule("a", time.time() + 60)
+        scheduler.schedule("a", 0.0)
+        scheduler.schedule("b", 0.0)
+        assert scheduler.cancel("b")
+        assert not scheduler.cancel("b")
+        ran: list[str] = []
+
+        scheduler.run(ran.append)
+
+        assert ran == ["a"]
+
+    def test_job_error_stops_run(self):
+        """An exception in a job is re-raised by run()."""
+        scheduler: DueScheduler[str] = DueScheduler()
+        scheduler.schedule("bad", 0.0)
+        scheduler.schedule("never", time.time() + 60)
+
+        def job(key: str) -> None:
+            msg = "boom"
+            raise RuntimeError(msg)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            scheduler.run(job)
+        assert "never" in scheduler
+
+    def test_stop_from_job(self):
+        """stop() ends a run that would otherwise wait forever."""
+        scheduler: DueScheduler[str] = DueScheduler()
+        scheduler.schedule("a", 0.0)
+        scheduler.schedule("far", time.time() + 3600)
+
+        def job(key: str) -> None:
+            scheduler.stop()
+
+        scheduler.run(job)
+
+        assert scheduler.next_due() is not None